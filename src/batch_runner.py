@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Run consultations for a file of business ideas with bounded concurrency.
+
+Usage:
+    python batch_runner.py ideas.jsonl --output batch_results.jsonl --concurrency 8
+
+Input is JSONL or CSV with an id and an idea per record. Every finished
+consultation is appended to the output JSONL straight away, so a crashed
+run can simply be restarted: ids already completed in the output are skipped,
+and consultations that were cut off resume from their last checkpoint.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from main_v6 import (
+    build_app, check_for_final_report, consultation_config, create_consultation_request, create_initial_state,
+    get_consultation_snapshot, is_interrupted, print_hedging_stats, print_rate_limit_stats
+)
+from runtime.stats import percentile
+from runtime.usage import add_usage, empty_usage, format_usage
+
+# Batch consultations are checkpointed in their own file: a checkpoint file keeps only the
+# CHECKPOINT_MAX_CONSULTATIONS most recent consultations, and a large batch must not
+# prune the interactive ones the CLI and Streamlit can still resume or fork
+BATCH_CHECKPOINT_PATH = os.getenv(
+    "BATCH_CHECKPOINT_PATH", str(Path(__file__).parent / ".cache" / "batch_checkpoints.sqlite")
+)
+
+
+def load_ideas(input_path, id_field="id", idea_field="idea"):
+    """Read ideas from a .jsonl or .csv file as a list of {"id", "idea"} records"""
+    input_path = Path(input_path)
+    with open(input_path, "r", encoding="utf-8", newline="") as f:
+        if input_path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    ideas = []
+    for row in rows:
+        idea = (row.get(idea_field) or "").strip()
+        if not idea:
+            continue
+        # Ideas without an id get a stable one so resuming still works
+        idea_id = str(row.get(id_field) or hashlib.md5(idea.encode()).hexdigest()[:12])
+        ideas.append({"id": idea_id, "idea": idea})
+    return ideas
+
+
+def load_completed_ids(output_path):
+    """Ids that already have a completed result in the output file"""
+    completed = set()
+    output_path = Path(output_path)
+    if not output_path.exists():
+        return completed
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if record.get("status") == "completed":
+                completed.add(record["id"])
+    return completed
+
+
+def build_result_record(item, final_state, latency):
+    """Transcript and final report of a finished consultation"""
+    messages = final_state.get("messages", [])
+    transcript = [
+        {"speaker": getattr(message, "name", None) or "user", "content": message.content}
+        for message in messages
+    ]
+    final_report = next(
+        (message.content for message in reversed(messages) if check_for_final_report(message.content)),
+        None
+    )
+    return {
+        "id": item["id"],
+        "idea": item["idea"],
+        "status": "completed",
+        "latency_seconds": round(latency, 2),
+        "message_count": final_state.get("message_count", 0),
+        "conversation_quality": final_state.get("conversation_quality"),
+        "topics_discussed": final_state.get("topics_discussed", []),
+        "usage_stats": final_state.get("usage_stats"),
+        "final_report": final_report,
+        "transcript": transcript,
+        "completed_at": datetime.now().isoformat()
+    }
+
+
+async def run_consultation(item, recursion_limit):
+    """Run one idea through the compiled graph, returns (record, latency)
+
+    Each idea has its own checkpoint thread, so after a crash an interrupted
+    consultation continues from its last completed node instead of starting over."""
+    config = consultation_config(f"batch-{item['id']}", recursion_limit)
+
+    start = time.perf_counter()
+    try:
+        snapshot = await asyncio.to_thread(get_consultation_snapshot, f"batch-{item['id']}")
+        if snapshot and not is_interrupted(snapshot):
+            # Finished before the crash, but its record was never written
+            final_state = snapshot.values
+        else:
+            graph_input = None if snapshot else create_initial_state(create_consultation_request(item["idea"]))
+            final_state = await build_app({"async_execution": True}).ainvoke(graph_input, config=config)
+        latency = time.perf_counter() - start
+        return build_result_record(item, final_state, latency), latency
+    except Exception as e:
+        latency = time.perf_counter() - start
+        return {
+            "id": item["id"],
+            "idea": item["idea"],
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+            "latency_seconds": round(latency, 2),
+            "completed_at": datetime.now().isoformat()
+        }, latency
+
+
+async def run_batch(ideas, output_path, concurrency=4, recursion_limit=30):
+    """Run all ideas with at most `concurrency` consultations in flight, returns (latencies, failures, usage)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+    usage = empty_usage()
+    total = len(ideas)
+
+    with open(output_path, "a", encoding="utf-8") as output_file:
+        async def worker(item):
+            nonlocal failures, usage
+            async with semaphore:
+                record, latency = await run_consultation(item, recursion_limit)
+
+            # Stream each finished consultation to disk before the next one completes
+            output_file.write(json.dumps(record) + "\n")
+            output_file.flush()
+
+            if record["status"] == "completed":
+                latencies.append(latency)
+                consultation_usage = (record.get("usage_stats") or {}).get("total", empty_usage())
+                usage = add_usage(usage, consultation_usage)
+                print(f"✅ [{len(latencies) + failures}/{total}] {item['id']} completed in {latency:.1f}s "
+                      f"({consultation_usage['prompt_tokens'] + consultation_usage['completion_tokens']:,} tokens, "
+                      f"~${consultation_usage['cost_usd']:.4f})")
+            else:
+                failures += 1
+                print(f"❌ [{len(latencies) + failures}/{total}] {item['id']} failed: {record['error']}")
+
+        await asyncio.gather(*[worker(item) for item in ideas])
+
+    return latencies, failures, usage
+
+
+def print_summary(latencies, failures, skipped, wall_time, usage=None):
+    """Throughput, latency and usage summary for the batch"""
+    completed = len(latencies)
+    print("\n--- Batch Summary ---")
+    print(f"Completed: {completed} | Failed: {failures} | Skipped (already done): {skipped}")
+    print(f"Wall time: {wall_time:.1f}s")
+    if completed:
+        print(f"Throughput: {completed / wall_time * 60:.2f} consultations/min")
+        print(f"Latency: mean {statistics.mean(latencies):.1f}s | "
+              f"p50 {percentile(latencies, 50):.1f}s | "
+              f"p95 {percentile(latencies, 95):.1f}s | "
+              f"max {max(latencies):.1f}s")
+    if usage and usage["llm_calls"]:
+        print(f"Usage: {format_usage(usage)}")
+        if completed:
+            print(f"Per consultation: ~${usage['cost_usd'] / completed:.4f}, "
+                  f"{(usage['prompt_tokens'] + usage['completion_tokens']) // completed:,} tokens")
+    print_rate_limit_stats()
+    print_hedging_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run startup consultations for a batch of business ideas")
+    parser.add_argument("input", help="JSONL or CSV file with business ideas")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file for transcripts and final reports")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum consultations running at once")
+    parser.add_argument("--id-field", default="id", help="Field holding the idea id")
+    parser.add_argument("--idea-field", default="idea", help="Field holding the business idea")
+    parser.add_argument("--recursion-limit", type=int, default=30, help="LangGraph recursion limit per consultation")
+    parser.add_argument("--checkpoint-path", default=BATCH_CHECKPOINT_PATH, help="SQLite file for the batch's checkpoints")
+    args = parser.parse_args()
+    # Read when the checkpointer is first opened, i.e. by the first consultation
+    os.environ["CHECKPOINT_PATH"] = args.checkpoint_path
+
+    ideas = load_ideas(args.input, args.id_field, args.idea_field)
+    completed_ids = load_completed_ids(args.output)
+    pending = [item for item in ideas if item["id"] not in completed_ids]
+    skipped = len(ideas) - len(pending)
+
+    print(f"[INFO] {len(ideas)} ideas loaded, {skipped} already completed, {len(pending)} to run "
+          f"(concurrency {args.concurrency})")
+
+    start = time.perf_counter()
+    latencies, failures, usage = asyncio.run(
+        run_batch(pending, args.output, args.concurrency, args.recursion_limit)
+    )
+    print_summary(latencies, failures, skipped, time.perf_counter() - start, usage)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-turn cost of the message state as conversations grow.
+
+Compares the old list state (`x + y` reducer plus the `all_messages` copy
+in the worker) with the append-only MessageLog and its views. Only the
+state bookkeeping is timed - no LLM, tools or embeddings.
+
+The second table runs the same turns through a compiled LangGraph graph,
+without and with the SQLite checkpointer (ConsultationSerializer), so
+the channel, reducer and checkpoint overhead of a real run is included.
+Inside the graph the per-step overhead (~0.3 ms) hides the reducer, and
+with checkpoints on the serializer writes the whole message list every
+step for both states - the MessageLog saving is in the worker's views,
+not in persistence.
+
+Usage:
+    python benchmarks/bench_message_log.py
+"""
+import operator
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import HumanMessage
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conversation.message_log import MessageLog, append_messages
+
+AGENTS = ["CEO", "CTO", "CFO", "COO"]
+CONVERSATION_LENGTHS = [100, 1000, 5000, 20000]
+GRAPH_CONVERSATION_LENGTHS = [100, 1000, 5000]
+MEASURED_TURNS = 200
+MEASURED_GRAPH_TURNS = 50
+
+
+def list_turn(messages, message):
+    """One turn with plain lists: worker copy, slicing helpers, `x + y` reducer"""
+    all_messages = messages + [message]
+    recent = all_messages[-3:]
+    context = [msg for msg in messages[-4:] if msg.name != message.name]
+    summary = {msg.name: msg for msg in all_messages[-8:] if msg.name in AGENTS}
+    return messages + [message], (recent, context, summary)
+
+
+def log_turn(messages, message):
+    """The same turn through MessageLog: views of the state, O(1) reducer"""
+    recent = [*messages.last(2), message]
+    context = [msg for msg in messages.last(4) if msg.name != message.name]
+    summary = {agent: messages.latest_from(agent, within=7) for agent in AGENTS}
+    summary[message.name] = message
+    return append_messages(messages, [message]), (recent, context, summary)
+
+
+def measure(turn_fn, initial, length):
+    """Grow a conversation to `length` messages, then time MEASURED_TURNS more turns"""
+    messages = initial
+    for i in range(length):
+        messages, _ = turn_fn(messages, HumanMessage(content=f"message {i}", name=AGENTS[i % 4]))
+
+    start = time.perf_counter()
+    for i in range(MEASURED_TURNS):
+        messages, _ = turn_fn(messages, HumanMessage(content=f"message {i}", name=AGENTS[i % 4]))
+    return (time.perf_counter() - start) / MEASURED_TURNS * 1e6
+
+
+def build_graph(reducer, checkpointer):
+    """Agents taking turns until MEASURED_GRAPH_TURNS more messages are in the state"""
+    from langgraph.graph import END, START, StateGraph
+
+    class State(TypedDict):
+        messages: Annotated[list, reducer]
+        target: int
+
+    def agent(state):
+        messages = state["messages"]
+        name = AGENTS[len(messages) % len(AGENTS)]
+        context = [msg for msg in messages[-4:] if msg.name != name]
+        return {"messages": [HumanMessage(content=f"message {len(messages)} after {len(context)}", name=name)]}
+
+    graph = StateGraph(State)
+    graph.add_node("agent", agent)
+    graph.add_edge(START, "agent")
+    graph.add_conditional_edges("agent", lambda state: END if len(state["messages"]) >= state["target"] else "agent")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def measure_graph(reducer, initial, checkpointed, length):
+    """µs per turn of a compiled graph continuing a conversation of `length` messages"""
+    from runtime.checkpoint import ThreadedSqliteSaver
+
+    messages = initial([HumanMessage(content=f"message {i}", name=AGENTS[i % 4]) for i in range(length)])
+    with tempfile.TemporaryDirectory() as scratch:
+        checkpointer = ThreadedSqliteSaver.open(Path(scratch) / "checkpoints.sqlite") if checkpointed else None
+        graph = build_graph(reducer, checkpointer)
+        config = {"recursion_limit": MEASURED_GRAPH_TURNS + 10, "configurable": {"thread_id": "bench"}}
+        start = time.perf_counter()
+        graph.invoke({"messages": messages, "target": length + MEASURED_GRAPH_TURNS}, config=config)
+        return (time.perf_counter() - start) / MEASURED_GRAPH_TURNS * 1e6
+
+
+def main():
+    print(f"{'messages':>10} | {'list µs/turn':>14} | {'MessageLog µs/turn':>20}")
+    for length in CONVERSATION_LENGTHS:
+        list_cost = measure(list_turn, [], length)
+        log_cost = measure(log_turn, MessageLog(), length)
+        print(f"{length:>10} | {list_cost:>14.1f} | {log_cost:>20.1f}")
+
+    print()
+    print(f"{'graph, messages':>16} | {'list µs/turn':>14} | {'MessageLog µs/turn':>20} | checkpoints")
+    for checkpointed in (False, True):
+        for length in GRAPH_CONVERSATION_LENGTHS:
+            list_cost = measure_graph(operator.add, list, checkpointed, length)
+            log_cost = measure_graph(append_messages, MessageLog, checkpointed, length)
+            print(f"{length:>16} | {list_cost:>14.1f} | {log_cost:>20.1f} | {'on' if checkpointed else 'off'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite: full consultations, RAG retrieval and knowledge-base builds.
+
+OpenAI chat and embeddings, Tavily and sentence-transformers are replaced
+by the deterministic fakes in benchmarks/fakes.py with configurable
+latencies, so it runs on a laptop without API keys or network access.
+Everything else - the compiled graph, agent executors, search cache, RAG
+manager and knowledge-base builder - is the real code.
+
+Reports wall-clock time, LLM calls (and how many asked for a tool),
+Tavily searches, embedding calls, graph steps and peak Python memory
+(tracemalloc) per scenario. Latencies are "median" or "median:p95" in ms.
+Imports, graph compilation and index loading happen before the timed
+runs - bench_startup.py measures those. tracemalloc slows down Python
+code, so compare wall times only between runs of this suite.
+
+With --cassette the sync and async scenarios instead replay the
+consultations recorded with CASSETTE_MODE=record (real OpenAI and Tavily
+responses, see runtime/cassette.py), optionally with the recorded
+latencies. Record with LLM_CACHE_ENABLED=false and without
+SEARCH_CACHE_PATH, so every call is in the cassette.
+
+Usage:
+    python benchmarks/bench_offline.py [--scenarios sync,async,rag,build]
+        [--consultations 3] [--concurrency 5] [--llm-latency 300:900]
+        [--tool-latency 400:1200] [--embedding-latency 20:60] [--tool-call-rate 0.5]
+        [--tokens-per-second 0] [--seed 0] [--json results.json]
+    python benchmarks/bench_offline.py --cassette .cache/cassette.json.gz
+        [--cassette-latency recorded|<ms>] [--scenarios sync,async]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SRC_DIR / "knowledge_system"))
+
+from benchmarks.fakes import FakeBackend, LatencyModel, install_fakes
+
+IDEAS = [
+    "A subscription app for dog walkers in Berlin",
+    "B2B invoicing automation for small construction firms",
+    "A marketplace for refurbished lab equipment",
+    "AI tutoring for high-school chemistry",
+    "Same-day repair service for e-bikes",
+    "Carbon accounting SaaS for logistics companies",
+    "A meal-kit service for people with food allergies",
+    "Peer-to-peer rental of camping gear"
+]
+RAG_QUERIES = [
+    "market opportunity and competition", "funding requirements and runway",
+    "MVP technology stack", "hiring and go-to-market plan"
+]
+SCENARIOS = ["sync", "async", "rag", "build"]
+
+
+class CassetteCounters:
+    """Replayed and missing requests per scenario, in place of the fake backend's counters"""
+
+    def __init__(self, cassette):
+        self.cassette = cassette
+        self.reset()
+
+    def reset(self):
+        self.start = self.cassette.stats()
+
+    def snapshot(self):
+        stats = self.cassette.stats()
+        return {key: stats[key] - self.start[key] for key in ("replayed", "misses")}
+
+
+def measure(name, fake_backend, run):
+    """Run one scenario; run() returns the number of graph steps (or None)"""
+    fake_backend.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    steps = run()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"scenario": name, "wall_s": wall, "steps": steps, "peak_mb": peak / 2**20, **fake_backend.snapshot()}
+
+
+def warm_up(scenarios):
+    """Import and build everything the scenarios share outside the measurements"""
+    if {"sync", "async"} & set(scenarios):
+        import main_v6
+        main_v6.build_app()
+        main_v6.build_app({"async_execution": True})
+        main_v6.get_rag_knowledge_manager()
+        main_v6.get_embedding_service()
+    if "rag" in scenarios:
+        import knowledge_manager
+    if "build" in scenarios:
+        import knowledge_builder
+
+
+def idea_requests(count, first_idea=0):
+    import main_v6
+    return [main_v6.create_consultation_request(IDEAS[(first_idea + index) % len(IDEAS)]) for index in range(count)]
+
+
+def run_sync_consultations(requests):
+    import main_v6
+
+    app = main_v6.build_app()
+    steps = 0
+    for request in requests:
+        state = main_v6.create_initial_state(request)
+        config = main_v6.consultation_config(main_v6.new_consultation_id())
+        steps += sum(1 for _ in app.stream(state, config=config, stream_mode="updates"))
+    return steps
+
+
+def run_async_consultations(requests):
+    import main_v6
+
+    app = main_v6.build_app({"async_execution": True})
+
+    async def consultation(request):
+        state = main_v6.create_initial_state(request)
+        config = main_v6.consultation_config(main_v6.new_consultation_id())
+        return sum([1 async for _ in app.astream(state, config=config, stream_mode="updates")])
+
+    async def run_all():
+        return sum(await asyncio.gather(*[consultation(request) for request in requests]))
+
+    return asyncio.run(run_all())
+
+
+def run_rag_lookups():
+    from knowledge_manager import RAGKnowledgeManager
+
+    manager = RAGKnowledgeManager()
+    for idea in IDEAS:
+        for agent in ["CEO", "CFO", "CTO", "COO"]:
+            for query in RAG_QUERIES:
+                manager.rag_generate_context(agent, idea, query)
+    return None
+
+
+def run_knowledge_build():
+    """Build all four knowledge bases into a scratch copy, leaving the stored indexes untouched"""
+    from knowledge_builder import KnowledgeBaseBuilder
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        base_path = Path(scratch) / "knowledge_system"
+        shutil.copytree(SRC_DIR / "knowledge_system" / "data_sources", base_path / "data_sources")
+        os.chdir(scratch)
+        try:
+            builder = KnowledgeBaseBuilder()
+            builder.base_path = base_path
+            builder.build_all_knowledge_bases()
+        finally:
+            os.chdir(cwd)
+    return None
+
+
+def print_results(results):
+    if results and "replayed" in results[0]:
+        print(f"\n{'scenario':<10} {'wall s':>8} {'replayed':>9} {'misses':>7} {'steps':>6} {'peak MB':>8}")
+    else:
+        print(f"\n{'scenario':<10} {'wall s':>8} {'LLM calls':>10} {'tool reqs':>10} {'searches':>9} "
+              f"{'embeds':>7} {'steps':>6} {'peak MB':>8}")
+    for row in results:
+        steps = row["steps"] if row["steps"] is not None else "-"
+        if "replayed" in row:
+            print(f"{row['scenario']:<10} {row['wall_s']:>8.2f} {row['replayed']:>9} {row['misses']:>7} "
+                  f"{steps:>6} {row['peak_mb']:>8.1f}")
+            continue
+        print(f"{row['scenario']:<10} {row['wall_s']:>8.2f} {row['llm_calls']:>10} {row['llm_tool_requests']:>10} "
+              f"{row['searches']:>9} {row['embedding_calls']:>7} {steps:>6} {row['peak_mb']:>8.1f}")
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    print(f"\nProcess peak RSS: {max_rss / (2**20 if sys.platform == 'darwin' else 2**10):.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with fake LLM, search and embeddings")
+    parser.add_argument("--scenarios", help=f"Comma-separated subset of {SCENARIOS} (default: all, sync,async with --cassette)")
+    parser.add_argument("--consultations", type=int, default=3, help="Sequential consultations in the sync scenario")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent consultations in the async scenario")
+    parser.add_argument("--llm-latency", default="300:900", help="Time to first token, ms (median or median:p95)")
+    parser.add_argument("--tool-latency", default="400:1200", help="Tavily request latency, ms")
+    parser.add_argument("--embedding-latency", default="20:60", help="Embedding call latency, ms")
+    parser.add_argument("--tool-call-rate", type=float, default=0.5, help="Share of agent LLM calls that request a search")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="Generation speed after the first token (0 = instant)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the latency samples")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--cassette", help="Replay the consultations recorded in this cassette instead of using fakes")
+    parser.add_argument("--cassette-latency", help='Replay delay: "recorded" or ms per response (default: instant)')
+    args = parser.parse_args()
+
+    default_scenarios = "sync,async" if args.cassette else ",".join(SCENARIOS)
+    scenarios = [name.strip() for name in (args.scenarios or default_scenarios).split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.cassette:
+        os.environ["CASSETTE_MODE"] = "replay"
+        os.environ["CASSETTE_PATH"] = args.cassette
+        if args.cassette_latency:
+            os.environ["CASSETTE_LATENCY"] = args.cassette_latency
+        # The clients check for keys before any request is made
+        os.environ.setdefault("OPENAI_API_KEY", "cassette-replay")
+        os.environ.setdefault("TAVILY_API_KEY", "cassette-replay")
+        from runtime.cassette import get_cassette
+        cassette = get_cassette()
+        if not cassette.consultations:
+            parser.error(f"{args.cassette} holds no recorded consultations")
+        counters = CassetteCounters(cassette)
+        sync_requests = async_requests = lambda: cassette.consultations
+        sync_count = async_count = len(cassette.consultations)
+    else:
+        counters = install_fakes(FakeBackend(
+            llm_latency=LatencyModel.parse(args.llm_latency, args.seed),
+            tool_latency=LatencyModel.parse(args.tool_latency, args.seed + 1),
+            embedding_latency=LatencyModel.parse(args.embedding_latency, args.seed + 2),
+            tool_call_rate=args.tool_call_rate,
+            tokens_per_second=args.tokens_per_second
+        ))
+        sync_requests = lambda: idea_requests(args.consultations)
+        # Other ideas than the sync runs, so the process-wide search cache gives them no head start
+        async_requests = lambda: idea_requests(args.concurrency, args.consultations)
+        sync_count, async_count = args.consultations, args.concurrency
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Fresh caches and checkpoints, so earlier runs cannot turn calls into hits
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["CHECKPOINT_PATH"] = str(Path(scratch) / "checkpoints.sqlite")
+        os.environ.pop("SEARCH_CACHE_PATH", None)
+
+        runs = {
+            "sync": (f"sync x{sync_count}", lambda: run_sync_consultations(sync_requests())),
+            "async": (f"async x{async_count}", lambda: run_async_consultations(async_requests())),
+            "rag": ("rag", run_rag_lookups),
+            "build": ("build", run_knowledge_build)
+        }
+        warm_up(scenarios)
+        results = []
+        for scenario in scenarios:
+            label, run = runs[scenario]
+            print(f"⏱️ Running {label}...")
+            results.append(measure(label, counters, run))
+
+    print_results(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
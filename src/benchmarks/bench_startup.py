@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Startup benchmark: cold import time of main_v6 and time-to-first-turn.
+
+Every measurement runs in a fresh interpreter. Time-to-first-turn makes
+real OpenAI/Tavily calls, so it is skipped unless OPENAI_API_KEY and
+TAVILY_API_KEY are set.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SRC_DIR = Path(__file__).parent.parent
+
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import main_v6
+print(json.dumps({"import": time.perf_counter() - start}))
+"""
+
+FIRST_TURN_PROBE = """
+import json, time
+start = time.perf_counter()
+import main_v6
+imported = time.perf_counter()
+app = main_v6.build_app()
+built = time.perf_counter()
+state = main_v6.create_initial_state(main_v6.create_consultation_request("A subscription app for dog walkers"))
+config = main_v6.consultation_config(main_v6.new_consultation_id())
+for output in app.stream(state, config=config):
+    if any(value and value.get("messages") for value in output.values()):
+        break
+first_turn = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "build_app": built - imported,
+    "first_turn": first_turn - built,
+    "total": first_turn - start
+}))
+"""
+
+
+def run_probe(code):
+    """Run a probe in a fresh interpreter, returns the timings it reports"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    # The probe prints its timings last; anything before is application output
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(label, values):
+    print(f"{label:<22} median {statistics.median(values):7.3f}s | min {min(values):7.3f}s | max {max(values):7.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure main_v6 startup cost")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print(f"⏱️ Cold import of main_v6 ({args.runs} runs)")
+    summarize("import main_v6", [run_probe(IMPORT_PROBE)["import"] for _ in range(args.runs)])
+
+    load_dotenv()
+    if not (os.getenv("OPENAI_API_KEY") and os.getenv("TAVILY_API_KEY")):
+        print("⚠️ OPENAI_API_KEY / TAVILY_API_KEY not set - skipping time-to-first-turn")
+        return
+
+    print(f"\n⏱️ Time to first turn ({args.runs} runs, live API calls)")
+    timings = [run_probe(FIRST_TURN_PROBE) for _ in range(args.runs)]
+    for key, label in [("import", "import main_v6"), ("build_app", "build_app()"),
+                       ("first_turn", "first agent message"), ("total", "total")]:
+        summarize(label, [timing[key] for timing in timings])
+
+
+if __name__ == "__main__":
+    main()
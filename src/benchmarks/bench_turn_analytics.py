@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-turn CPU cost of the worker bookkeeping.
+
+Compares recomputing the business idea, conversation quality and context
+summary from the message list on every turn with the incremental state
+kept by conversation.analytics. Both must produce identical values.
+
+Usage:
+    python benchmarks/bench_turn_analytics.py
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conversation.analytics import (
+    calculate_conversation_quality, create_context_summary, extract_business_idea,
+    update_agent_snippets, update_quality_window
+)
+
+AGENTS = ["CEO", "CTO", "CFO", "COO"]
+WORDS = ("market funding revenue architecture hiring timeline strategy customers scalability "
+         "burn rate roadmap valuation team execution MVP users budget pricing churn").split()
+REQUEST = ("Analyze the following business idea and provide comprehensive consultation with "
+           "data-driven insights. Business Idea: a subscription app for dog walkers in Berlin")
+TURNS = 12
+CONSULTATIONS = 300
+
+
+def recompute_business_idea(messages):
+    """Previous behaviour: several uncompiled regexes over the first message, every call"""
+    initial_message = messages[0].content
+    for pattern in [r"Business Idea:\s*(.+?)(?:\n|$)", r"business idea[:\s]+(.+?)(?:\n|$)",
+                    r"Analyze.*?:\s*(.+?)(?:\n|$)", r"consultation[:\s]+(.+?)(?:\n|$)"]:
+        match = re.search(pattern, initial_message, re.IGNORECASE | re.DOTALL)
+        if match:
+            return match.group(1).strip()
+    return initial_message[:200].strip()
+
+
+def recompute_quality(messages, message_count):
+    if message_count <= 5:
+        return 1.0
+    recent_content = [msg.content for msg in messages[-3:]]
+    avg_length = sum(len(content) for content in recent_content) / len(recent_content)
+    unique_words = set()
+    for content in recent_content:
+        unique_words.update(content.lower().split())
+    return (min(avg_length / 500, 1.0) * 0.4 + min(len(unique_words) / 50, 1.0) * 0.4
+            + max(0.3, 1.0 - (message_count - 5) * 0.08) * 0.2)
+
+
+def recompute_summary(messages, business_idea):
+    if len(messages) <= 5:
+        return f"Analyzing business idea: {business_idea}"
+    agent_contributions = {agent: [] for agent in AGENTS}
+    for msg in messages[-8:]:
+        if msg.name in agent_contributions:
+            agent_contributions[msg.name].append(msg.content[:100] + "..." if len(msg.content) > 100 else msg.content)
+    return " | ".join([f"Business: {business_idea}"] + [
+        f"{agent}: {contributions[-1]}" for agent, contributions in agent_contributions.items() if contributions
+    ])
+
+
+def recompute_turn(state, name, content):
+    messages = state["messages"]
+    all_messages = messages + [HumanMessage(content=content, name=name)]
+    recompute_business_idea(messages)  # RAG lookup
+    count = state["message_count"] + 1
+    return {
+        "messages": all_messages,
+        "message_count": count,
+        "conversation_quality": recompute_quality(all_messages, count),
+        "context_summary": recompute_summary(all_messages, recompute_business_idea(messages))
+    }
+
+
+def incremental_turn(state, name, content):
+    messages = state["messages"]
+    count = state["message_count"] + 1
+    quality_window = update_quality_window(state["quality_window"], content)
+    agent_snippets = update_agent_snippets(state["agent_snippets"], name, content, len(messages))
+    return {
+        "messages": messages + [HumanMessage(content=content, name=name)],
+        "message_count": count,
+        "quality_window": quality_window,
+        "agent_snippets": agent_snippets,
+        "business_idea": state["business_idea"],
+        "conversation_quality": calculate_conversation_quality(quality_window, count),
+        "context_summary": create_context_summary(agent_snippets, state["business_idea"], len(messages) + 1)
+    }
+
+
+def make_responses(seed):
+    rnd = random.Random(seed)
+    return [
+        (AGENTS[i % 4], " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(40, 400))))
+        for i in range(TURNS)
+    ]
+
+
+def initial_state():
+    return {
+        "messages": [HumanMessage(content=REQUEST)],
+        "message_count": 0,
+        "quality_window": [],
+        "agent_snippets": {},
+        "business_idea": extract_business_idea(REQUEST)
+    }
+
+
+def run(turn_fn, conversations):
+    """Returns (microseconds of bookkeeping per turn, final states)"""
+    elapsed = 0.0
+    finals = []
+    for responses in conversations:
+        state = initial_state()
+        for name, content in responses:
+            start = time.perf_counter()
+            state = turn_fn(state, name, content)
+            elapsed += time.perf_counter() - start
+        finals.append(state)
+    return elapsed / (len(conversations) * TURNS) * 1e6, finals
+
+
+def main():
+    conversations = [make_responses(seed) for seed in range(CONSULTATIONS)]
+    recompute_cost, recompute_states = run(recompute_turn, conversations)
+    incremental_cost, incremental_states = run(incremental_turn, conversations)
+
+    for old, new in zip(recompute_states, incremental_states):
+        assert old["conversation_quality"] == new["conversation_quality"]
+        assert old["context_summary"] == new["context_summary"]
+
+    print(f"{CONSULTATIONS} consultations x {TURNS} turns (results identical)")
+    print(f"Recompute from messages: {recompute_cost:8.1f} µs/turn")
+    print(f"Incremental state:       {incremental_cost:8.1f} µs/turn")
+
+
+if __name__ == "__main__":
+    main()
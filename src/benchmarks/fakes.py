@@ -0,0 +1,286 @@
+"""Deterministic offline stand-ins for OpenAI, Tavily and sentence-transformers.
+
+install_fakes() swaps them in where the application looks its clients up
+(langchain_openai.ChatOpenAI / OpenAIEmbeddings, the TavilySearch API
+wrapper's requests and the sentence_transformers module), so the real graph, agent
+executors, search cache and RAG code run unchanged without network access.
+Call it before importing main_v6 or the knowledge_system modules.
+
+Responses and vectors are derived from a hash of their input, so a run is
+repeatable; only the simulated latencies are random (seeded log-normal).
+"""
+import asyncio
+import hashlib
+import math
+import os
+import random
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, FunctionMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+WORDS = ("market funding revenue architecture hiring timeline strategy customers scalability burn "
+         "rate roadmap valuation team execution MVP users budget pricing churn retention margin "
+         "compliance partnerships onboarding infrastructure acquisition runway logistics").split()
+BOARD = ["Sarah", "Mike", "Jennifer", "Tom"]
+
+
+class LatencyModel:
+    """Log-normal latency given its median and p95 in milliseconds"""
+
+    def __init__(self, median_ms, p95_ms=None, seed=0):
+        self.median = median_ms / 1000
+        p95_ms = p95_ms if p95_ms is not None else median_ms
+        self.sigma = math.log(p95_ms / median_ms) / 1.645 if median_ms and p95_ms > median_ms else 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=0):
+        """"300" (fixed) or "300:900" (median:p95), in milliseconds"""
+        median, _, p95 = str(spec).partition(":")
+        return cls(float(median), float(p95) if p95 else None, seed)
+
+    def sample(self):
+        if not self.median:
+            return 0.0
+        with self._lock:
+            return self.median * math.exp(self._random.gauss(0, self.sigma)) if self.sigma else self.median
+
+
+class FakeBackend:
+    """Latency models and call counters shared by all fakes of a benchmark run"""
+
+    def __init__(self, llm_latency=None, tool_latency=None, embedding_latency=None,
+                 tool_call_rate=0.5, tokens_per_second=0.0, response_words=150):
+        self.llm_latency = llm_latency or LatencyModel(0)
+        self.tool_latency = tool_latency or LatencyModel(0)
+        self.embedding_latency = embedding_latency or LatencyModel(0)
+        self.tool_call_rate = tool_call_rate
+        self.tokens_per_second = tokens_per_second
+        self.response_words = response_words
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"llm_calls": 0, "llm_tool_requests": 0, "searches": 0, "embedding_calls": 0}
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.counts[key] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+backend = FakeBackend()
+
+
+def _seed(*parts):
+    return int(hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()[:16], 16)
+
+
+def _text(message):
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _wants_final_report(messages):
+    return any(
+        isinstance(message, HumanMessage) and "final report" in _text(message).lower()
+        for message in messages[-4:]
+    )
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatOpenAI stand-in: deterministic replies, OpenAI function calls and token streaming.
+
+    Accepts (and ignores) ChatOpenAI's constructor arguments; cache,
+    streaming and the fields of subclasses (such as the hedging policy of
+    runtime/hedging.py) are honoured, so those code paths run."""
+
+    model_name: str = "fake-chat"
+    streaming: bool = False
+
+    def __init__(self, **kwargs):
+        own_fields = set(type(self).model_fields) - set(BaseChatModel.model_fields) - {"model_name"}
+        super().__init__(**{key: value for key, value in kwargs.items() if key in {"cache", *own_fields}})
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _reply(self, messages, functions):
+        """(content, function_call or None, token count) for a prompt"""
+        rng = random.Random(_seed(*(_text(message) for message in messages)))
+        backend.count("llm_calls")
+
+        answered_tool = isinstance(messages[-1], (FunctionMessage, ToolMessage)) if messages else False
+        if functions and not answered_tool and rng.random() < backend.tool_call_rate:
+            backend.count("llm_tool_requests")
+            query = " ".join(rng.choice(WORDS) for _ in range(4))
+            function = rng.choice(functions)
+            return "", {"name": function["name"], "arguments": f'{{"query": "{query}"}}'}, 12
+
+        words = [rng.choice(WORDS) for _ in range(backend.response_words)]
+        content = f"{rng.choice(BOARD)}, how would {' '.join(words[:6])} change your plan? " + " ".join(words[6:]) + "."
+        if _wants_final_report(messages):
+            content = "FINAL REPORT:\n## Executive Summary\n" + content
+        return content, None, len(content) // 4
+
+    def _result(self, messages, content, function_call, tokens):
+        message = AIMessage(
+            content=content,
+            additional_kwargs={"function_call": function_call} if function_call else {},
+            usage_metadata={
+                "input_tokens": sum(len(_text(message)) // 4 for message in messages),
+                "output_tokens": tokens,
+                "total_tokens": sum(len(_text(message)) // 4 for message in messages) + tokens
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _pace(self, tokens):
+        return tokens / backend.tokens_per_second if backend.tokens_per_second else 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, functions=None, **kwargs):
+        content, function_call, tokens = self._reply(messages, functions)
+        time.sleep(backend.llm_latency.sample() + self._pace(tokens))
+        return self._result(messages, content, function_call, tokens)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, functions=None, **kwargs):
+        content, function_call, tokens = self._reply(messages, functions)
+        await asyncio.sleep(backend.llm_latency.sample() + self._pace(tokens))
+        return self._result(messages, content, function_call, tokens)
+
+    def _chunks(self, content, function_call):
+        if function_call:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", additional_kwargs={"function_call": function_call}))
+            return
+        for word in content.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    def _stream(self, messages, stop=None, run_manager=None, functions=None, **kwargs):
+        content, function_call, tokens = self._reply(messages, functions)
+        time.sleep(backend.llm_latency.sample())
+        for chunk in self._chunks(content, function_call):
+            if backend.tokens_per_second:
+                time.sleep(self._pace(1))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, functions=None, **kwargs):
+        content, function_call, tokens = self._reply(messages, functions)
+        await asyncio.sleep(backend.llm_latency.sample())
+        for chunk in self._chunks(content, function_call):
+            if backend.tokens_per_second:
+                await asyncio.sleep(self._pace(1))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def fake_vector(text, size):
+    """Unit-length pseudo-random vector determined by the text"""
+    vector = np.random.default_rng(_seed(text)).standard_normal(size).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeEmbeddings(Embeddings):
+    """OpenAIEmbeddings stand-in (1536 dimensions, so the stored FAISS indexes load)"""
+
+    def __init__(self, size=1536, **ignored):
+        self.size = size
+
+    def embed_documents(self, texts):
+        backend.count("embedding_calls")
+        time.sleep(backend.embedding_latency.sample())
+        return [fake_vector(text, self.size).tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        backend.count("embedding_calls")
+        await asyncio.sleep(backend.embedding_latency.sample())
+        return [fake_vector(text, self.size).tolist() for text in texts]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeSentenceTransformer:
+    """SentenceTransformer stand-in used for repetition detection (one latency sample per batch)"""
+
+    def __init__(self, model_name_or_path=None, size=384, **ignored):
+        self.size = size
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        backend.count("embedding_calls")
+        time.sleep(backend.embedding_latency.sample())
+        vectors = np.stack([fake_vector(text, self.size) for text in texts])
+        return vectors[0] if single else vectors
+
+
+def fake_search_results(query, max_results):
+    rng = random.Random(_seed(query))
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": f"{query.title()} report {index + 1}",
+                "url": f"https://example.com/{_seed(query, index) % 100000}",
+                "content": " ".join(rng.choice(WORDS) for _ in range(60)),
+                "score": round(1 - index * 0.1, 2)
+            }
+            for index in range(max_results or 5)
+        ]
+    }
+
+
+def fake_raw_results(self, query, max_results=5, *args, **kwargs):
+    """TavilySearchAPIWrapper.raw_results replacement"""
+    backend.count("searches")
+    time.sleep(backend.tool_latency.sample())
+    return fake_search_results(query, max_results)
+
+
+async def fake_raw_results_async(self, query, max_results=5, *args, **kwargs):
+    """TavilySearchAPIWrapper.raw_results_async replacement"""
+    backend.count("searches")
+    await asyncio.sleep(backend.tool_latency.sample())
+    return fake_search_results(query, max_results)
+
+
+def install_fakes(fake_backend=None):
+    """Route every OpenAI, Tavily and sentence-transformers client through the fakes"""
+    global backend
+    if fake_backend is not None:
+        backend = fake_backend
+    # The real clients check for keys before any request is made
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+
+    import langchain_openai
+    langchain_openai.ChatOpenAI = FakeChatModel
+    langchain_openai.OpenAIEmbeddings = FakeEmbeddings
+
+    # TavilySearch creates its wrapper from a default factory bound at import, so the requests are replaced on the class
+    from langchain_tavily._utilities import TavilySearchAPIWrapper
+    TavilySearchAPIWrapper.raw_results = fake_raw_results
+    TavilySearchAPIWrapper.raw_results_async = fake_raw_results_async
+
+    sentence_transformers = types.ModuleType("sentence_transformers")
+    sentence_transformers.SentenceTransformer = FakeSentenceTransformer
+    sys.modules["sentence_transformers"] = sentence_transformers
+    return backend
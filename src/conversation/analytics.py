@@ -0,0 +1,91 @@
+import re
+
+SUMMARY_AGENTS = ["CEO", "CTO", "CFO", "COO"]
+QUALITY_WINDOW = 3    # messages scored by calculate_conversation_quality
+SUMMARY_WINDOW = 8    # messages an agent's latest contribution must fall within
+
+BUSINESS_IDEA_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in [
+        r"Business Idea:\s*(.+?)(?:\n|$)",
+        r"business idea[:\s]+(.+?)(?:\n|$)",
+        r"Analyze.*?:\s*(.+?)(?:\n|$)",
+        r"consultation[:\s]+(.+?)(?:\n|$)"
+    ]
+]
+
+
+def extract_business_idea(request):
+    """Extract the business idea from the initial user request"""
+    for pattern in BUSINESS_IDEA_PATTERNS:
+        match = pattern.search(request)
+        if match:
+            return match.group(1).strip()
+    return request[:200].strip()
+
+
+def extract_business_idea_from_messages(messages):
+    """Extract business idea from initial messages"""
+    if not messages:
+        return ""
+    return extract_business_idea(messages[0].content)
+
+
+def get_business_idea(state):
+    """Business idea parsed once into state (falls back to parsing the first message)"""
+    business_idea = state.get("business_idea")
+    if business_idea is None:
+        business_idea = extract_business_idea_from_messages(state.get("messages", []))
+    return business_idea
+
+
+# --- Conversation quality ---
+def update_quality_window(window, content):
+    """Add a response's length and word set to the rolling window of the last QUALITY_WINDOW messages"""
+    entry = {"length": len(content), "words": list(set(content.lower().split()))}
+    return (list(window or []) + [entry])[-QUALITY_WINDOW:]
+
+
+def calculate_conversation_quality(window, message_count):
+    """Enhanced conversation quality calculation from the rolling quality window"""
+    if message_count <= 5:
+        return 1.0
+
+    if not window:
+        return 0.5
+
+    # Check content variety
+    avg_length = sum(entry["length"] for entry in window) / len(window)
+    unique_words = set()
+    for entry in window:
+        unique_words.update(entry["words"])
+
+    length_quality = min(avg_length / 500, 1.0)
+    variety_quality = min(len(unique_words) / 50, 1.0)
+    count_penalty = max(0.3, 1.0 - (message_count - 5) * 0.08)
+
+    return (length_quality * 0.4 + variety_quality * 0.4 + count_penalty * 0.2)
+
+
+# --- Rolling summary ---
+def update_agent_snippets(snippets, name, content, position):
+    """Remember the latest contribution of each agent and where it sits in the message list"""
+    updated = dict(snippets or {})
+    if name in SUMMARY_AGENTS:
+        snippet = content[:100] + "..." if len(content) > 100 else content
+        updated[name] = {"position": position, "snippet": snippet}
+    return updated
+
+
+def create_context_summary(snippets, business_idea, total_messages):
+    """Create rolling summary of conversation from the per-agent snippets"""
+    if total_messages <= 5:
+        return f"Analyzing business idea: {business_idea}"
+
+    summary_parts = [f"Business: {business_idea}"]
+    for agent in SUMMARY_AGENTS:
+        latest = (snippets or {}).get(agent)
+        # Only agents who spoke within the last SUMMARY_WINDOW messages
+        if latest and latest["position"] >= total_messages - SUMMARY_WINDOW:
+            summary_parts.append(f"{agent}: {latest['snippet']}")
+
+    return " | ".join(summary_parts)
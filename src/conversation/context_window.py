@@ -0,0 +1,143 @@
+import re
+import hashlib
+import functools
+
+from langchain_core.messages import HumanMessage
+
+from runtime.lazy import lazy_component
+
+KEEP_TURNS = 6            # most recent messages always sent verbatim (budget permitting); older ones are summarized this many at a time
+SUMMARY_SNIPPET_CHARS = 200
+MESSAGE_OVERHEAD_TOKENS = 4  # role/name framing the chat format adds per message
+
+
+@lazy_component
+def _get_encoder():
+    """tiktoken encoder for the chat models, or None if tiktoken (or its encoding file) is unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text):
+    """Token count of a string; falls back to ~4 characters per token without tiktoken"""
+    encoder = _get_encoder()
+    if encoder is None:
+        return len(text) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message):
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def count_prompt_tokens(messages):
+    return sum(count_message_tokens(message) for message in messages)
+
+
+def summarize_messages(messages, token_limit):
+    """One compact message with the opening sentence of each older turn, newest kept first if space runs out"""
+    lines = []
+    used = MESSAGE_OVERHEAD_TOKENS + count_tokens("Earlier in the discussion:")
+    for message in reversed(messages):
+        first_sentence = re.split(r"(?<=[.!?])\s", message.content.strip(), maxsplit=1)[0]
+        line = f"- {message.name or 'user'}: {first_sentence[:SUMMARY_SNIPPET_CHARS]}"
+        cost = count_tokens(line) + 1
+        if used + cost > token_limit:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return None
+    lines.append("Earlier in the discussion:")
+    return HumanMessage(content="\n".join(reversed(lines)), name="earlier_discussion")
+
+
+def compaction_boundary(message_count, keep_turns):
+    """How many messages after the first one are folded into the summary.
+
+    The boundary moves keep_turns messages at a time, so between keep_turns
+    and 2 * keep_turns - 1 recent messages stay verbatim. In between two
+    moves a prompt only grows at its end, which keeps its prefix
+    byte-identical from turn to turn for the provider's prompt cache."""
+    if keep_turns <= 0:
+        return max(0, message_count - 1)
+    older = message_count - 1 - keep_turns
+    return max(0, older // keep_turns * keep_turns)
+
+
+def sliding_window(messages, extra_messages, token_budget, keep_turns, summary_tokens):
+    """Fallback when the stable layout does not fit: as many recent messages as the budget allows"""
+    first = messages[0]
+    available = token_budget - count_message_tokens(first) - count_prompt_tokens(extra_messages)
+
+    recent = []
+    for message in reversed(messages[max(1, len(messages) - keep_turns):]):
+        cost = count_message_tokens(message)
+        if recent and cost > available:
+            break
+        recent.append(message)
+        available -= cost
+    recent.reverse()
+
+    older = messages[1:len(messages) - len(recent)]
+    summary = summarize_messages(older, min(summary_tokens, available)) if older else None
+    return [first, *([summary] if summary else []), *recent], len(older)
+
+
+def fit_context_window(messages, extra_messages, token_budget, keep_turns=KEEP_TURNS, summary_tokens=500):
+    """Bound the prompt of an agent turn.
+
+    Keeps the first (user) message and the extra messages of this turn;
+    older messages are folded into one summary message in steps of
+    keep_turns (see compaction_boundary), the rest are sent verbatim. The
+    extra messages go last, so the first message, summary and transcript
+    form a prefix that is identical across turns. Over token_budget the
+    boundary moves further in the same steps; only if that is not enough,
+    recent messages are dropped oldest first (the latest one is always
+    kept). Returns (prompt_messages, stats)."""
+    if len(messages) <= 1:
+        prompt = [*messages, *extra_messages]
+        return prompt, {"prompt_tokens": count_prompt_tokens(prompt), "compacted": 0}
+
+    extra_tokens = count_prompt_tokens(extra_messages)
+    boundary = 1 + compaction_boundary(len(messages), keep_turns)
+    while True:
+        older = messages[1:boundary]
+        summary = summarize_messages(older, summary_tokens) if older else None
+        transcript = [messages[0], *([summary] if summary else []), *messages[boundary:]]
+        compacted = len(older)
+        if count_prompt_tokens(transcript) + extra_tokens <= token_budget:
+            break
+        # Over budget: fold another step of keep_turns messages, the latest one stays verbatim
+        if keep_turns <= 0 or boundary + keep_turns > len(messages) - 1:
+            transcript, compacted = sliding_window(messages, extra_messages, token_budget, keep_turns, summary_tokens)
+            break
+        boundary += keep_turns
+
+    prompt = [*transcript, *extra_messages]
+    return prompt, {"prompt_tokens": count_prompt_tokens(prompt), "compacted": compacted}
+
+
+def message_digest(message):
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return hashlib.md5(f"{message.type}\x1f{message.name}\x1f{content}".encode("utf-8")).hexdigest()[:12]
+
+
+def prompt_digests(messages):
+    """Per-message fingerprints of a prompt, to compare it with the agent's next one"""
+    return [message_digest(message) for message in messages]
+
+
+def shared_prefix_tokens(previous_digests, messages):
+    """Tokens of the leading messages identical to the previous prompt - what a provider prefix cache can reuse"""
+    tokens = 0
+    for digest, message in zip(previous_digests or [], messages):
+        if digest != message_digest(message):
+            break
+        tokens += count_message_tokens(message)
+    return tokens
@@ -0,0 +1,176 @@
+import re
+from pathlib import Path
+
+DEFAULT_TOPIC_KEYWORDS = {
+    "technical": ["technology", "tech stack", "architecture", "development", "MVP", "scalability"],
+    "financial": ["budget", "funding", "revenue", "costs", "financial", "money", "valuation", "burn rate"],
+    "market": ["market", "competition", "customers", "users", "TAM", "SAM", "competitive analysis"],
+    "operations": ["operations", "hiring", "timeline", "execution", "team", "go-to-market"],
+    "strategy": ["strategy", "vision", "goals", "planning", "roadmap", "business model"]
+}
+
+DEFAULT_AGENT_NAMES = {
+    "CEO": ["Sarah", "CEO"],
+    "CTO": ["Mike", "CTO"],
+    "CFO": ["Jennifer", "CFO"],
+    "COO": ["Tom", "COO"]
+}
+
+DEFAULT_REPORT_INDICATORS = [
+    "FINAL REPORT:",
+    "FINAL REPORT ",
+    "EXECUTIVE SUMMARY",
+    "## EXECUTIVE SUMMARY",
+    "**FINAL RECOMMENDATION**",
+    "FINAL RECOMMENDATION:"
+]
+
+
+def _trie_pattern(literals):
+    """Regex for a set of literals with shared prefixes factored out, e.g.
+    ["team", "tech stack", "technology"] -> te(?:am|ch(?: stack|nology)).
+
+    Python's re tries alternatives one by one, so a flat alternation is
+    checked branch by branch at every position; the trie form rejects most
+    positions on the first character. Optional tails are greedy, so a
+    match is always the longest literal starting at that position."""
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class ResponseMatcher:
+    """Extracts topics, addressed questions and final-report markers.
+
+    All literals (topic keywords, "<name>," question openers and report
+    indicators) are compiled into one trie-shaped regex and found with one
+    findall over the lowercased response. A match also implies every
+    literal contained in it; the few literals that could start inside a
+    match and run past its end get a substring check of their own if still
+    missing. The question pattern of an addressed name is then only tried
+    where that name occurs (found with str.find). Both extra steps are
+    cheaper than making the main regex find overlapping matches."""
+
+    def __init__(self, topic_keywords=None, agent_names=None, report_indicators=None, min_report_length=500):
+        self.topic_keywords = topic_keywords or DEFAULT_TOPIC_KEYWORDS
+        self.agent_names = agent_names or DEFAULT_AGENT_NAMES
+        self.report_indicators = report_indicators or DEFAULT_REPORT_INDICATORS
+        self.min_report_length = min_report_length
+
+        # literal (lowercased) -> list of ("topic", topic) / ("name", name) / ("report", None)
+        self._targets = {}
+        for topic, keywords in self.topic_keywords.items():
+            for keyword in keywords:
+                # Keywords are compared with the lowercased response, so ones
+                # with capitals (e.g. "MVP") can never match
+                if keyword == keyword.lower():
+                    self._targets.setdefault(keyword, []).append(("topic", topic))
+        for names in self.agent_names.values():
+            for name in names:
+                self._targets.setdefault(f"{name},".lower(), []).append(("name", name))
+        for indicator in self.report_indicators:
+            self._targets.setdefault(indicator.lower(), []).append(("report", None))
+
+        literals = list(self._targets)
+        self._pattern = re.compile(_trie_pattern(literals))
+        # Literals found inside each literal, at any offset (itself included)
+        self._contained = {
+            literal: frozenset(other for other in literals if other in literal) for literal in literals
+        }
+        # Literals that can start inside another literal's match and extend past
+        # its end (e.g. "team" + "market" in "teamarket") - the scan skips those
+        self._overlapping = [
+            literal for literal in literals
+            if any(
+                other != literal and literal.startswith(other[k:]) and len(other) - k < len(literal)
+                for other in literals for k in range(1, len(other))
+            )
+        ]
+        self._question_patterns = {
+            name: re.compile(rf"{re.escape(name)},\s*([^?]*\?)", re.IGNORECASE)
+            for names in self.agent_names.values() for name in names
+        }
+
+    @classmethod
+    def from_config(cls, config_path):
+        """Build a matcher from a YAML file with optional topic_keywords, agent_names,
+        report_indicators and min_report_length entries"""
+        import yaml
+        with open(Path(config_path), "r") as f:
+            config = yaml.safe_load(f) or {}
+        return cls(
+            topic_keywords=config.get("topic_keywords"),
+            agent_names=config.get("agent_names"),
+            report_indicators=config.get("report_indicators"),
+            min_report_length=config.get("min_report_length", 500)
+        )
+
+    def find_literals(self, text):
+        """Every table literal that occurs in the lowercased text"""
+        found = set()
+        for literal in set(self._pattern.findall(text)):
+            found |= self._contained[literal]
+        for literal in self._overlapping:
+            if literal not in found and literal in text:
+                found.add(literal)
+        return found
+
+    def _questions_for(self, name, literal, content, text):
+        """Same results as the per-name re.findall the question pattern replaced"""
+        pattern = self._question_patterns[name]
+        if len(text) != len(content):
+            # Lowercasing changed the length, so positions in text do not line up
+            return pattern.findall(content)
+        matches = []
+        position = text.find(literal)
+        while position != -1:
+            match = pattern.match(content, position)
+            if match:
+                matches.append(match.group(1))
+                # Like findall, matches never overlap
+                position = text.find(literal, match.end())
+            else:
+                position = text.find(literal, position + 1)
+        return matches
+
+    def analyze(self, content, current_agent=None):
+        """Returns {"topics", "questions", "is_final_report"} for one response"""
+        text = content.lower()
+        found_topics = set()
+        found_names = {}
+        has_indicator = False
+
+        for literal in self.find_literals(text):
+            for kind, value in self._targets[literal]:
+                if kind == "topic":
+                    found_topics.add(value)
+                elif kind == "name":
+                    found_names[value] = literal
+                else:
+                    has_indicator = True
+
+        questions = []
+        for agent, names in self.agent_names.items():
+            if agent != current_agent:
+                for name in names:
+                    if name in found_names:
+                        for match in self._questions_for(name, found_names[name], content, text):
+                            questions.append(f"{agent}: {name}, {match}")
+
+        return {
+            "topics": [topic for topic in self.topic_keywords if topic in found_topics],
+            "questions": questions,
+            "is_final_report": has_indicator and len(content) > self.min_report_length
+        }
@@ -0,0 +1,150 @@
+import bisect
+import threading
+from collections.abc import Sequence
+
+
+class _LogStore:
+    """Backing storage shared by every MessageLog view of one conversation"""
+
+    __slots__ = ("items", "speaker_positions", "lock")
+
+    def __init__(self):
+        self.items = []
+        self.speaker_positions = {}
+        self.lock = threading.Lock()
+
+    def append(self, message):
+        position = len(self.items)
+        self.items.append(message)
+        name = getattr(message, "name", None)
+        if name:
+            self.speaker_positions.setdefault(name, []).append(position)
+
+
+class MessageLog(Sequence):
+    """Persistent, append-only list of conversation messages.
+
+    A MessageLog is an immutable view (store, length) over a shared store.
+    Appending returns a new view in O(1) instead of copying the list, and
+    older views keep seeing exactly the messages they had - so graph
+    snapshots stay valid. Appending to an older view (a fork) copies the
+    prefix once and continues on a new store. Only the graph's reducer
+    should append to the state's log; nodes return their messages."""
+
+    __slots__ = ("_store", "_length")
+
+    def __init__(self, messages=None):
+        self._store = _LogStore()
+        self._length = 0
+        if messages:
+            for message in messages:
+                self._store.append(message)
+            self._length = len(self._store.items)
+
+    @classmethod
+    def _view(cls, store, length):
+        log = cls.__new__(cls)
+        log._store = store
+        log._length = length
+        return log
+
+    def extend(self, messages):
+        """Return a new log with messages appended; self is left unchanged"""
+        store = self._store
+        length = self._length
+        with store.lock:
+            for message in messages:
+                if length < len(store.items):
+                    # The same write applied twice - LangGraph runs the reducer
+                    # for a conditional edge's fresh read and again in
+                    # apply_writes - share it instead of forking
+                    if store.items[length] is message:
+                        length += 1
+                        continue
+                    store = self._fork(store, length)
+                store.append(message)
+                length += 1
+        return MessageLog._view(store, length)
+
+    def append(self, message):
+        """Return a new log with one message appended"""
+        return self.extend([message])
+
+    @staticmethod
+    def _fork(store, length):
+        forked = _LogStore()
+        for message in store.items[:length]:
+            forked.append(message)
+        return forked
+
+    # --- Sequence protocol ---
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.items[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MessageLog index out of range")
+        return self._store.items[index]
+
+    def __iter__(self):
+        items = self._store.items
+        for i in range(self._length):
+            yield items[i]
+
+    def __add__(self, other):
+        # Plain-list concatenation (copies), e.g. when building a prompt
+        return list(self) + list(other)
+
+    def __eq__(self, other):
+        if isinstance(other, (MessageLog, list)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __reduce__(self):
+        # Serialize as the visible messages only
+        return (MessageLog, (list(self),))
+
+    def __repr__(self):
+        return f"MessageLog({self._length} messages)"
+
+    # --- Cheap views ---
+    def last(self, n):
+        """The last n messages (fewer if the log is shorter)"""
+        start = max(0, self._length - n)
+        return self._store.items[start:self._length]
+
+    def _speaker_positions(self, name):
+        positions = self._store.speaker_positions.get(name, [])
+        return positions, bisect.bisect_left(positions, self._length)
+
+    def by_speaker(self, name, limit=None):
+        """Messages from one speaker, oldest first (only the most recent `limit` if given)"""
+        positions, end = self._speaker_positions(name)
+        start = 0 if limit is None else max(0, end - limit)
+        return [self._store.items[i] for i in positions[start:end]]
+
+    def latest_from(self, name, within=None):
+        """Most recent message from a speaker, optionally only if among the last `within` messages"""
+        positions, end = self._speaker_positions(name)
+        if not end:
+            return None
+        position = positions[end - 1]
+        if within is not None and position < self._length - within:
+            return None
+        return self._store.items[position]
+
+
+def as_message_log(messages):
+    """Wrap a plain list (e.g. from callers outside the graph) as a MessageLog"""
+    if isinstance(messages, MessageLog):
+        return messages
+    return MessageLog(messages or [])
+
+
+def append_messages(log, new_messages):
+    """AgentState reducer: O(1) append per message instead of copying the whole list"""
+    return as_message_log(log).extend(new_messages or [])
@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+
+HISTORY_SIZE = 3  # previous responses per agent a new one is compared against
+
+
+def new_history(dim, capacity=HISTORY_SIZE):
+    """Empty per-agent ring buffer of unit-length embeddings"""
+    return {"vectors": np.zeros((capacity, dim), dtype=np.float32), "size": 0, "next": 0}
+
+
+def normalize(embedding):
+    """Unit-length float32 copy, so cosine similarity is a plain dot product"""
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def normalize_rows(embeddings):
+    """Unit-length float32 copy of a stack of embeddings"""
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def max_similarities(history, unit_vectors):
+    """Highest cosine similarity of each row against the stored responses (one matrix product)"""
+    if not history or not history["size"]:
+        return np.full(len(unit_vectors), -1.0, dtype=np.float32)
+    return (unit_vectors @ history["vectors"][:history["size"]].T).max(axis=1)
+
+
+def max_similarity(history, unit_vector):
+    """Highest cosine similarity against the stored responses (one matrix-vector product)"""
+    if not history or not history["size"]:
+        return -1.0
+    return float((history["vectors"][:history["size"]] @ unit_vector).max())
+
+
+def remember(history, unit_vector):
+    """New history with unit_vector written over the oldest slot.
+
+    The buffer is copied (a few KB) rather than written in place, so
+    earlier graph states that still reference it stay unchanged."""
+    if history is None or history["vectors"].shape[1] != unit_vector.shape[0]:
+        history = new_history(unit_vector.shape[0])
+    vectors = history["vectors"].copy()
+    vectors[history["next"]] = unit_vector
+    capacity = vectors.shape[0]
+    return {
+        "vectors": vectors,
+        "size": min(history["size"] + 1, capacity),
+        "next": (history["next"] + 1) % capacity
+    }
+
+
+def basic_similarity_check(content):
+    """Fallback when no embedding model is available: flag very short or low-variety responses"""
+    normalized = re.sub(r'\s+', ' ', content.lower().strip())
+    return len(normalized) < 100 or len(set(normalized.split())) < 10
@@ -0,0 +1,74 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from context_window import (
+    compaction_boundary, count_prompt_tokens, fit_context_window, prompt_digests, shared_prefix_tokens
+)
+
+AGENTS = ["CEO", "CTO", "CFO", "COO"]
+
+
+def conversation(length):
+    messages = [HumanMessage(content="Analyze a dog walking app for busy professionals.")]
+    for i in range(1, length):
+        messages.append(AIMessage(
+            content=f"Point {i} from {AGENTS[i % 4]}. " + "We should look at pricing, walkers and demand. " * 5,
+            name=AGENTS[i % 4]
+        ))
+    return messages
+
+
+EXTRA = [SystemMessage(content="You are the CFO. Answer the open questions.")]
+
+
+def test_boundary_moves_in_steps_of_keep_turns():
+    assert [compaction_boundary(count, 3) for count in range(1, 13)] == [0, 0, 0, 0, 0, 0, 3, 3, 3, 6, 6, 6]
+    assert compaction_boundary(5, 0) == 4
+
+
+def test_short_conversations_are_sent_verbatim():
+    messages = conversation(5)
+    prompt, stats = fit_context_window(messages, EXTRA, token_budget=10000, keep_turns=6)
+    assert prompt == [*messages, *EXTRA]
+    assert stats["compacted"] == 0
+    assert stats["prompt_tokens"] == count_prompt_tokens(prompt)
+
+
+def test_prompt_prefix_is_stable_between_boundary_moves():
+    previous = None
+    for length in range(7, 10):
+        prompt, stats = fit_context_window(conversation(length), EXTRA, token_budget=10000, keep_turns=3)
+        assert stats["compacted"] == 3
+        assert prompt[1].name == "earlier_discussion"
+        if previous:
+            # Everything but the extra messages is reused from the previous turn's prompt
+            assert shared_prefix_tokens(prompt_digests(previous), prompt) == count_prompt_tokens(previous[:-1])
+        previous = prompt
+
+
+def test_over_budget_folds_more_and_keeps_the_latest_message():
+    messages = conversation(30)
+    full = count_prompt_tokens([*messages, *EXTRA])
+    prompt, stats = fit_context_window(messages, EXTRA, token_budget=full // 3, keep_turns=6)
+    assert stats["prompt_tokens"] <= full // 3
+    assert stats["compacted"] > compaction_boundary(len(messages), 6)
+    assert stats["compacted"] % 6 == 0
+    assert prompt[0] is messages[0]
+    assert prompt[-2] is messages[-1]
+    assert prompt[-1] is EXTRA[0]
+
+
+def test_tiny_budget_falls_back_to_the_latest_message():
+    messages = conversation(12)
+    budget = count_prompt_tokens([messages[0], messages[-1], *EXTRA])
+    prompt, stats = fit_context_window(messages, EXTRA, token_budget=budget, keep_turns=3)
+    assert prompt == [messages[0], messages[-1], *EXTRA]
+    assert stats["compacted"] == 10
+
+
+if __name__ == "__main__":
+    test_boundary_moves_in_steps_of_keep_turns()
+    test_short_conversations_are_sent_verbatim()
+    test_prompt_prefix_is_stable_between_boundary_moves()
+    test_over_budget_folds_more_and_keeps_the_latest_message()
+    test_tiny_budget_falls_back_to_the_latest_message()
+    print("✅ Agent prompts stay within their budget with a stable prefix")
@@ -0,0 +1,100 @@
+import random
+import re
+
+from matcher import ResponseMatcher
+
+
+# --- Reference: the per-function extractors the matcher replaces ---
+def extract_questions_for_others(content, current_agent):
+    questions = []
+    agent_patterns = {
+        "CEO": ["Sarah", "CEO"],
+        "CTO": ["Mike", "CTO"],
+        "CFO": ["Jennifer", "CFO"],
+        "COO": ["Tom", "COO"]
+    }
+    for agent, names in agent_patterns.items():
+        if agent != current_agent:
+            for name in names:
+                for match in re.findall(rf"{name},\s*([^?]*\?)", content, re.IGNORECASE):
+                    questions.append(f"{agent}: {name}, {match}")
+    return questions
+
+
+def extract_topics_discussed(content):
+    topics = []
+    topic_keywords = {
+        "technical": ["technology", "tech stack", "architecture", "development", "MVP", "scalability"],
+        "financial": ["budget", "funding", "revenue", "costs", "financial", "money", "valuation", "burn rate"],
+        "market": ["market", "competition", "customers", "users", "TAM", "SAM", "competitive analysis"],
+        "operations": ["operations", "hiring", "timeline", "execution", "team", "go-to-market"],
+        "strategy": ["strategy", "vision", "goals", "planning", "roadmap", "business model"]
+    }
+    content_lower = content.lower()
+    for topic, keywords in topic_keywords.items():
+        if any(keyword in content_lower for keyword in keywords):
+            topics.append(topic)
+    return topics
+
+
+def check_for_final_report(content):
+    content_upper = content.upper()
+    final_report_indicators = [
+        "FINAL REPORT:", "FINAL REPORT ", "EXECUTIVE SUMMARY",
+        "## EXECUTIVE SUMMARY", "**FINAL RECOMMENDATION**", "FINAL RECOMMENDATION:"
+    ]
+    return any(indicator in content_upper for indicator in final_report_indicators) and len(content) > 500
+
+
+FIXTURES = [
+    "",
+    "Mike, what tech stack would you pick for the MVP? Jennifer, how much funding do we need?",
+    "sarah, can you check the go-to-market plan? TOM, who do we hire first? tom,tom, really?",
+    "We should customize the product. custom, tailored onboarding? Our CEO, Sarah, agrees?",
+    "Technology choices drive the architecture; the team needs a roadmap and a burn rate model.",
+    "FINAL REPORT: " + "The business model is sound and the market is large. " * 12,
+    "## Executive Summary\n" + "Revenue grows with users and customers. " * 15 + "Final recommendation: proceed.",
+    "**Final Recommendation** keep costs low",
+    "CFO, CTO, COO, CEO, any questions? Jennifer,\n  what about valuation and money?",
+    "Mike,Mike, is the scalability fine?? Mike, next one? no question here",
+    "tech stacks and technologies and go-to-markets, competitive analysis of competition",
+    "teamarket costsarah, is this overlapping? executive summarytom, ok?",
+]
+
+FRAGMENTS = [
+    "Sarah, ", "Mike, ", "Jennifer, ", "Tom, ", "CEO, ", "CTO, ", "CFO, ", "COO, ", "custom, ", "atom, ",
+    "what about the budget?", "how will we scale?", "market ", "go-to-market ", "tech stack ", "technology ",
+    "burn rate ", "business model ", "FINAL REPORT ", "final report:", "Executive Summary ", "## executive summary",
+    "**FINAL RECOMMENDATION**", "team ", "timeline ", "?", ", ", "\n", "MVP ", "TAM ", "users ", "the plan ",
+    "tea", "cost", "strat", "s", "go-to-", "exec", "lorem ipsum dolor sit amet " * 5
+]
+
+
+def build_corpus(size=400, seed=7):
+    rnd = random.Random(seed)
+    corpus = list(FIXTURES)
+    for _ in range(size):
+        corpus.append("".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 60))))
+    return corpus
+
+
+def test_matcher_matches_previous_extractors():
+    matcher = ResponseMatcher()
+    for content in build_corpus():
+        for agent in [None, "CEO", "CTO", "CFO", "COO"]:
+            result = matcher.analyze(content, agent)
+            assert result["questions"] == extract_questions_for_others(content, agent), content
+        assert result["topics"] == extract_topics_discussed(content), content
+        assert result["is_final_report"] == check_for_final_report(content), content
+
+
+def test_agent_names_are_matched_literally():
+    matcher = ResponseMatcher(agent_names={"CEO": ["Dr. Sarah (CEO)"], "CTO": ["Mike+"]})
+    result = matcher.analyze("Dr. Sarah (CEO), what is the plan? Mike+, which stack? Drx Sarah CEO, no?", "COO")
+    assert result["questions"] == ["CEO: Dr. Sarah (CEO), what is the plan?", "CTO: Mike+, which stack?"]
+
+
+if __name__ == "__main__":
+    test_matcher_matches_previous_extractors()
+    test_agent_names_are_matched_literally()
+    print("✅ ResponseMatcher matches the previous extractors on the fixture corpus")
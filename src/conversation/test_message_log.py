@@ -0,0 +1,77 @@
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+from message_log import MessageLog, append_messages
+
+
+def message(i, name="CEO"):
+    return AIMessage(content=f"message {i}", name=name)
+
+
+def test_appends_leave_older_views_unchanged():
+    first = MessageLog([message(0)])
+    second = first.append(message(1, "CFO"))
+    third = second.extend([message(2), message(3, "CTO")])
+
+    assert len(first) == 1 and len(second) == 2 and len(third) == 4
+    # No copies: every view reads the same store
+    assert first._store is second._store is third._store
+    assert [msg.content for msg in third[-2:]] == ["message 2", "message 3"]
+    assert second.latest_from("CTO") is None
+    assert third.latest_from("CTO").content == "message 3"
+
+
+def test_appending_to_an_older_view_forks():
+    base = MessageLog([message(0), message(1, "CFO")])
+    left = base.append(message(2, "CTO"))
+    right = base.append(message(3, "COO"))
+
+    assert left._store is base._store
+    assert right._store is not base._store
+    assert [msg.content for msg in left] == ["message 0", "message 1", "message 2"]
+    assert [msg.content for msg in right] == ["message 0", "message 1", "message 3"]
+    assert right.latest_from("CTO") is None
+    assert left.latest_from("CTO").content == "message 2"
+
+
+def test_views_by_speaker():
+    log = MessageLog([message(i, ["CEO", "CFO"][i % 2]) for i in range(10)])
+    assert [msg.content for msg in log.by_speaker("CFO", limit=2)] == ["message 7", "message 9"]
+    assert log.latest_from("CEO").content == "message 8"
+    assert log.latest_from("CEO", within=1) is None
+    assert log.last(3) == log[-3:]
+    assert log == list(log)
+
+
+class State(TypedDict):
+    messages: Annotated[list, append_messages]
+
+
+def test_graph_reducer_appends_without_forking():
+    stores = []
+
+    def agent(state):
+        stores.append(state["messages"]._store)
+        return {"messages": [message(len(state["messages"]))]}
+
+    graph = StateGraph(State)
+    graph.add_node("agent", agent)
+    graph.add_edge(START, "agent")
+    # The conditional edge reads the fresh state, so LangGraph runs the reducer twice per write
+    graph.add_conditional_edges("agent", lambda state: END if len(state["messages"]) >= 6 else "agent")
+    final = graph.compile().invoke({"messages": [HumanMessage(content="Analyze a dog walking app")]})
+
+    assert isinstance(final["messages"], MessageLog)
+    assert [msg.content for msg in final["messages"][1:]] == [f"message {i}" for i in range(1, 6)]
+    assert all(store is stores[0] for store in stores)
+    assert final["messages"]._store is stores[0]
+
+
+if __name__ == "__main__":
+    test_appends_leave_older_views_unchanged()
+    test_appending_to_an_older_view_forks()
+    test_views_by_speaker()
+    test_graph_reducer_appends_without_forking()
+    print("✅ MessageLog appends in place and forks only from older views")
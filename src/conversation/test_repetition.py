@@ -0,0 +1,69 @@
+import numpy as np
+
+from repetition import (
+    HISTORY_SIZE, basic_similarity_check, max_similarities, max_similarity, new_history, normalize, normalize_rows,
+    remember
+)
+
+
+def axis(index, dim=4):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1
+    return vector
+
+
+def test_empty_history_matches_nothing():
+    assert max_similarity(None, axis(0)) == -1.0
+    assert max_similarity(new_history(4), axis(0)) == -1.0
+    assert max_similarities(new_history(4), np.stack([axis(0), axis(1)])).tolist() == [-1.0, -1.0]
+
+
+def test_ring_buffer_keeps_the_last_responses():
+    history = None
+    for index in range(HISTORY_SIZE + 1):
+        history = remember(history, axis(index))
+
+    assert history["size"] == HISTORY_SIZE
+    # The first response was overwritten by the newest one
+    assert max_similarity(history, axis(0)) == 0.0
+    assert all(max_similarity(history, axis(index)) == 1.0 for index in range(1, HISTORY_SIZE + 1))
+
+
+def test_remember_leaves_earlier_states_unchanged():
+    first = remember(None, axis(0))
+    second = remember(first, axis(1))
+    assert first["size"] == 1 and second["size"] == 2
+    assert max_similarity(first, axis(1)) == 0.0
+    assert first["vectors"] is not second["vectors"]
+
+
+def test_similarity_is_cosine():
+    history = remember(None, normalize([3.0, 4.0, 0.0, 0.0]))
+    assert np.isclose(max_similarity(history, normalize([6.0, 8.0, 0.0, 0.0])), 1.0)
+    rows = normalize_rows([[3.0, 4.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0]])
+    assert np.allclose(max_similarities(history, rows), [1.0, 0.0])
+
+
+def test_dimension_change_starts_a_new_history():
+    history = remember(remember(None, axis(0)), axis(1, dim=8))
+    assert history["vectors"].shape == (HISTORY_SIZE, 8)
+    assert history["size"] == 1
+
+
+def test_basic_check_flags_short_or_repetitive_text():
+    assert basic_similarity_check("Too short.")
+    assert basic_similarity_check("growth " * 40)
+    assert not basic_similarity_check(
+        "We validate demand with a concierge MVP in two neighbourhoods, price walks at fifteen dollars, "
+        "and hire walkers as contractors until weekly bookings pass two hundred."
+    )
+
+
+if __name__ == "__main__":
+    test_empty_history_matches_nothing()
+    test_ring_buffer_keeps_the_last_responses()
+    test_remember_leaves_earlier_states_unchanged()
+    test_similarity_is_cosine()
+    test_dimension_change_starts_a_new_history()
+    test_basic_check_flags_short_or_repetitive_text()
+    print("✅ Repetition history keeps the last responses and compares them by cosine similarity")
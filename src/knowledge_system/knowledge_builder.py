@@ -11,6 +11,7 @@ from langchain.schema import Document
 from langchain_community.document_loaders import TextLoader, JSONLoader, CSVLoader # Updated imports
 import requests
 from datetime import datetime
+from runtime.clients import openai_client_kwargs
 
 # Load environment variables
 load_dotenv()
@@ -39,7 +40,8 @@ class KnowledgeBaseBuilder:
         
         self.embeddings = OpenAIEmbeddings(
             model="text-embedding-3-small", # Cost-effective for your GPT-3.5-turbo setup
-            openai_api_key=os.getenv("OPENAI_API_KEY") # Explicitly pass the API key
+            openai_api_key=os.getenv("OPENAI_API_KEY"), # Explicitly pass the API key
+            **openai_client_kwargs("openai_embeddings")
         )
         
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -6,6 +6,8 @@ from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 from pathlib import Path
+from runtime.clients import openai_client_kwargs
+from runtime.lazy import lazy_component
 
 # Load environment variables
 load_dotenv()
@@ -29,7 +31,8 @@ class RAGKnowledgeManager:
         
         self.embeddings = OpenAIEmbeddings(
             model=self.config.get('embedding_model', 'text-embedding-3-small'),
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            **openai_client_kwargs("openai_embeddings")
         )
         
         # Load knowledge bases with RAG capabilities
@@ -92,37 +95,68 @@ class RAGKnowledgeManager:
             docs_and_scores = self.knowledge_bases[agent_type].similarity_search_with_score(
                 query, k=k
             )
+            return self._filter_retrieved_docs(agent_type, docs_and_scores)
             
-            # Filter by relevance threshold
-            agent_config = self.config['agents'].get(agent_type, {})
-            threshold = agent_config.get('relevance_threshold', 0.7)
-            
-            # Filter out error documents and apply threshold
-            filtered_docs = []
-            for doc, score in docs_and_scores:
-                content = doc.page_content.strip()
-                if (score <= threshold and  # Lower scores = higher similarity in FAISS
-                    content and 
-                    "error" not in content.lower() and
-                    "no knowledge available" not in content.lower() and
-                    len(content) > 20):
-                    filtered_docs.append((doc, score))
-            
-            return filtered_docs
+        except Exception as e:
+            print(f"❌ RAG retrieval error for {agent_type}: {e}")
+            return []
+    
+    async def arag_retrieve_and_rank(self, agent_type: str, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Async RAG retrieval - embeds the query without blocking the event loop"""
+        if agent_type not in self.knowledge_bases:
+            return []
+        
+        try:
+            docs_and_scores = await self.knowledge_bases[agent_type].asimilarity_search_with_score(
+                query, k=k
+            )
+            return self._filter_retrieved_docs(agent_type, docs_and_scores)
             
         except Exception as e:
             print(f"❌ RAG retrieval error for {agent_type}: {e}")
             return []
     
+    def _filter_retrieved_docs(self, agent_type: str, docs_and_scores: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        """Filter by relevance threshold and drop placeholder documents"""
+        agent_config = self.config['agents'].get(agent_type, {})
+        threshold = agent_config.get('relevance_threshold', 0.7)
+        
+        # Filter out error documents and apply threshold
+        filtered_docs = []
+        for doc, score in docs_and_scores:
+            content = doc.page_content.strip()
+            if (score <= threshold and  # Lower scores = higher similarity in FAISS
+                content and 
+                "error" not in content.lower() and
+                "no knowledge available" not in content.lower() and
+                len(content) > 20):
+                filtered_docs.append((doc, score))
+        
+        return filtered_docs
+    
     def rag_generate_context(self, agent_type: str, business_context: str, query: str) -> Dict[str, any]:
         """Generate RAG context for agent with proper formatting"""
         
         # Step 1: Query expansion for better retrieval
-        expanded_query = f"{business_context} {query} {agent_type.lower()} expertise startup business"
+        expanded_query = self._expand_query(agent_type, business_context, query)
         
         # Step 2: Retrieve relevant documents with scores
         retrieved_docs = self.rag_retrieve_and_rank(agent_type, expanded_query, k=3)
         
+        return self._format_rag_context(agent_type, retrieved_docs)
+    
+    async def arag_generate_context(self, agent_type: str, business_context: str, query: str) -> Dict[str, any]:
+        """Async variant of rag_generate_context for the async consultation graph"""
+        expanded_query = self._expand_query(agent_type, business_context, query)
+        retrieved_docs = await self.arag_retrieve_and_rank(agent_type, expanded_query, k=3)
+        return self._format_rag_context(agent_type, retrieved_docs)
+    
+    def _expand_query(self, agent_type: str, business_context: str, query: str) -> str:
+        """Query expansion for better retrieval"""
+        return f"{business_context} {query} {agent_type.lower()} expertise startup business"
+    
+    def _format_rag_context(self, agent_type: str, retrieved_docs: List[Tuple[Document, float]]) -> Dict[str, any]:
+        """Format retrieved documents in the agent's natural style"""
         if not retrieved_docs:
             return {
                 "context": "",
@@ -188,13 +222,23 @@ class RAGKnowledgeManager:
         docs_and_scores = self.rag_retrieve_and_rank(agent_type, query, k)
         return [doc for doc, score in docs_and_scores]
 
-# Global RAG instance
-try:
-    rag_knowledge_manager = RAGKnowledgeManager()
-    print("✅ RAG Knowledge Manager initialized successfully")
-except Exception as e:
-    print(f"⚠️ RAG Knowledge Manager initialization failed: {e}")
-    rag_knowledge_manager = None
+# Global RAG instance - created on first use, loading every FAISS index is slow
+@lazy_component
+def get_rag_knowledge_manager():
+    """Shared RAGKnowledgeManager, or None if initialization failed"""
+    try:
+        rag_knowledge_manager = RAGKnowledgeManager()
+        print("✅ RAG Knowledge Manager initialized successfully")
+        return rag_knowledge_manager
+    except Exception as e:
+        print(f"⚠️ RAG Knowledge Manager initialization failed: {e}")
+        return None
+
+def __getattr__(name):
+    # `from knowledge_manager import rag_knowledge_manager` keeps working
+    if name == "rag_knowledge_manager":
+        return get_rag_knowledge_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
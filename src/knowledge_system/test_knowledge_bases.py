@@ -1,3 +1,10 @@
+import sys
+from pathlib import Path
+
+# Works from any directory: the knowledge modules import runtime/ from src/
+script_dir = Path(__file__).parent.absolute()
+sys.path.append(str(script_dir.parent)) # Add src/ to path
+
 from knowledge_builder import KnowledgeBaseBuilder
 from knowledge_manager import RAGKnowledgeManager
 
@@ -1,57 +1,74 @@
 import os
 import re
 import sys
+import asyncio
 import functools
 import hashlib
-import numpy as np
+from contextlib import asynccontextmanager, contextmanager, nullcontext
 from dotenv import load_dotenv
 from typing import Annotated, List, TypedDict
 from pathlib import Path
 
-from langchain_core.messages import BaseMessage, HumanMessage
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_tavily import TavilySearch
+from langchain_core.messages import HumanMessage
 
-# Import agent creation functions
-from agents.ceo import create_ceo_agent
-from agents.cfo import create_cfo_agent
-from agents.cto import create_cto_agent
-from agents.coo import create_coo_agent
-from agents.supervisor import create_supervisor_chain
-
-# Enhanced semantic similarity checking
-try:
-    from sentence_transformers import SentenceTransformer
-    SEMANTIC_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-    SEMANTIC_AVAILABLE = True
-except ImportError:
-    print("⚠️ sentence-transformers not available. Using basic repetition detection.")
-    SEMANTIC_AVAILABLE = False
+# Heavy dependencies (LangGraph, ChatOpenAI, Tavily, agents, RAG, sentence
+# transformers) are imported inside the factories below, so importing this
+# module stays fast. Everything is built on first use and cached.
+from runtime.lazy import lazy_component
+from runtime.repetition_guard import empty_repetition_stats, merge_repetition_stats
+from runtime.usage import UsageCallbackHandler, empty_usage_stats, format_usage, merge_usage_stats
+from runtime.context import agent_context
+from conversation.message_log import MessageLog, append_messages, as_message_log
+from conversation.analytics import (
+    calculate_conversation_quality, create_context_summary, extract_business_idea,
+    get_business_idea, update_agent_snippets, update_quality_window
+)
+from conversation.matcher import ResponseMatcher
+from conversation.context_window import count_prompt_tokens, fit_context_window, prompt_digests, shared_prefix_tokens
 
 # Add the knowledge_system directory to Python path
 script_dir = Path(__file__).parent
 knowledge_system_path = script_dir / "knowledge_system"
 sys.path.insert(0, str(knowledge_system_path))
 
-# Import RAG knowledge manager with error handling
-try:
-    from knowledge_system.knowledge_manager import rag_knowledge_manager
-    RAG_AVAILABLE = True if rag_knowledge_manager else False
-    print("✅ RAG system loaded successfully" if RAG_AVAILABLE else "⚠️ RAG system initialization failed")
-except ImportError as e:
-    print(f"⚠️ RAG system not available: {e}")
-    RAG_AVAILABLE = False
-except Exception as e:
-    print(f"⚠️ RAG system error: {e}")
-    RAG_AVAILABLE = False
-
 # Load environment variables
 load_dotenv()
 
+# Enhanced semantic similarity checking
+@lazy_component
+def get_semantic_model():
+    """SentenceTransformer used for repetition detection, or None if it is not installed"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print("⚠️ sentence-transformers not available. Using basic repetition detection.")
+        return None
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+def semantic_available():
+    return get_semantic_model() is not None
+
+# RAG knowledge manager with error handling
+@lazy_component
+def get_rag_knowledge_manager():
+    """Shared RAG knowledge manager (loads the FAISS indexes), or None if unavailable"""
+    try:
+        from knowledge_system.knowledge_manager import get_rag_knowledge_manager as load_rag_knowledge_manager
+        rag_knowledge_manager = load_rag_knowledge_manager()
+        print("✅ RAG system loaded successfully" if rag_knowledge_manager else "⚠️ RAG system initialization failed")
+        return rag_knowledge_manager
+    except ImportError as e:
+        print(f"⚠️ RAG system not available: {e}")
+    except Exception as e:
+        print(f"⚠️ RAG system error: {e}")
+    return None
+
+def rag_available():
+    return get_rag_knowledge_manager() is not None
+
 # --- Enhanced Agent State Definition ---
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+    messages: Annotated[MessageLog, append_messages]
     next: str
     discussion_phase: str
     topics_discussed: List[str]
@@ -63,48 +80,219 @@ class AgentState(TypedDict):
     agent_call_counts: dict
     conversation_quality: float
     context_summary: str
-    agent_embeddings: dict  # New for semantic similarity
+    business_idea: str
+    quality_window: list
+    agent_snippets: dict
+    agent_embeddings: dict  # Per-agent ring buffers of response embeddings
+    rag_results: dict  # Per-agent RAG background research, reused by later turns and forks
+    repetition_stats: dict
+    prompt_tokens: list  # Per-turn prompt size: {"agent", "prompt_tokens", "compacted", "stable_prefix_tokens", ...}
+    prompt_digests: dict  # Per agent: message fingerprints of its last prompt, to measure the reusable prefix
+    usage_stats: dict  # Tokens, model/tool calls and estimated cost by agent, phase and purpose
+
+# --- Tracing ---
+# Set TRACING_ENABLED=true to write a span per graph node and worker phase (prompt
+# building, RAG, agent run with its LLM and Tavily calls, repetition embedding,
+# regeneration, bookkeeping) to TRACE_PATH as JSON lines
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+
+@lazy_component
+def get_tracer():
+    if not TRACING_ENABLED:
+        return None
+    from runtime.tracing import Tracer
+    return Tracer(os.getenv("TRACE_PATH", str(script_dir / ".cache" / "traces.jsonl")))
+
+def trace(name, **attributes):
+    """Span around one phase of a consultation; does nothing unless tracing is enabled"""
+    tracer = get_tracer()
+    return tracer.span(name, **attributes) if tracer else nullcontext()
+
+def tracing_callbacks():
+    """Callback that records the LLM and tool calls of an agent run as spans"""
+    tracer = get_tracer()
+    if tracer is None:
+        return []
+    from runtime.tracing import SpanCallbackHandler
+    return [SpanCallbackHandler(tracer)]
+
+def current_consultation_id():
+    """Thread id of the graph run this node executes in (None without checkpoints)"""
+    from langchain_core.runnables.config import ensure_config
+    return ensure_config().get("configurable", {}).get("thread_id")
+
+def traced_node(node_name, node, asynchronous):
+    """Wrap a graph node in a root span on its consultation's trace"""
+    if get_tracer() is None:
+        return node
+    if asynchronous:
+        async def run(state):
+            with trace(f"node.{node_name}", consultation_id=current_consultation_id(), node=node_name):
+                return await node(state)
+    else:
+        def run(state):
+            with trace(f"node.{node_name}", consultation_id=current_consultation_id(), node=node_name):
+                return node(state)
+    return run
+
+def print_trace_summary():
+    """p50/p95 per span over every run recorded in the trace file"""
+    tracer = get_tracer()
+    if tracer is None:
+        return
+    from runtime.tracing import format_summary, read_spans, summarize_spans
+    rows = summarize_spans(read_spans(tracer.path))
+    if rows:
+        print(f"⏱️ Latency per phase ({tracer.path}):")
+        print(format_summary(rows))
+
+# --- Record/replay cassettes ---
+# CASSETTE_MODE=record saves every OpenAI and Tavily response of the run to CASSETTE_PATH,
+# CASSETTE_MODE=replay serves them from there offline (see runtime/cassette.py)
+def note_cassette_consultation(request):
+    """Keep the initial request of a recorded consultation, so it can be replayed later"""
+    from runtime.cassette import get_cassette
+    cassette = get_cassette()
+    if cassette is not None and cassette.recording:
+        cassette.note_consultation(request)
+
+def print_cassette_stats():
+    """Recorded/replayed request counts, saving a recording"""
+    from runtime.cassette import get_cassette
+    cassette = get_cassette()
+    if cassette is None:
+        return
+    cassette.save()
+    stats = cassette.stats()
+    print(f"📼 Cassette {cassette.path} ({cassette.mode}): {stats['recorded']} recorded, "
+          f"{stats['replayed']} replayed, {stats['misses']} misses")
+
+# --- Client-side rate limiting ---
+# OpenAI chat, OpenAI embeddings and Tavily requests of all consultations in the process
+# share one limiter per API (OPENAI_RPM, OPENAI_EMBEDDING_RPM, TAVILY_RPM, see runtime/rate_limit.py)
+def print_rate_limit_stats():
+    """Queue wait, 429s and current concurrency limit per upstream API"""
+    from runtime.rate_limit import get_rate_limiters
+    for name, limiter in sorted(get_rate_limiters().items()):
+        stats = limiter.stats()
+        if not stats["requests"]:
+            continue
+        print(f"🚦 Rate limiter {name}: {stats['requests']} requests, {stats['queued']} queued, "
+              f"wait p50 {stats['p50_wait_s'] * 1000:.0f}ms / p95 {stats['p95_wait_s'] * 1000:.0f}ms / "
+              f"max {stats['max_wait_s'] * 1000:.0f}ms, {stats['throttled']} throttled (429), "
+              f"concurrency limit {stats['concurrency_limit']}")
 
 # --- Enhanced Semantic Similarity Detection ---
-class EnhancedRepetitionDetector:
-    def __init__(self):
-        self.agent_embeddings = {}
-        
-    def is_semantically_similar(self, content, agent_name, threshold=0.85):
-        """Check semantic similarity instead of just text hashing"""
-        if not SEMANTIC_AVAILABLE:
-            return self._basic_similarity_check(content, agent_name)
-            
-        if agent_name not in self.agent_embeddings:
-            self.agent_embeddings[agent_name] = []
-        
-        current_embedding = SEMANTIC_MODEL.encode([content])
-        
-        for prev_embedding in self.agent_embeddings[agent_name][-3:]:  # Check last 3
-            similarity = np.dot(current_embedding[0], prev_embedding) / (
-                np.linalg.norm(current_embedding[0]) * np.linalg.norm(prev_embedding)
-            )
-            if similarity > threshold:
-                return True
-        
-        self.agent_embeddings[agent_name].append(current_embedding[0])
-        if len(self.agent_embeddings[agent_name]) > 5:  # Keep only last 5
-            self.agent_embeddings[agent_name].pop(0)
-        return False
-    
-    def _basic_similarity_check(self, content, agent_name):
-        """Fallback basic similarity check"""
-        normalized = re.sub(r'\s+', ' ', content.lower().strip())
-        return len(normalized) < 100 or len(set(normalized.split())) < 10
+@lazy_component
+def get_embedding_service():
+    """Micro-batching encoder shared by all consultations in this process"""
+    semantic_model = get_semantic_model()
+    if semantic_model is None:
+        return None
+    from runtime.embedding_service import EmbeddingService
+    return EmbeddingService(
+        semantic_model,
+        max_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+        max_wait_seconds=float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")) / 1000
+    )
 
-# Global repetition detector
-repetition_detector = EnhancedRepetitionDetector()
+def print_embedding_stats():
+    """Batch-size and latency figures of the embedding service, if it was used"""
+    if not get_embedding_service.is_loaded() or get_embedding_service() is None:
+        return
+    stats = get_embedding_service().stats()
+    if stats["batches"]:
+        print(f"🧮 Embeddings: {stats['requests']} requests in {stats['batches']} batches "
+              f"(avg {stats['avg_batch_size']:.1f}, max {stats['max_batch_size']}) | "
+              f"latency p50 {stats['p50_latency_ms']:.1f}ms, p95 {stats['p95_latency_ms']:.1f}ms")
+
+# Streamed responses are checked every EARLY_ABORT_CHECK_TOKENS tokens and cut off
+# once they are clearly a near-duplicate; set EARLY_ABORT_REPETITION=false to only
+# check completed responses. Checks stop after EARLY_ABORT_MAX_TOKENS tokens, the
+# input length of the sentence embedding model (later text would not change it)
+EARLY_ABORT_REPETITION = os.getenv("EARLY_ABORT_REPETITION", "true").lower() == "true"
+EARLY_ABORT_CHECK_TOKENS = int(os.getenv("EARLY_ABORT_CHECK_TOKENS", "40"))
+EARLY_ABORT_MAX_TOKENS = int(os.getenv("EARLY_ABORT_MAX_TOKENS", "256"))
+EARLY_ABORT_THRESHOLD = float(os.getenv("EARLY_ABORT_THRESHOLD", "0.9"))
+
+# REPETITION_MODE=best_of_n generates BEST_OF_N candidates concurrently for agents
+# that already spoke and keeps the least repetitive one, instead of regenerating
+REPETITION_MODE = os.getenv("REPETITION_MODE", "regenerate").lower()
+BEST_OF_N = int(os.getenv("BEST_OF_N", "3"))
+
+def score_repetition(state, name, embedding, threshold):
+    """Compare an embedding against this agent's recent responses in this consultation.
+    
+    Histories live in state["agent_embeddings"], so concurrent consultations
+    never see each other's responses. Returns (is_repetition, new_history);
+    new_history is None when nothing should be stored."""
+    from conversation.repetition import max_similarity, normalize, remember
+    
+    history = (state.get("agent_embeddings") or {}).get(name)
+    current_embedding = normalize(embedding)
+    if max_similarity(history, current_embedding) > threshold:
+        return True, None
+    return False, remember(history, current_embedding)
+
+def check_repetition(state, name, content, threshold=0.85):
+    """Check semantic similarity of a response, embedding it through the batching service"""
+    from conversation.repetition import basic_similarity_check
+    
+    embedding_service = get_embedding_service()
+    if embedding_service is None:
+        return basic_similarity_check(content), None
+    return score_repetition(state, name, embedding_service.encode(content), threshold)
+
+async def acheck_repetition(state, name, content, threshold=0.85):
+    """Async variant of check_repetition - awaits the batch instead of holding a thread"""
+    from conversation.repetition import basic_similarity_check
+    
+    # First call loads the model, keep that off the event loop
+    embedding_service = await asyncio.to_thread(get_embedding_service)
+    if embedding_service is None:
+        return basic_similarity_check(content), None
+    return score_repetition(state, name, await embedding_service.aencode(content), threshold)
 
 # --- ENHANCED TAVILY SEARCH CONFIGURATION ---
+@lazy_component
+def get_search_cache():
+    """TTL cache + in-flight de-duplication shared by all agents' search tools"""
+    if os.getenv("SEARCH_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    from runtime.search_cache import SearchResultCache, SQLiteSearchStore
+    ttl_seconds = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(6 * 3600)))
+    # Optional SQLite file that keeps search results across restarts, resumes and forks
+    database_path = os.getenv("SEARCH_CACHE_PATH")
+    return SearchResultCache(
+        ttl_seconds=ttl_seconds,
+        max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000")),
+        store=SQLiteSearchStore(database_path, ttl_seconds) if database_path else None
+    )
+
+def print_search_cache_stats():
+    """Per-tool search cache counters"""
+    search_cache = get_search_cache()
+    if not search_cache:
+        return
+    for tool, counts in sorted(search_cache.stats().items()):
+        print(f"🔎 Search cache {tool}: {counts['hits']} hits, {counts['misses']} misses, "
+              f"{counts['coalesced']} coalesced, {counts['errors']} errors")
+
 def create_enhanced_search_tools():
     """Create agent-specific TavilySearch tools with optimized configurations"""
+    from runtime.cassette import get_cassette
+    from runtime.rate_limit import get_rate_limiter
+    from runtime.search_cache import CachedTavilySearch
+    search_cache = get_search_cache()
+    cassette = get_cassette()
+    rate_limiter = get_rate_limiter("tavily")
+    
     # CEO Tools - Strategic and Market Focus
-    ceo_tools = [TavilySearch(
+    ceo_tools = [CachedTavilySearch(
+        cache_label="CEO",
+        result_cache=search_cache,
+        cassette=cassette,
+        rate_limiter=rate_limiter,
         max_results=5,
         search_depth="advanced",
         include_answer=True,
@@ -114,7 +302,11 @@ def create_enhanced_search_tools():
     )]
 
     # CFO Tools - Financial and Funding Focus
-    cfo_tools = [TavilySearch(
+    cfo_tools = [CachedTavilySearch(
+        cache_label="CFO",
+        result_cache=search_cache,
+        cassette=cassette,
+        rate_limiter=rate_limiter,
         max_results=4,
         search_depth="advanced", 
         include_answer=True,
@@ -124,7 +316,11 @@ def create_enhanced_search_tools():
     )]
 
     # CTO Tools - Technical and Development Focus
-    cto_tools = [TavilySearch(
+    cto_tools = [CachedTavilySearch(
+        cache_label="CTO",
+        result_cache=search_cache,
+        cassette=cassette,
+        rate_limiter=rate_limiter,
         max_results=4,
         search_depth="basic",
         include_answer=True,
@@ -134,7 +330,11 @@ def create_enhanced_search_tools():
     )]
 
     # COO Tools - Operations and Execution Focus
-    coo_tools = [TavilySearch(
+    coo_tools = [CachedTavilySearch(
+        cache_label="COO",
+        result_cache=search_cache,
+        cassette=cassette,
+        rate_limiter=rate_limiter,
         max_results=3,
         search_depth="basic",
         include_answer=True,
@@ -150,68 +350,113 @@ def create_enhanced_search_tools():
         "COO": coo_tools
     }
 
+# --- Persistent LLM Response Cache ---
+@lazy_component
+def get_llm_cache():
+    """Disk-backed response cache shared by the agent executors and supervisor chain.
+    
+    LLM_CACHE_ENABLED=false turns it off, LLM_CACHE_BYPASS=true skips it
+    without deleting anything."""
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    from runtime.llm_cache import SQLiteResponseCache
+    return SQLiteResponseCache(
+        os.getenv("LLM_CACHE_PATH", str(script_dir / ".cache" / "llm_cache.sqlite")),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+        max_age_seconds=float(os.getenv("LLM_CACHE_MAX_AGE_HOURS", "168")) * 3600,
+        bypass=os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true"
+    )
+
+def print_llm_cache_stats():
+    """Per-agent LLM cache hit/miss counters"""
+    llm_cache = get_llm_cache()
+    if not llm_cache:
+        return
+    for agent, counts in sorted(llm_cache.stats().items()):
+        print(f"💾 LLM cache {agent}: {counts['hits']} hits, {counts['misses']} misses")
+
+# --- Hedged agent LLM requests ---
+@lazy_component
+def get_hedging_policy():
+    """Duplicate agent LLM calls that run past the agent's usual latency, or None.
+    
+    HEDGING_ENABLED=true turns it on: a call slower than the HEDGE_PERCENTILE
+    latency of its agent and phase (after HEDGE_MIN_SAMPLES calls) gets a
+    duplicate request, and the first to answer wins. HEDGE_BUDGET caps the
+    duplicates as a share of all agent calls."""
+    if os.getenv("HEDGING_ENABLED", "false").lower() != "true":
+        return None
+    from runtime.hedging import HedgingPolicy
+    return HedgingPolicy(
+        percentile=float(os.getenv("HEDGE_PERCENTILE", "90")),
+        min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "5")),
+        budget=float(os.getenv("HEDGE_BUDGET", "0.1"))
+    )
+
+def print_hedging_stats():
+    """Hedge rate, win rate and extra prompt tokens of the hedged agent calls"""
+    hedging = get_hedging_policy()
+    if not hedging:
+        return
+    stats = hedging.stats()
+    print(f"🏁 Hedging: {stats['hedged']} of {stats['calls']} agent LLM calls hedged ({stats['hedge_rate']:.0%}), "
+          f"hedge won {stats['hedge_wins']} ({stats['win_rate']:.0%}), {stats['over_budget']} over budget, "
+          f"~{stats['extra_prompt_tokens']:,} extra prompt tokens")
+
 # --- Enhanced LLM with Repetition Penalties ---
-llm = ChatOpenAI(
-    model="gpt-3.5-turbo", 
-    temperature=0.7,  # Increased from 0 for more variety
-    frequency_penalty=0.3,  # Penalize repeated tokens
-    presence_penalty=0.2,   # Encourage new topics
-)
+# Chat model of the board members and the supervisor (main_v6_demo switches it to gpt-4o-mini)
+AGENT_MODEL = os.getenv("AGENT_MODEL", "gpt-3.5-turbo")
 
-enhanced_tools = create_enhanced_search_tools()
+@lazy_component
+def get_llm():
+    from runtime.clients import openai_client_kwargs
+    hedging = get_hedging_policy()
+    if hedging is None:
+        from runtime.llm_cache import CachedChatOpenAI
+        llm_class, hedging_kwargs = CachedChatOpenAI, {}
+    else:
+        from runtime.hedging import HedgedChatOpenAI
+        llm_class, hedging_kwargs = HedgedChatOpenAI, {"hedging": hedging}
+    return llm_class(
+        model=AGENT_MODEL,
+        temperature=0.7,  # Increased from 0 for more variety
+        frequency_penalty=0.3,  # Penalize repeated tokens
+        presence_penalty=0.2,   # Encourage new topics
+        streaming=EARLY_ABORT_REPETITION,  # Partial responses are needed to abort repetitions early
+        stream_usage=True,  # Token usage of streamed responses, for the usage accounting
+        cache=get_llm_cache(),
+        **hedging_kwargs,
+        **openai_client_kwargs()
+    )
 
-# Create worker agents with specialized search tools
-ceo_agent_executor = create_ceo_agent(llm, enhanced_tools["CEO"])
-cfo_agent_executor = create_cfo_agent(llm, enhanced_tools["CFO"])
-cto_agent_executor = create_cto_agent(llm, enhanced_tools["CTO"])
-coo_agent_executor = create_coo_agent(llm, enhanced_tools["COO"])
+get_search_tools = lazy_component(create_enhanced_search_tools)
 
-# Create the supervisor agent
 members = ["CEO", "CTO", "CFO", "COO"]
-supervisor_chain = create_supervisor_chain(llm, members)
 
-# --- Enhanced Helper Functions ---
-def extract_business_idea_from_messages(messages):
-    """Extract business idea from initial messages"""
-    if not messages:
-        return ""
-    initial_message = messages[0].content
-    patterns = [
-        r"Business Idea:\s*(.+?)(?:\n|$)",
-        r"business idea[:\s]+(.+?)(?:\n|$)",
-        r"Analyze.*?:\s*(.+?)(?:\n|$)",
-        r"consultation[:\s]+(.+?)(?:\n|$)"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, initial_message, re.IGNORECASE | re.DOTALL)
-        if match:
-            return match.group(1).strip()
-    return initial_message[:200].strip()
+@lazy_component
+def get_agent_executors():
+    """Create worker agents with specialized search tools"""
+    from agents.ceo import create_ceo_agent
+    from agents.cfo import create_cfo_agent
+    from agents.cto import create_cto_agent
+    from agents.coo import create_coo_agent
+    
+    llm = get_llm()
+    enhanced_tools = get_search_tools()
+    return {
+        "CEO": create_ceo_agent(llm, enhanced_tools["CEO"]),
+        "CTO": create_cto_agent(llm, enhanced_tools["CTO"]),
+        "CFO": create_cfo_agent(llm, enhanced_tools["CFO"]),
+        "COO": create_coo_agent(llm, enhanced_tools["COO"])
+    }
 
-def calculate_conversation_quality(messages, message_count):
-    """Enhanced conversation quality calculation"""
-    if message_count <= 5:
-        return 1.0
-    
-    recent_messages = messages[-3:] if len(messages) >= 3 else messages
-    recent_content = [msg.content for msg in recent_messages if hasattr(msg, 'content')]
-    
-    if not recent_content:
-        return 0.5
-    
-    # Check content variety
-    avg_length = sum(len(content) for content in recent_content) / len(recent_content)
-    unique_words = set()
-    for content in recent_content:
-        unique_words.update(content.lower().split())
-    
-    length_quality = min(avg_length / 500, 1.0)
-    variety_quality = min(len(unique_words) / 50, 1.0)
-    count_penalty = max(0.3, 1.0 - (message_count - 5) * 0.08)
-    
-    return (length_quality * 0.4 + variety_quality * 0.4 + count_penalty * 0.2)
+@lazy_component
+def get_supervisor_chain():
+    """Create the supervisor agent"""
+    from agents.supervisor import create_supervisor_chain
+    return create_supervisor_chain(get_llm(), members)
 
+# --- Enhanced Helper Functions ---
 def get_participated_agents(state, current_agent):
     """Get list of agents who have actually participated in the conversation"""
     agent_participation = state.get("agent_participation", {})
@@ -330,7 +575,7 @@ def generate_context_aware_prompt(state, agent_name):
     participated_agents = get_participated_agents(state, agent_name)
     
     # Only include content from agents who have actually spoken
-    for msg in state.get("messages", [])[-4:]:
+    for msg in as_message_log(state.get("messages", [])).last(4):
         if hasattr(msg, 'name') and msg.name != agent_name and msg.name in participated_agents:
             recent_content.append(f"{msg.name}: {msg.content[:150]}...")
     
@@ -365,27 +610,6 @@ def generate_context_aware_prompt(state, agent_name):
         return no_context
 
 # --- Other helper functions ---
-def create_context_summary(messages, business_idea):
-    """Create rolling summary of conversation"""
-    if len(messages) <= 5:
-        return f"Analyzing business idea: {business_idea}"
-    
-    key_points = []
-    agent_contributions = {"CEO": [], "CTO": [], "CFO": [], "COO": []}
-    
-    for msg in messages[-8:]:
-        if hasattr(msg, 'name') and msg.name in agent_contributions:
-            content = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
-            agent_contributions[msg.name].append(content)
-    
-    summary_parts = [f"Business: {business_idea}"]
-    for agent, contributions in agent_contributions.items():
-        if contributions:
-            latest = contributions[-1]
-            summary_parts.append(f"{agent}: {latest}")
-    
-    return " | ".join(summary_parts)
-
 def should_end_conversation(state):
     """Dynamic conversation ending based on quality and completeness"""
     message_count = state.get("message_count", 0)
@@ -405,70 +629,32 @@ def should_end_conversation(state):
     
     return False
 
-def extract_questions_for_others(content, current_agent):
-    """Extract questions directed at other agents"""
-    questions = []
-    agent_patterns = {
-        "CEO": ["Sarah", "CEO"],
-        "CTO": ["Mike", "CTO"],
-        "CFO": ["Jennifer", "CFO"],
-        "COO": ["Tom", "COO"]
-    }
-    
-    for agent, names in agent_patterns.items():
-        if agent != current_agent:
-            for name in names:
-                pattern = rf"{name},\s*([^?]*\?)"
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    questions.append(f"{agent}: {name}, {match}")
-    
-    return questions
-
-def extract_topics_discussed(content):
-    """Extract key topics from agent message"""
-    topics = []
-    topic_keywords = {
-        "technical": ["technology", "tech stack", "architecture", "development", "MVP", "scalability"],
-        "financial": ["budget", "funding", "revenue", "costs", "financial", "money", "valuation", "burn rate"],
-        "market": ["market", "competition", "customers", "users", "TAM", "SAM", "competitive analysis"],
-        "operations": ["operations", "hiring", "timeline", "execution", "team", "go-to-market"],
-        "strategy": ["strategy", "vision", "goals", "planning", "roadmap", "business model"]
-    }
-    
-    content_lower = content.lower()
-    for topic, keywords in topic_keywords.items():
-        if any(keyword in content_lower for keyword in keywords):
-            topics.append(topic)
-    
-    return topics
+# Topic, question and final-report detection share one precompiled matcher.
+# Point MATCHER_CONFIG_PATH at a YAML file to change its keyword tables.
+def create_response_matcher():
+    """Response matcher from MATCHER_CONFIG_PATH, or the default tables"""
+    config_path = os.getenv("MATCHER_CONFIG_PATH")
+    if config_path:
+        print(f"🔤 Loading response matcher tables from {config_path}")
+        return ResponseMatcher.from_config(config_path)
+    return ResponseMatcher()
+
+get_response_matcher = lazy_component(create_response_matcher)
 
 def check_for_final_report(content):
     """Enhanced final report detection"""
-    content_upper = content.upper()
-    final_report_indicators = [
-        "FINAL REPORT:",
-        "FINAL REPORT ",
-        "EXECUTIVE SUMMARY",
-        "## EXECUTIVE SUMMARY",
-        "**FINAL RECOMMENDATION**",
-        "FINAL RECOMMENDATION:"
-    ]
-    
-    has_indicator = any(indicator in content_upper for indicator in final_report_indicators)
-    is_substantial = len(content) > 500
-    
-    return has_indicator and is_substantial
+    return get_response_matcher().analyze(content)["is_final_report"]
 
 # --- Enhanced Worker Node Function ---
-def worker_node(state, agent, name):
-    """Enhanced worker node with semantic similarity, personality reinforcement, and participation awareness"""
+def begin_worker_turn(state, name):
+    """Shared turn setup for the sync and async worker nodes.
+    
+    Returns a turn dict. If "skip_update" is set the agent must not speak and
+    the node should return it unchanged."""
     last_speaker = state.get("last_speaker", "")
     message_count = state.get("message_count", 0)
     agent_participation = state.get("agent_participation", {"CEO": False, "CTO": False, "CFO": False, "COO": False})
-    response_hashes = state.get("response_hashes", {})
     agent_call_counts = state.get("agent_call_counts", {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0})
-    conversation_quality = state.get("conversation_quality", 1.0)
     context_summary = state.get("context_summary", "")
     
     # Check if should end conversation early
@@ -484,17 +670,19 @@ def worker_node(state, agent, name):
     # Apply "no consecutive speaker" rule EXCEPT for final report
     if last_speaker == name and not is_final_report_time:
         return {
-            "messages": [],
-            "next": "supervisor",
-            "skip_reason": f"{name}_consecutive_speaker_prevention"
+            "skip_update": {
+                "messages": [],
+                "next": "supervisor",
+                "skip_reason": f"{name}_consecutive_speaker_prevention"
+            }
         }
     
     # Track agent call frequency
     current_call_count = agent_call_counts.get(name, 0) + 1
     
-    # Prepare modified state for agent processing
-    modified_state = dict(state)
-    additional_messages = []
+    # Messages injected before and after the (optional) RAG background research
+    leading_messages = []
+    trailing_messages = []
     
     # Add context summary for focus
     if context_summary and current_call_count > 1:
@@ -502,33 +690,12 @@ def worker_node(state, agent, name):
             content=f"Conversation context: {context_summary}",
             name="context_summary"
         )
-        additional_messages.append(summary_message)
+        leading_messages.append(summary_message)
     
     # Add context-aware prompt to force building on previous content
     context_prompt = generate_context_aware_prompt(state, name)
     if context_prompt:
-        additional_messages.append(context_prompt)
-    
-    # FULL RAG IMPLEMENTATION - Natural Integration
-    if RAG_AVAILABLE and current_call_count <= 2:
-        try:
-            business_context = extract_business_idea_from_messages(state.get("messages", []))
-            if business_context and len(business_context) > 10:
-                # Generate RAG context
-                rag_result = rag_knowledge_manager.rag_generate_context(
-                    name, business_context, "business analysis consultation"
-                )
-                
-                if rag_result["retrieval_success"] and rag_result["context"]:
-                    # Add RAG context as natural background information
-                    rag_message = HumanMessage(
-                        content=rag_result["context"],
-                        name=f"{name.lower()}_background_research"
-                    )
-                    additional_messages.append(rag_message)
-                    print(f"🔍 RAG enhanced {name} with {len(rag_result['sources'])} knowledge sources")
-        except Exception as e:
-            print(f"⚠️ RAG error for {name}: {e}")
+        leading_messages.append(context_prompt)
     
     # Add smart personality reinforcement with participation awareness
     smart_personality_prompt = generate_smart_personality_prompt(state, name)
@@ -536,7 +703,7 @@ def worker_node(state, agent, name):
         content=smart_personality_prompt,
         name="smart_personality_context"
     )
-    additional_messages.append(personality_message)
+    trailing_messages.append(personality_message)
     
     # Add final report instruction if needed
     if is_final_report_time:
@@ -544,63 +711,257 @@ def worker_node(state, agent, name):
             content="The consultation is ready for conclusion. Please provide your comprehensive final report with strategic recommendations.",
             name="system"
         )
-        additional_messages.append(final_report_message)
-    
-    # Update modified state with additional messages
-    if additional_messages:
-        modified_state["messages"] = state["messages"] + additional_messages
-        result = agent.invoke(modified_state)
-    else:
-        result = agent.invoke(state)
+        trailing_messages.append(final_report_message)
     
-    content = result["output"]
-    
-    # Enhanced semantic repetition detection
-    if repetition_detector.is_semantically_similar(content, name, threshold=0.8):
-        print(f"⚠️ {name} generated semantically similar response, regenerating...")
-        variety_message = HumanMessage(
-            content=f"Your response was too similar to previous messages. Please provide a completely fresh perspective focusing on a different aspect. Be more conversational and reactive to what others have said.",
-            name="anti_repetition"
+    return {
+        "skip_update": None,
+        "call_count": current_call_count,
+        "is_final_report_time": is_final_report_time,
+        "leading_messages": leading_messages,
+        "trailing_messages": trailing_messages
+    }
+
+def should_use_rag(call_count):
+    """RAG background research is only injected into an agent's first two turns"""
+    return call_count <= 2 and rag_available()
+
+def create_rag_message(name, rag_result):
+    """Wrap a RAG result as natural background information for the agent"""
+    if rag_result["retrieval_success"] and rag_result["context"]:
+        print(f"🔍 RAG enhanced {name} with {len(rag_result['sources'])} knowledge sources")
+        return HumanMessage(
+            content=rag_result["context"],
+            name=f"{name.lower()}_background_research"
         )
-        
-        modified_state["messages"] = modified_state["messages"] + [variety_message]
-        result = agent.invoke(modified_state)
-        content = result["output"]
+    return None
+
+def lookup_rag_result(state, name):
+    """FULL RAG IMPLEMENTATION - Natural Integration"""
+    try:
+        business_context = get_business_idea(state)
+        if business_context and len(business_context) > 10:
+            with trace("worker.rag"):
+                return get_rag_knowledge_manager().rag_generate_context(
+                    name, business_context, "business analysis consultation"
+                )
+    except Exception as e:
+        print(f"⚠️ RAG error for {name}: {e}")
+    return None
+
+async def alookup_rag_result(state, name):
+    """Async RAG lookup - the query embedding no longer blocks the event loop"""
+    try:
+        business_context = get_business_idea(state)
+        if business_context and len(business_context) > 10:
+            with trace("worker.rag"):
+                return await get_rag_knowledge_manager().arag_generate_context(
+                    name, business_context, "business analysis consultation"
+                )
+    except Exception as e:
+        print(f"⚠️ RAG error for {name}: {e}")
+    return None
+
+def stored_rag_result(state, name):
+    """RAG result already retrieved for this agent in this consultation (or the one it was forked from)"""
+    return (state.get("rag_results") or {}).get(name)
+
+def fetch_rag_message(state, name, turn):
+    """RAG background research message for this turn, if any.
+    
+    The result only depends on the agent and the business idea, so it is kept
+    in state (turn["rag_result"]) and reused instead of retrieved again."""
+    if not should_use_rag(turn["call_count"]):
+        return None
+    rag_result = stored_rag_result(state, name)
+    if rag_result is None:
+        rag_result = turn["rag_result"] = lookup_rag_result(state, name)
+    return create_rag_message(name, rag_result) if rag_result else None
+
+async def afetch_rag_message(state, name, turn):
+    """Async variant of fetch_rag_message"""
+    if not should_use_rag(turn["call_count"]):
+        return None
+    rag_result = stored_rag_result(state, name)
+    if rag_result is None:
+        rag_result = turn["rag_result"] = await alookup_rag_result(state, name)
+    return create_rag_message(name, rag_result) if rag_result else None
+
+# --- RAG Prefetch ---
+# Every agent speaks early in a consultation and its RAG research only depends on
+# the agent and the business idea, so while the first speaker generates, the other
+# agents' research is retrieved in the background and stored in state["rag_results"]
+# with that turn. Their first turns then start without a lookup. Set
+# RAG_PREFETCH=false to retrieve each agent's research at its own turn
+RAG_PREFETCH = os.getenv("RAG_PREFETCH", "true").lower() == "true"
+
+def rag_prefetch_agents(state, name):
+    """Other agents whose next turn uses RAG research that is not in state yet"""
+    if not RAG_PREFETCH:
+        return []
+    agent_call_counts = state.get("agent_call_counts", {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0})
+    return [
+        agent for agent in members
+        if agent != name
+        and should_use_rag(agent_call_counts.get(agent, 0) + 1)
+        and stored_rag_result(state, agent) is None
+    ]
+
+def prefetched_rag_lookup(state, name):
+    """RAG lookup for another agent, attributed to that agent"""
+    with agent_context(name):
+        return lookup_rag_result(state, name)
+
+async def aprefetched_rag_lookup(state, name):
+    """Async variant of prefetched_rag_lookup"""
+    with agent_context(name):
+        return await alookup_rag_result(state, name)
+
+@contextmanager
+def rag_prefetch(state, name, turn):
+    """Retrieve the other agents' RAG research while name's turn runs, into turn["prefetched_rag"]"""
+    agents = rag_prefetch_agents(state, name)
+    if not agents:
+        yield
+        return
+    
+    # Copies the run context into the threads, so the lookups are traced like the turn's own
+    from langchain_core.runnables.config import ContextThreadPoolExecutor
+    
+    with ContextThreadPoolExecutor(max_workers=len(agents)) as executor:
+        futures = {agent: executor.submit(prefetched_rag_lookup, state, agent) for agent in agents}
+        yield
+        with trace("worker.rag_prefetch_wait"):
+            turn["prefetched_rag"] = {agent: future.result() for agent, future in futures.items()}
+
+@asynccontextmanager
+async def arag_prefetch(state, name, turn):
+    """Async variant of rag_prefetch"""
+    tasks = {
+        agent: asyncio.create_task(aprefetched_rag_lookup(state, agent))
+        for agent in rag_prefetch_agents(state, name)
+    }
+    try:
+        yield
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    if tasks:
+        with trace("worker.rag_prefetch_wait"):
+            results = await asyncio.gather(*tasks.values())
+        turn["prefetched_rag"] = dict(zip(tasks, results))
+
+# Agent prompts keep the first message, the recent messages and a summary of older ones
+# within CONTEXT_WINDOW_TOKENS (0 sends the full history). Older messages are summarized
+# CONTEXT_KEEP_TURNS at a time, so the prompt prefix stays cacheable between compactions
+CONTEXT_WINDOW_TOKENS = int(os.getenv("CONTEXT_WINDOW_TOKENS", "4000"))
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "6"))
+
+def build_agent_input(state, name, turn, rag_message=None):
+    """Prepare modified state for agent processing.
+    
+    The static system prompt and the append-only transcript come first and
+    every per-turn message (context summary, RAG research, personality and
+    final-report instructions) last, so consecutive prompts of an agent share
+    a byte-identical prefix the provider can serve from its prompt cache."""
+    additional_messages = list(turn["leading_messages"])
+    if rag_message:
+        additional_messages.append(rag_message)
+    additional_messages.extend(turn["trailing_messages"])
+    
+    agent_input = dict(state)
+    if CONTEXT_WINDOW_TOKENS > 0:
+        agent_input["messages"], turn["context"] = fit_context_window(
+            state["messages"], additional_messages, CONTEXT_WINDOW_TOKENS, CONTEXT_KEEP_TURNS
+        )
+    else:
+        # The prompt template needs a real list - this is the only full copy per turn
+        agent_input["messages"] = [*state["messages"], *additional_messages]
+        turn["context"] = {"prompt_tokens": count_prompt_tokens(agent_input["messages"]), "compacted": 0}
+    
+    # Part of the prompt that repeats the agent's previous prompt verbatim
+    previous_digests = (state.get("prompt_digests") or {}).get(name)
+    turn["context"]["stable_prefix_tokens"] = shared_prefix_tokens(previous_digests, agent_input["messages"])
+    turn["prompt_digests"] = prompt_digests(agent_input["messages"])
+    turn["usage"] = UsageCallbackHandler(count_prompt_tokens([rag_message]) if rag_message else 0)
+    return agent_input
+
+def create_variety_message():
+    """Instruction appended when a response was too similar to the agent's history"""
+    return HumanMessage(
+        content=f"Your response was too similar to previous messages. Please provide a completely fresh perspective focusing on a different aspect. Be more conversational and reactive to what others have said.",
+        name="anti_repetition"
+    )
+
+def discussion_phase(message_count):
+    """Phase of the discussion once it holds message_count agent messages"""
+    if message_count <= 4:
+        return "initial"
+    if message_count <= 8:
+        return "discussion"
+    return "synthesis"
+
+def complete_worker_turn(state, name, turn, content):
+    """Turn an agent's final response into the state update shared by both worker nodes"""
+    message_count = state.get("message_count", 0)
+    agent_participation = state.get("agent_participation", {"CEO": False, "CTO": False, "CFO": False, "COO": False})
+    response_hashes = state.get("response_hashes", {})
+    agent_call_counts = state.get("agent_call_counts", {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0})
     
     # Generate hash for current response
     current_hash = hashlib.md5(content.encode()).hexdigest()[:10]
     response_hashes[f"{name}_{message_count}"] = current_hash
     
-    # Extract questions and topics
-    questions = extract_questions_for_others(content, name)
-    new_topics = extract_topics_discussed(content)
+    # Extract questions and topics in a single pass
+    analysis = get_response_matcher().analyze(content, name)
+    questions = analysis["questions"]
+    new_topics = analysis["topics"]
     existing_topics = state.get("topics_discussed", [])
-    combined_topics = list(set(existing_topics + new_topics))
+    # Order-preserving de-duplication: routing reads the latest topics, so set order
+    # (which varies with the string hash seed) would make replayed runs diverge
+    combined_topics = list(dict.fromkeys(existing_topics + new_topics))
     
     # Update participation and counts
     updated_participation = dict(agent_participation)
     updated_participation[name] = True
     updated_call_counts = dict(agent_call_counts)
-    updated_call_counts[name] = current_call_count
+    updated_call_counts[name] = turn["call_count"]
     
     # Increment message count
     new_count = message_count + 1
     
-    # Calculate new conversation quality
-    all_messages = state.get("messages", []) + [HumanMessage(content=content, name=name)]
-    new_quality = calculate_conversation_quality(all_messages, new_count)
+    # Calculate new conversation quality from the rolling window
+    quality_window = update_quality_window(state.get("quality_window"), content)
+    new_quality = calculate_conversation_quality(quality_window, new_count)
     
-    # Update context summary
-    business_idea = extract_business_idea_from_messages(state.get("messages", []))
-    new_summary = create_context_summary(all_messages, business_idea)
+    # Update context summary with just this response
+    business_idea = get_business_idea(state)
+    position = len(state.get("messages", []))
+    agent_snippets = update_agent_snippets(state.get("agent_snippets"), name, content, position)
+    new_summary = create_context_summary(agent_snippets, business_idea, position + 1)
     
-    # Determine discussion phase
-    if new_count <= 4:
-        phase = "initial"
-    elif new_count <= 8:
-        phase = "discussion"
-    else:
-        phase = "synthesis"
+    # Remember the response's embedding for this consultation's repetition checks
+    agent_embeddings = dict(state.get("agent_embeddings") or {})
+    if turn.get("embedding_history") is not None:
+        agent_embeddings[name] = turn["embedding_history"]
+    
+    rag_results = dict(state.get("rag_results") or {})
+    rag_results.update({agent: result for agent, result in turn.get("prefetched_rag", {}).items() if result})
+    if turn.get("rag_result"):
+        rag_results[name] = turn["rag_result"]
+    
+    agent_prompt_digests = dict(state.get("prompt_digests") or {})
+    if turn.get("prompt_digests") is not None:
+        agent_prompt_digests[name] = turn["prompt_digests"]
+    
+    # Provider-reported prompt caching of this turn's calls, next to the local prompt figures
+    turn_usage = turn["usage"].usage() if turn.get("usage") else {}
+    prompt_record = {"agent": name, **turn.get("context", {})}
+    if turn_usage:
+        prompt_record["provider_prompt_tokens"] = sum(bucket["prompt_tokens"] for bucket in turn_usage.values())
+        prompt_record["cached_prompt_tokens"] = sum(bucket["cached_prompt_tokens"] for bucket in turn_usage.values())
+    
+    phase = discussion_phase(new_count)
     
     return {
         "messages": [HumanMessage(content=content, name=name)],
@@ -613,14 +974,292 @@ def worker_node(state, agent, name):
         "response_hashes": response_hashes,
         "agent_call_counts": updated_call_counts,
         "conversation_quality": new_quality,
-        "context_summary": new_summary
+        "context_summary": new_summary,
+        "business_idea": business_idea,
+        "quality_window": quality_window,
+        "agent_snippets": agent_snippets,
+        "agent_embeddings": agent_embeddings,
+        "rag_results": rag_results,
+        "repetition_stats": merge_repetition_stats(
+            state.get("repetition_stats"), turn.get("repetition", {})
+        ),
+        "prompt_tokens": [*state.get("prompt_tokens", []), prompt_record],
+        "prompt_digests": agent_prompt_digests,
+        "usage_stats": merge_usage_stats(state.get("usage_stats"), turn_usage, name, phase)
     }
 
-# Define nodes for each worker agent
-ceo_node = functools.partial(worker_node, agent=ceo_agent_executor, name="CEO")
-cto_node = functools.partial(worker_node, agent=cto_agent_executor, name="CTO")
-cfo_node = functools.partial(worker_node, agent=cfo_agent_executor, name="CFO")
-coo_node = functools.partial(worker_node, agent=coo_agent_executor, name="COO")
+def usage_callbacks(turn):
+    """The turn's usage counter, for every agent run of the turn"""
+    return [turn["usage"]] if turn.get("usage") else []
+
+def agent_run_config(state, name, turn, asynchronous=False):
+    """Run config for an agent turn: stream metadata, plus the early-abort guard once there are responses to compare against"""
+    from langchain_core.runnables.config import ensure_config, merge_configs
+    
+    run_config = {
+        "metadata": {"agent": name, "purpose": "response"},
+        "callbacks": tracing_callbacks() + usage_callbacks(turn)
+    }
+    history = (state.get("agent_embeddings") or {}).get(name)
+    embedding_service = get_embedding_service() if EARLY_ABORT_REPETITION and history else None
+    if embedding_service is not None:
+        from conversation.repetition import max_similarity, normalize
+        from runtime.repetition_guard import AsyncRepetitionGuard, RepetitionGuard
+        
+        if asynchronous:
+            async def is_repetition(text):
+                return max_similarity(history, normalize(await embedding_service.aencode(text))) > EARLY_ABORT_THRESHOLD
+            guard = AsyncRepetitionGuard(is_repetition, EARLY_ABORT_CHECK_TOKENS, EARLY_ABORT_MAX_TOKENS)
+        else:
+            guard = RepetitionGuard(
+                lambda text: max_similarity(history, normalize(embedding_service.encode(text))) > EARLY_ABORT_THRESHOLD,
+                EARLY_ABORT_CHECK_TOKENS, EARLY_ABORT_MAX_TOKENS
+            )
+        run_config["callbacks"].append(guard)
+    # Merge with the node's config so the graph's own callbacks (token streaming) stay attached
+    return merge_configs(ensure_config(), run_config)
+
+def estimate_tokens(text):
+    return len(text) // 4
+
+def record_regeneration(turn, aborted_tokens, content):
+    """Count a regenerated response; an early abort saves roughly the tokens the full response would have taken"""
+    turn["repetition"] = {"regenerations": 1}
+    if aborted_tokens:
+        turn["repetition"].update({
+            "early_aborts": 1,
+            "tokens_aborted": aborted_tokens,
+            "tokens_saved": max(estimate_tokens(content) - aborted_tokens, 0)
+        })
+
+def candidate_run_config(name, index, turn):
+    """Run config for one best-of-n candidate; only the first one is streamed to the UI"""
+    from langchain_core.runnables.config import ensure_config, merge_configs
+    # The first candidate is the response the turn would have made anyway, the others are extra cost
+    purpose = "candidate" if index else "response"
+    return merge_configs(ensure_config(), {
+        "metadata": {"agent": name, "candidate": index, "purpose": purpose},
+        "callbacks": tracing_callbacks() + usage_callbacks(turn)
+    })
+
+def regeneration_run_config(name, turn):
+    """Run config for the regenerated response - streamed like the first attempt, but without the guard (it is checked once complete)"""
+    from langchain_core.runnables.config import ensure_config, merge_configs
+    return merge_configs(ensure_config(), {
+        "metadata": {"agent": name, "purpose": "regeneration"},
+        "callbacks": tracing_callbacks() + usage_callbacks(turn)
+    })
+
+def candidate_cache_context(index):
+    """The first candidate may come from the LLM cache; identical prompts would all get that response, so extra candidates skip it"""
+    from contextlib import asynccontextmanager, contextmanager, nullcontext
+    from runtime.llm_cache import bypass_llm_cache
+    return bypass_llm_cache() if index else nullcontext()
+
+def use_best_of_n(state, name):
+    """Best-of-n only pays off once the agent has responses it could repeat"""
+    history = (state.get("agent_embeddings") or {}).get(name)
+    return REPETITION_MODE == "best_of_n" and bool(history) and get_embedding_service() is not None
+
+def pick_candidate(state, name, candidates, embeddings, threshold=0.8):
+    """Keep the candidate least similar to the agent's history (one matrix product for all of them)"""
+    from conversation.repetition import max_similarities, normalize_rows, remember
+    
+    history = (state.get("agent_embeddings") or {}).get(name)
+    unit_vectors = normalize_rows(embeddings)
+    scores = max_similarities(history, unit_vectors)
+    # Keep the first candidate (streamed to the UI, cacheable) unless another is clearly less similar
+    best = int(scores.argmin()) if scores[0] - scores.min() > 0.01 else 0
+    if best:
+        print(f"🎯 {name} picked candidate {best + 1} of {len(candidates)} (similarity {scores[best]:.2f} vs {scores[0]:.2f})")
+    
+    # Even the best candidate may repeat; it is kept to avoid another round trip, but not remembered
+    new_history = remember(history, unit_vectors[best]) if scores[best] <= threshold else None
+    stats = {"best_of_n_turns": 1, "repetitions_avoided": int(scores[0] > threshold >= scores[best])}
+    return candidates[best], new_history, stats
+
+def generate_best_of_n(state, agent, name, agent_input, turn):
+    """Run BEST_OF_N candidates of the turn concurrently and keep the least repetitive one"""
+    from langchain_core.runnables.config import ContextThreadPoolExecutor
+    
+    def run_candidate(index):
+        with candidate_cache_context(index):
+            return agent.invoke(agent_input, config=candidate_run_config(name, index, turn))["output"]
+    
+    with ContextThreadPoolExecutor(max_workers=BEST_OF_N) as executor:
+        candidates = list(executor.map(run_candidate, range(BEST_OF_N)))
+    
+    # Submitted together, so the embedding service encodes them as one batch
+    embedding_service = get_embedding_service()
+    with trace("worker.repetition_embedding"):
+        futures = [embedding_service.submit(candidate) for candidate in candidates]
+        content, turn["embedding_history"], turn["repetition"] = pick_candidate(
+            state, name, candidates, [future.result() for future in futures]
+        )
+    return content
+
+async def agenerate_best_of_n(state, agent, name, agent_input, turn):
+    """Async variant of generate_best_of_n"""
+    async def run_candidate(index):
+        with candidate_cache_context(index):
+            result = await agent.ainvoke(agent_input, config=candidate_run_config(name, index, turn))
+        return result["output"]
+    
+    candidates = await asyncio.gather(*[run_candidate(index) for index in range(BEST_OF_N)])
+    
+    embedding_service = get_embedding_service()
+    with trace("worker.repetition_embedding"):
+        embeddings = await asyncio.gather(*[embedding_service.aencode(candidate) for candidate in candidates])
+        content, turn["embedding_history"], turn["repetition"] = pick_candidate(state, name, candidates, embeddings)
+    return content
+
+def generate_worker_content(state, agent, name, turn):
+    """Run the agent for one turn, regenerating once if the response repeats itself"""
+    from runtime.repetition_guard import RepetitionDetected
+    
+    with agent_context(name, discussion_phase(state.get("message_count", 0) + 1)):
+        rag_message = fetch_rag_message(state, name, turn)
+        with trace("worker.build_prompt"):
+            agent_input = build_agent_input(state, name, turn, rag_message)
+        
+        if use_best_of_n(state, name):
+            with trace("worker.best_of_n", candidates=BEST_OF_N):
+                return generate_best_of_n(state, agent, name, agent_input, turn)
+        
+        aborted_tokens = 0
+        try:
+            with trace("worker.agent_invoke"):
+                result = agent.invoke(agent_input, config=agent_run_config(state, name, turn))
+            content = result["output"]
+            
+            # Enhanced semantic repetition detection
+            with trace("worker.repetition_embedding"):
+                is_repetition, turn["embedding_history"] = check_repetition(state, name, content, threshold=0.8)
+        except RepetitionDetected as e:
+            print(f"✂️ {name} started repeating an earlier response, stopped after {e.tokens} tokens")
+            aborted_tokens, is_repetition = e.tokens, True
+        
+        if is_repetition:
+            print(f"⚠️ {name} generated semantically similar response, regenerating...")
+            agent_input["messages"].append(create_variety_message())
+            with trace("worker.regenerate"):
+                result = agent.invoke(agent_input, config=regeneration_run_config(name, turn))
+            content = result["output"]
+            record_regeneration(turn, aborted_tokens, content)
+        
+        return content
+
+async def agenerate_worker_content(state, agent, name, turn):
+    """Async variant of generate_worker_content"""
+    from runtime.repetition_guard import RepetitionDetected
+    
+    with agent_context(name, discussion_phase(state.get("message_count", 0) + 1)):
+        rag_message = await afetch_rag_message(state, name, turn)
+        with trace("worker.build_prompt"):
+            agent_input = build_agent_input(state, name, turn, rag_message)
+        
+        if use_best_of_n(state, name):
+            with trace("worker.best_of_n", candidates=BEST_OF_N):
+                return await agenerate_best_of_n(state, agent, name, agent_input, turn)
+        
+        aborted_tokens = 0
+        try:
+            with trace("worker.agent_invoke"):
+                result = await agent.ainvoke(agent_input, config=agent_run_config(state, name, turn, asynchronous=True))
+            content = result["output"]
+            
+            with trace("worker.repetition_embedding"):
+                is_repetition, turn["embedding_history"] = await acheck_repetition(state, name, content, threshold=0.8)
+        except RepetitionDetected as e:
+            print(f"✂️ {name} started repeating an earlier response, stopped after {e.tokens} tokens")
+            aborted_tokens, is_repetition = e.tokens, True
+        
+        if is_repetition:
+            print(f"⚠️ {name} generated semantically similar response, regenerating...")
+            agent_input["messages"].append(create_variety_message())
+            with trace("worker.regenerate"):
+                result = await agent.ainvoke(agent_input, config=regeneration_run_config(name, turn))
+            content = result["output"]
+            record_regeneration(turn, aborted_tokens, content)
+        
+        return content
+
+def worker_node(state, agent, name):
+    """Enhanced worker node with semantic similarity, personality reinforcement, and participation awareness"""
+    with trace("worker.prepare_turn", agent=name):
+        turn = begin_worker_turn(state, name)
+    if turn["skip_update"]:
+        return turn["skip_update"]
+    
+    with rag_prefetch(state, name, turn):
+        content = generate_worker_content(state, agent, name, turn)
+    with trace("worker.bookkeeping", agent=name):
+        return complete_worker_turn(state, name, turn, content)
+
+async def async_worker_node(state, agent, name):
+    """Async worker node - awaits the AgentExecutor (and its Tavily tools) via ainvoke"""
+    with trace("worker.prepare_turn", agent=name):
+        turn = begin_worker_turn(state, name)
+    if turn["skip_update"]:
+        return turn["skip_update"]
+    
+    async with arag_prefetch(state, name, turn):
+        content = await agenerate_worker_content(state, agent, name, turn)
+    with trace("worker.bookkeeping", agent=name):
+        return complete_worker_turn(state, name, turn, content)
+
+# --- Parallel Opening Round ---
+def merge_parallel_turns(state, turns, contents):
+    """Apply the opening turns in members order, as if the agents had spoken one after another.
+    
+    Keeps the bookkeeping (counts, topics, quality, summary) deterministic no
+    matter which agent finished first. The messages only reach the state's
+    MessageLog through the returned update; the turns in between see a plain
+    list (the opening round starts from the client's message alone)."""
+    provisional_state = dict(state)
+    new_messages = []
+    update = {}
+    
+    for name in members:
+        update = complete_worker_turn(provisional_state, name, turns[name], contents[name])
+        new_messages.extend(update["messages"])
+        provisional_state.update(update)
+        provisional_state["messages"] = [*state["messages"], *new_messages]
+    
+    merged_update = dict(update)
+    merged_update["messages"] = new_messages
+    return merged_update
+
+def parallel_round_node(state, agents):
+    """Run every agent's first turn concurrently, each with its own RAG and Tavily lookups"""
+    # Copies the run context into the threads, so callbacks and token streaming still see the calls
+    from langchain_core.runnables.config import ContextThreadPoolExecutor
+    
+    with trace("worker.prepare_turn"):
+        turns = {name: begin_worker_turn(state, name) for name in members}
+    
+    with ContextThreadPoolExecutor(max_workers=len(members)) as executor:
+        futures = {
+            name: executor.submit(generate_worker_content, state, agents[name], name, turns[name])
+            for name in members
+        }
+        contents = {name: future.result() for name, future in futures.items()}
+    
+    with trace("worker.bookkeeping"):
+        return merge_parallel_turns(state, turns, contents)
+
+async def async_parallel_round_node(state, agents):
+    """Async variant of parallel_round_node"""
+    with trace("worker.prepare_turn"):
+        turns = {name: begin_worker_turn(state, name) for name in members}
+    
+    results = await asyncio.gather(*[
+        agenerate_worker_content(state, agents[name], name, turns[name]) for name in members
+    ])
+    contents = dict(zip(members, results))
+    
+    with trace("worker.bookkeeping"):
+        return merge_parallel_turns(state, turns, contents)
 
 # --- Enhanced Supervisor Node ---
 def supervisor_node(state):
@@ -703,35 +1342,320 @@ def supervisor_node(state):
     # RULE 5: Force conclusion
     return {"next": "CEO"}
 
+async def async_supervisor_node(state):
+    """Async supervisor - routing is rule-based and CPU-only, so this just delegates"""
+    return supervisor_node(state)
+
 # --- Graph Definition ---
-workflow = StateGraph(AgentState)
+def create_workflow(worker_nodes, supervisor, opening_round=None):
+    """Build the consultation graph from a {member: node} mapping and a supervisor node.
+    
+    If opening_round is given, the graph starts with it (all agents' first
+    turns at once) before handing over to the supervisor."""
+    from langgraph.graph import StateGraph, END
+    
+    workflow = StateGraph(AgentState)
+    
+    for member in members:
+        workflow.add_node(member, worker_nodes[member])
+    workflow.add_node("supervisor", supervisor)
+    
+    # Add edges from each worker back to the supervisor
+    for member in members:
+        workflow.add_edge(member, "supervisor")
+    
+    # Conditional routing
+    conditional_map = {k: k for k in members}
+    conditional_map["FINISH"] = END
+    
+    workflow.add_conditional_edges("supervisor", lambda x: x["next"], conditional_map)
+    
+    if opening_round:
+        workflow.add_node("parallel_round", opening_round)
+        workflow.add_edge("parallel_round", "supervisor")
+        workflow.set_entry_point("parallel_round")
+    else:
+        workflow.set_entry_point("supervisor")
+    return workflow
 
-workflow.add_node("CEO", ceo_node)
-workflow.add_node("CTO", cto_node)
-workflow.add_node("CFO", cfo_node)
-workflow.add_node("COO", coo_node)
-workflow.add_node("supervisor", supervisor_node)
+# Set PARALLEL_OPENING_ROUND=true to overlap the four opening turns
+PARALLEL_OPENING_ROUND = os.getenv("PARALLEL_OPENING_ROUND", "false").lower() == "true"
 
-# Add edges from each worker back to the supervisor
-for member in members:
-    workflow.add_edge(member, "supervisor")
+# --- App Factory ---
+def build_app(config=None):
+    """Compiled consultation graph, built on first use and cached per config.
+    
+    config keys (defaults from the environment):
+    - "async_execution": use the async nodes - drive the graph with astream/ainvoke
+      so one process can serve many concurrent consultations without a thread each
+    - "parallel_opening_round": run the four opening turns concurrently
+    - "checkpoints": persist state after every node - runs then need a thread id,
+      see consultation_config()"""
+    config = config or {}
+    return compile_app(
+        config.get("async_execution", False),
+        config.get("parallel_opening_round", PARALLEL_OPENING_ROUND),
+        config.get("checkpoints", CHECKPOINTS_ENABLED)
+    )
 
-# Conditional routing
-conditional_map = {k: k for k in members}
-conditional_map["FINISH"] = END
+@lazy_component
+def compile_app(async_execution, parallel_opening_round, checkpoints):
+    agents = get_agent_executors()
+    if async_execution:
+        node, round_node, supervisor = async_worker_node, async_parallel_round_node, async_supervisor_node
+    else:
+        node, round_node, supervisor = worker_node, parallel_round_node, supervisor_node
+    
+    # Define nodes for each worker agent
+    worker_nodes = {
+        name: traced_node(name, functools.partial(node, agent=agents[name], name=name), async_execution)
+        for name in members
+    }
+    # The opening round node fans out to all four agents at once
+    opening_round = (
+        traced_node("parallel_round", functools.partial(round_node, agents=agents), async_execution)
+        if parallel_opening_round else None
+    )
+    
+    workflow = create_workflow(worker_nodes, traced_node("supervisor", supervisor, async_execution), opening_round=opening_round)
+    return workflow.compile(checkpointer=get_checkpointer() if checkpoints else None)
 
-workflow.add_conditional_edges("supervisor", lambda x: x["next"], conditional_map)
-workflow.set_entry_point("supervisor")
+# --- Checkpointed, resumable consultations ---
+# Every consultation is checkpointed per thread id after each node, so an interrupted
+# one resumes from its last completed node; CHECKPOINTS_ENABLED=false turns this off
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+# Only the most recently updated consultations (and forks) are kept in the checkpoint
+# file (CHECKPOINT_PATH); older ones are deleted when a new one starts, and their
+# `--resume <id>` / Streamlit `?consultation=<id>` links stop working. batch_runner.py
+# writes to its own file so a large batch never prunes these. 0 keeps every consultation
+CHECKPOINT_MAX_CONSULTATIONS = int(os.getenv("CHECKPOINT_MAX_CONSULTATIONS", "100"))
 
-# Compile the graph
-app = workflow.compile()
+@lazy_component
+def get_checkpointer():
+    from runtime.checkpoint import ThreadedSqliteSaver
+    return ThreadedSqliteSaver.open(
+        os.getenv("CHECKPOINT_PATH", str(script_dir / ".cache" / "checkpoints.sqlite")),
+        max_threads=CHECKPOINT_MAX_CONSULTATIONS or None
+    )
 
-def main():
-    idea = input("Please enter your business idea: ")
-    initial_messages = [HumanMessage(content=f"Analyze the following business idea and provide comprehensive consultation with data-driven insights. Business Idea: {idea}")]
-    
-    initial_state = {
-        "messages": initial_messages,
+def new_consultation_id():
+    import uuid
+    return uuid.uuid4().hex[:12]
+
+def consultation_config(consultation_id, recursion_limit=30):
+    """Run config for one consultation - the thread id keys its checkpoints"""
+    return {"recursion_limit": recursion_limit, "configurable": {"thread_id": consultation_id}}
+
+def get_consultation_snapshot(consultation_id):
+    """Latest checkpoint of a consultation, None if checkpoints are off or it never ran"""
+    if not CHECKPOINTS_ENABLED:
+        return None
+    snapshot = build_app().get_state(consultation_config(consultation_id))
+    return snapshot if snapshot.values else None
+
+def is_interrupted(snapshot):
+    """True when the consultation stopped before the graph finished"""
+    return bool(snapshot and snapshot.next)
+
+def list_fork_points(consultation_id):
+    """Checkpoints a consultation can be forked at, as (agent messages so far, last speaker), oldest first"""
+    points = {}
+    for snapshot in build_app().get_state_history(consultation_config(consultation_id)):
+        if snapshot.next == ("supervisor",) and snapshot.values.get("message_count"):
+            points.setdefault(snapshot.values["message_count"], snapshot)
+    return [(count, points[count].values.get("last_speaker", "")) for count in sorted(points)]
+
+def create_assumption_message(assumption):
+    return HumanMessage(
+        content=f"New assumption from the client: {assumption}\n"
+                f"Revisit the discussion so far in light of this change and adjust your recommendations.",
+        name="client_assumption"
+    )
+
+def fork_consultation(source_id, message_count, assumption, fork_id=None):
+    """Branch a stored consultation after its message_count-th agent message with a changed assumption.
+    
+    The fork is a new thread next to the source in the checkpoint store. Its
+    state (messages, RAG results, embeddings, stats) is copied from the source
+    checkpoint rather than regenerated, and search results are shared through
+    the search cache. Returns the fork's id - run it with a None input."""
+    if not CHECKPOINTS_ENABLED:
+        raise ValueError("Forking needs CHECKPOINTS_ENABLED=true")
+    app = build_app()
+    # History is newest first; the first match is the checkpoint the source continued from
+    for snapshot in app.get_state_history(consultation_config(source_id)):
+        if snapshot.next == ("supervisor",) and snapshot.values.get("message_count") == message_count:
+            break
+    else:
+        raise ValueError(f"Consultation {source_id} has no checkpoint after agent message {message_count}")
+    
+    fork_id = fork_id or new_consultation_id()
+    values = dict(snapshot.values)
+    values["messages"] = [*values["messages"], create_assumption_message(assumption)]
+    fork_config = consultation_config(fork_id)
+    fork_config["metadata"] = {"forked_from": source_id, "fork_message_count": message_count}
+    # Written as the last speaker's update, so the graph continues with the supervisor
+    app.update_state(fork_config, values, as_node=values["last_speaker"])
+    return fork_id
+
+def list_forks(consultation_id):
+    """Ids of the consultations forked from this one"""
+    checkpoints = get_checkpointer().list(None, filter={"forked_from": consultation_id})
+    return sorted({checkpoint.config["configurable"]["thread_id"] for checkpoint in checkpoints})
+
+# Module attributes from before the factory existed, created on first access
+LAZY_ATTRIBUTES = {
+    # Kept without checkpoints, so existing callers can still run them without a thread id
+    "app": lambda: build_app({"checkpoints": False}),
+    "async_app": lambda: build_app({"async_execution": True, "checkpoints": False}),
+    "llm": get_llm,
+    "llm_cache": get_llm_cache,
+    "search_cache": get_search_cache,
+    "enhanced_tools": get_search_tools,
+    "supervisor_chain": get_supervisor_chain,
+    "response_matcher": get_response_matcher,
+    "rag_knowledge_manager": get_rag_knowledge_manager,
+    "RAG_AVAILABLE": rag_available,
+    "SEMANTIC_MODEL": get_semantic_model,
+    "SEMANTIC_AVAILABLE": semantic_available
+}
+
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Set ASYNC_EXECUTION=true (or pass --async to main) to use the async graph
+ASYNC_EXECUTION = os.getenv("ASYNC_EXECUTION", "false").lower() == "true"
+
+# Set STREAM_TOKENS=false to show agent messages only once they are complete
+STREAM_TOKENS = os.getenv("STREAM_TOKENS", "true").lower() == "true"
+STREAM_MODES = ["updates", "messages"] if STREAM_TOKENS else ["updates"]
+
+def agent_token(chunk, metadata):
+    """(agent, run_id, text) for a streamed board-member token, None for any other message"""
+    from langchain_core.messages import AIMessage
+    
+    # The worker nodes tag their agent runs; supervisor and state messages carry no agent.
+    # Of concurrent best-of-n candidates only the first is shown
+    agent = metadata.get("agent")
+    if agent not in members or metadata.get("candidate") or not isinstance(chunk, AIMessage):
+        return None
+    if not isinstance(chunk.content, str) or not chunk.content:
+        return None
+    return agent, chunk.id, chunk.content
+
+def print_token(chunk, metadata, live):
+    """Echo one streamed token; a new LLM run (tool follow-up, regeneration) starts a new block"""
+    token = agent_token(chunk, metadata)
+    # Opening turns of the parallel round would interleave, they are printed once complete
+    if token is None or metadata.get("langgraph_node") != token[0]:
+        return
+    agent, run_id, text = token
+    if agent not in live or live[agent]["run_id"] != run_id:
+        if live:
+            print("\n")
+        live.clear()
+        live[agent] = {"run_id": run_id, "text": ""}
+        print(f"--- {agent} ---")
+    live[agent]["text"] += text
+    print(text, end="", flush=True)
+
+def print_consultation_output(output, live=None):
+    """Print one streamed graph update; messages already shown token by token only get their quality line"""
+    live = live if live is not None else {}
+    for key, value in output.items():
+        if key != "__end__" and "messages" in value and value['messages']:
+            # Show quality indicator
+            quality = value.get('conversation_quality', 1.0)
+            quality_indicator = "🟢" if quality > 0.7 else "🟡" if quality > 0.4 else "🔴"
+            
+            # The parallel round returns all four opening messages at once
+            new_messages = value['messages'] if key == "parallel_round" else value['messages'][-1:]
+            for message in new_messages:
+                agent_name = (message.name or key).upper()
+                streamed = live.pop(agent_name, None)
+                if streamed and streamed["text"].strip() == message.content.strip():
+                    print(f"\n{quality_indicator}\n")
+                    continue
+                # Not streamed, or another best-of-n candidate was kept
+                if streamed:
+                    print("\n")
+                print(f"--- {agent_name} {quality_indicator} ---")
+                print(message.content)
+                print()
+
+def print_stream_event(mode, payload, live, stats):
+    """Print one (mode, payload) event of a STREAM_MODES run, returns the latest consultation counters"""
+    if mode == "messages":
+        print_token(*payload, live)
+        return stats
+    print_consultation_output(payload, live)
+    return latest_stats(payload, stats)
+
+def latest_stats(output, stats):
+    """Pick up the per-consultation counters (repetition, prompt sizes, usage) from a streamed update"""
+    stats = dict(stats or {})
+    for value in output.values():
+        for key in ("repetition_stats", "prompt_tokens", "usage_stats"):
+            if value and value.get(key):
+                stats[key] = value[key]
+    return stats
+
+def prompt_cache_ratios(turn):
+    """(share of the prompt repeating the agent's previous one, share the provider served from its cache or None)"""
+    stable = turn.get("stable_prefix_tokens", 0) / turn["prompt_tokens"] if turn["prompt_tokens"] else 0.0
+    provider = turn.get("provider_prompt_tokens")
+    cached = turn.get("cached_prompt_tokens", 0) / provider if provider else None
+    return stable, cached
+
+def print_prompt_tokens(turns):
+    """Report the prompt size of every agent turn, how much of it is a reusable prefix and how many older messages were summarized"""
+    if not turns:
+        return
+    sizes = ", ".join(f"{turn['agent']} {turn['prompt_tokens']}" for turn in turns)
+    print(f"🧾 Prompt tokens per turn: {sizes} | max {max(turn['prompt_tokens'] for turn in turns)}, "
+          f"up to {max(turn['compacted'] for turn in turns)} older messages summarized")
+    ratios = []
+    for turn in turns:
+        stable, cached = prompt_cache_ratios(turn)
+        ratios.append(f"{turn['agent']} {stable:.0%}" + (f" ({cached:.0%} cached)" if cached is not None else ""))
+    print(f"🧊 Stable prompt prefix per turn (provider cache hits): {', '.join(ratios)}")
+
+def print_usage_stats(stats):
+    """Report tokens, calls and estimated cost of the consultation by agent, phase and purpose"""
+    if not stats or not stats["total"]["llm_calls"]:
+        return
+    print(f"💰 Usage: {format_usage(stats['total'])}")
+    for group in ("by_agent", "by_phase", "by_purpose"):
+        for key, bucket in sorted(stats[group].items()):
+            print(f"   {key}: {format_usage(bucket)}")
+    print(f"   RAG background research: {stats['total']['rag_context_tokens']:,} of the prompt tokens")
+
+def print_repetition_stats(stats):
+    """Report regenerated responses, tokens early aborts saved and best-of-n picks in this consultation"""
+    stats = {**empty_repetition_stats(), **(stats or {})}
+    if stats["regenerations"]:
+        print(f"✂️ Repetition: {stats['regenerations']} responses regenerated, {stats['early_aborts']} aborted early "
+              f"after {stats['tokens_aborted']} tokens, ~{stats['tokens_saved']} tokens saved")
+    if stats["best_of_n_turns"]:
+        print(f"🎯 Best-of-{BEST_OF_N}: {stats['best_of_n_turns']} turns, {stats['repetitions_avoided']} repetitions avoided")
+
+async def astream_consultation(initial_state, config):
+    """Async driver: stream a consultation through the async graph"""
+    stats = {}
+    live = {}
+    async for mode, payload in build_app({"async_execution": True}).astream(
+        initial_state, config=config, stream_mode=STREAM_MODES
+    ):
+        stats = print_stream_event(mode, payload, live, stats)
+    return stats
+
+def create_initial_state(request):
+    """Fresh consultation state for an initial user request"""
+    note_cassette_consultation(request)
+    return {
+        "messages": [HumanMessage(content=request)],
         "discussion_phase": "initial",
         "topics_discussed": [],
         "pending_questions": [],
@@ -742,39 +1666,93 @@ def main():
         "agent_call_counts": {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0},
         "conversation_quality": 1.0,
         "context_summary": "",
-        "agent_embeddings": {}
+        "business_idea": extract_business_idea(request),
+        "quality_window": [],
+        "agent_snippets": {},
+        "agent_embeddings": {},
+        "rag_results": {},
+        "repetition_stats": empty_repetition_stats(),
+        "prompt_tokens": [],
+        "prompt_digests": {},
+        "usage_stats": empty_usage_stats()
     }
+
+def create_consultation_request(idea):
+    """Initial user message for a business idea (CLI and batch runner)"""
+    return f"Analyze the following business idea and provide comprehensive consultation with data-driven insights. Business Idea: {idea}"
+
+def argv_value(flag):
+    """Value passed as `<flag> <value>` on the command line, if any"""
+    if flag in sys.argv:
+        index = sys.argv.index(flag) + 1
+        if index < len(sys.argv):
+            return sys.argv[index]
+    return None
+
+def resume_id_from_argv():
+    """Consultation id passed as `--resume <id>`, if any"""
+    return argv_value("--resume")
+
+def main():
+    resume_id = resume_id_from_argv()
+    fork_source = argv_value("--fork")
+    if fork_source:
+        # --fork <id> --at <agent messages> --assumption "<changed assumption>"
+        if not argv_value("--at") or not argv_value("--assumption"):
+            for count, speaker in list_fork_points(fork_source):
+                print(f"🔀 --at {count} (after {speaker})")
+            return
+        consultation_id = fork_consultation(fork_source, int(argv_value("--at")), argv_value("--assumption"))
+        graph_input = None
+        print(f"🔀 Consultation {consultation_id} forked from {fork_source} after {argv_value('--at')} agent messages")
+    elif resume_id:
+        snapshot = get_consultation_snapshot(resume_id)
+        if not is_interrupted(snapshot):
+            print(f"⚠️ No interrupted consultation with id {resume_id} to resume")
+            return
+        consultation_id, graph_input = resume_id, None
+        print(f"🔁 Resuming consultation {resume_id} after {snapshot.values.get('message_count', 0)} agent messages")
+    else:
+        idea = input("Please enter your business idea: ")
+        consultation_id, graph_input = new_consultation_id(), create_initial_state(create_consultation_request(idea))
+        if CHECKPOINTS_ENABLED:
+            print(f"🧵 Consultation {consultation_id} - if it gets interrupted, continue it with --resume {consultation_id}")
     
     print("\n--- Starting Enhanced Conversational AI Startup Consultation ---")
-    if RAG_AVAILABLE:
+    if rag_available():
         print("🔍 Full RAG system active: Agents have access to knowledge bases and real-time market data")
     else:
         print("🔍 Agents have access to real-time market data via TavilySearch")
     
-    if SEMANTIC_AVAILABLE:
+    if semantic_available():
         print("🧠 Semantic similarity detection active")
     
     print("🎯 Enhanced conversation flow, anti-repetition, participation-aware system active\n")
     
     # Add recursion limit to prevent infinite loops
-    config = {"recursion_limit": 30}
-    
-    for output in app.stream(initial_state, config=config):
-        for key, value in output.items():
-            if key != "__end__" and "messages" in value and value['messages']:
-                agent_name = key.upper()
-                agent_message = value['messages'][-1].content
-                
-                # Show quality indicator
-                quality = value.get('conversation_quality', 1.0)
-                quality_indicator = "🟢" if quality > 0.7 else "🟡" if quality > 0.4 else "🔴"
-                
-                print(f"--- {agent_name} {quality_indicator} ---")
-                print(agent_message)
-                print()
+    config = consultation_config(consultation_id, recursion_limit=30)
+    
+    # A None input continues the thread from its last checkpoint
+    if ASYNC_EXECUTION or "--async" in sys.argv:
+        stats = asyncio.run(astream_consultation(graph_input, config))
+    else:
+        stats = {}
+        live = {}
+        for mode, payload in build_app().stream(graph_input, config=config, stream_mode=STREAM_MODES):
+            stats = print_stream_event(mode, payload, live, stats)
     
     print("--- Enhanced Conversational Consultation Finished ---")
-    if RAG_AVAILABLE:
+    print_repetition_stats(stats.get("repetition_stats"))
+    print_prompt_tokens(stats.get("prompt_tokens"))
+    print_usage_stats(stats.get("usage_stats"))
+    print_llm_cache_stats()
+    print_search_cache_stats()
+    print_embedding_stats()
+    print_trace_summary()
+    print_cassette_stats()
+    print_rate_limit_stats()
+    print_hedging_stats()
+    if rag_available():
         print("💡 Your consultation included RAG-powered knowledge insights and real-time market research!")
     else:
         print("💡 Your consultation included real-time market research!")
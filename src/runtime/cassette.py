@@ -0,0 +1,331 @@
+import os
+import gzip
+import json
+import time
+import atexit
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+
+import httpx
+
+from runtime.lazy import lazy_component
+
+# Replayed responses are split into these events, so streaming still arrives token by token
+SSE_EVENT_SEPARATOR = "\n\n"
+
+
+def request_key(kind, *parts):
+    """Hash identifying a request; identical requests share a key and are replayed in recorded order"""
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def http_request_key(request):
+    """Method, URL and JSON body (canonicalized) of an outgoing OpenAI request"""
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True)
+    except (TypeError, ValueError):
+        pass
+    return request_key("http", request.method, str(request.url), body)
+
+
+class CassetteMiss(Exception):
+    """A replayed run made a request that is not in the cassette"""
+
+
+class Cassette:
+    """Recorded OpenAI and Tavily responses of real consultations, stored as gzip JSON.
+
+    In "record" mode requests go to the network and each response is kept
+    under a hash of its request; save() writes them, merged with what the
+    file already holds. In "replay" mode the same requests are answered
+    from the file in recorded order, without any network access.
+
+    latency (replay only): None for instant responses, "recorded" to wait as
+    long as the original response took, or a number of milliseconds."""
+
+    def __init__(self, path, mode, latency=None):
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.consultations = []
+        self.interactions = {}
+        self._cursors = {}
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with gzip.open(self.path, "rt", encoding="utf-8") as cassette_file:
+                data = json.load(cassette_file)
+            self.consultations = data.get("consultations", [])
+            self.interactions = data.get("interactions", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"No cassette at {self.path} to replay")
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    def record(self, key, interaction):
+        with self._lock:
+            self.interactions.setdefault(key, []).append(interaction)
+            self._stats["recorded"] += 1
+
+    def note_consultation(self, request):
+        """Remember the initial request of a recorded consultation, so benchmarks can run it again"""
+        with self._lock:
+            if request not in self.consultations:
+                self.consultations.append(request)
+
+    def next_interaction(self, key):
+        """Next recorded response for a request; repeated requests cycle through their recordings"""
+        with self._lock:
+            recordings = self.interactions.get(key)
+            if not recordings:
+                self._stats["misses"] += 1
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self._stats["replayed"] += 1
+            return recordings[cursor % len(recordings)]
+
+    def delays(self, interaction, chunks):
+        """(seconds before the response, seconds between chunks) to simulate in replay"""
+        if self.latency is None:
+            return 0.0, 0.0
+        if self.latency == "recorded":
+            first = interaction.get("ttfb", 0.0)
+            rest = max(interaction.get("elapsed", first) - first, 0.0)
+            return first, rest / chunks if chunks > 1 else 0.0
+        return float(self.latency) / 1000, 0.0
+
+    def save(self):
+        """Write the recorded interactions (no-op in replay mode)"""
+        if not self.recording:
+            return
+        with self._lock:
+            data = {"version": 1, "consultations": self.consultations, "interactions": self.interactions}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with gzip.open(temporary_path, "wt", encoding="utf-8") as cassette_file:
+                json.dump(data, cassette_file, separators=(",", ":"))
+            temporary_path.replace(self.path)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # --- Tavily ---
+
+    def search(self, key, fetch):
+        """Result of a search request - fetch() when recording, the cassette when replaying"""
+        if self.recording:
+            start = time.perf_counter()
+            result = fetch()
+            elapsed = time.perf_counter() - start
+            self.record(key, {"kind": "search", "result": result, "ttfb": elapsed, "elapsed": elapsed})
+            return result
+        interaction = self.next_interaction(key)
+        if interaction is None:
+            raise CassetteMiss(f"search request not recorded in {self.path}")
+        time.sleep(self.delays(interaction, 1)[0])
+        return interaction["result"]
+
+    async def asearch(self, key, afetch):
+        """Async variant of search"""
+        if self.recording:
+            start = time.perf_counter()
+            result = await afetch()
+            elapsed = time.perf_counter() - start
+            self.record(key, {"kind": "search", "result": result, "ttfb": elapsed, "elapsed": elapsed})
+            return result
+        interaction = self.next_interaction(key)
+        if interaction is None:
+            raise CassetteMiss(f"search request not recorded in {self.path}")
+        await asyncio.sleep(self.delays(interaction, 1)[0])
+        return interaction["result"]
+
+
+def _replay_chunks(interaction):
+    body = interaction["body"]
+    if SSE_EVENT_SEPARATOR not in body:
+        return [body.encode("utf-8")]
+    events = body.split(SSE_EVENT_SEPARATOR)
+    return [(event + SSE_EVENT_SEPARATOR).encode("utf-8") for event in events[:-1]] + (
+        [events[-1].encode("utf-8")] if events[-1] else []
+    )
+
+
+def _miss_response(cassette):
+    # A 400 is not retried by the OpenAI client, so a miss fails fast with this message
+    return httpx.Response(400, json={"error": {
+        "message": f"No recorded response for this request in cassette {cassette.path}",
+        "type": "cassette_miss"
+    }})
+
+
+def _recorded(interaction_start, response, body, finished):
+    return {
+        "kind": "http",
+        "status": response.status_code,
+        "content_type": response.headers.get("content-type", "application/json"),
+        "body": body.decode("utf-8", errors="replace"),
+        "ttfb": interaction_start[1] - interaction_start[0],
+        "elapsed": finished - interaction_start[0]
+    }
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Passes the response through while keeping a copy, recorded once the stream is closed"""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._body = bytearray()
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._body.extend(chunk)
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+        self._on_close(bytes(self._body))
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._body = bytearray()
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._body.extend(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+        self._on_close(bytes(self._body))
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, chunks, gap):
+        self._chunks = chunks
+        self._gap = gap
+
+    def __iter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if index and self._gap:
+                time.sleep(self._gap)
+            yield chunk
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks, gap):
+        self._chunks = chunks
+        self._gap = gap
+
+    async def __aiter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if index and self._gap:
+                await asyncio.sleep(self._gap)
+            yield chunk
+
+
+def _prepare_recording(request):
+    # Uncompressed bodies can be stored as text (the cassette itself is gzipped)
+    request.headers["accept-encoding"] = "identity"
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that records to or replays from a cassette"""
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        key = http_request_key(request)
+        if self.cassette.recording:
+            _prepare_recording(request)
+            start = time.perf_counter()
+            response = self.transport.handle_request(request)
+            timing = (start, time.perf_counter())
+            on_close = lambda body: self.cassette.record(key, _recorded(timing, response, body, time.perf_counter()))
+            return httpx.Response(
+                response.status_code, headers=response.headers,
+                stream=_RecordingStream(response.stream, on_close), extensions=response.extensions
+            )
+
+        interaction = self.cassette.next_interaction(key)
+        if interaction is None:
+            return _miss_response(self.cassette)
+        chunks = _replay_chunks(interaction)
+        first, gap = self.cassette.delays(interaction, len(chunks))
+        time.sleep(first)
+        return httpx.Response(
+            interaction["status"], headers={"content-type": interaction["content_type"]},
+            stream=_ReplayStream(chunks, gap)
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async variant of CassetteTransport"""
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        key = http_request_key(request)
+        if self.cassette.recording:
+            _prepare_recording(request)
+            start = time.perf_counter()
+            response = await self.transport.handle_async_request(request)
+            timing = (start, time.perf_counter())
+            on_close = lambda body: self.cassette.record(key, _recorded(timing, response, body, time.perf_counter()))
+            return httpx.Response(
+                response.status_code, headers=response.headers,
+                stream=_AsyncRecordingStream(response.stream, on_close), extensions=response.extensions
+            )
+
+        interaction = self.cassette.next_interaction(key)
+        if interaction is None:
+            return _miss_response(self.cassette)
+        chunks = _replay_chunks(interaction)
+        first, gap = self.cassette.delays(interaction, len(chunks))
+        await asyncio.sleep(first)
+        return httpx.Response(
+            interaction["status"], headers={"content-type": interaction["content_type"]},
+            stream=_AsyncReplayStream(chunks, gap)
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# --- Process-wide cassette, configured from the environment ---
+# CASSETTE_MODE=record captures every OpenAI (chat and embeddings) and Tavily request of
+# the process into CASSETTE_PATH; CASSETTE_MODE=replay answers them from it offline.
+# CASSETTE_LATENCY (replay): unset for instant, "recorded", or milliseconds per response
+@lazy_component
+def get_cassette():
+    """The configured cassette, or None when CASSETTE_MODE is not record/replay"""
+    mode = os.getenv("CASSETTE_MODE", "off").lower()
+    if mode not in ("record", "replay"):
+        return None
+    default_path = Path(__file__).parent.parent / ".cache" / "cassette.json.gz"
+    cassette = Cassette(os.getenv("CASSETTE_PATH", str(default_path)), mode, os.getenv("CASSETTE_LATENCY") or None)
+    if cassette.recording:
+        atexit.register(cassette.save)
+    return cassette
+
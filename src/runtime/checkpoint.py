@@ -0,0 +1,95 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from conversation.message_log import MessageLog
+
+
+class ConsultationSerializer(JsonPlusSerializer):
+    """Stores MessageLog channel values as plain message lists.
+
+    The graph code accepts plain lists (as_message_log) and the messages
+    reducer wraps them in a MessageLog again on the next append. The numpy
+    ring buffers in agent_embeddings are handled by JsonPlusSerializer."""
+
+    def dumps_typed(self, obj):
+        return super().dumps_typed(_plain_message_logs(obj))
+
+
+def _plain_message_logs(value):
+    """Replace MessageLogs (also inside dicts, e.g. the graph input in __start__) with lists"""
+    if isinstance(value, MessageLog):
+        return list(value)
+    if isinstance(value, dict):
+        return {key: _plain_message_logs(item) for key, item in value.items()}
+    return value
+
+
+class ThreadedSqliteSaver(SqliteSaver):
+    """SQLite checkpointer for both the sync and the async graph.
+
+    AsyncSqliteSaver ties its connection to the event loop it was opened on,
+    but Streamlit and the CLI start a fresh loop per consultation. Here the
+    async methods run the (lock-protected) sync ones in a worker thread, so
+    one saver and one compiled graph serve every loop.
+
+    With max_threads set, only that many consultations (the most recently
+    updated ones) are kept: whenever a thread gets its first checkpoint
+    from this saver, older threads beyond the limit are deleted."""
+
+    def __init__(self, conn, *, serde=None, max_threads=None):
+        super().__init__(conn, serde=serde)
+        self.max_threads = max_threads
+        self._known_threads = set()
+
+    @classmethod
+    def open(cls, database_path, max_threads=None):
+        database_path = Path(database_path)
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(database_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return cls(conn, serde=ConsultationSerializer(), max_threads=max_threads)
+
+    def prune(self, keep_threads):
+        """Delete all but the keep_threads most recently updated threads; returns how many were deleted"""
+        # Checkpoint ids are time-ordered (uuid6), so the largest one is a thread's last update
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                "ORDER BY MAX(checkpoint_id) DESC LIMIT -1 OFFSET ?",
+                (keep_threads,)
+            )
+            stale = [row[0] for row in cur.fetchall()]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        return len(stale)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        if self.max_threads and thread_id not in self._known_threads:
+            self._known_threads.add(thread_id)
+            self.prune(self.max_threads)
+        return result
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,32 @@
+import httpx
+
+from runtime.cassette import AsyncCassetteTransport, CassetteTransport, get_cassette
+from runtime.rate_limit import AsyncRateLimitedTransport, RateLimitedTransport, get_rate_limiter
+
+
+def openai_client_kwargs(limiter_name="openai"):
+    """http_client/http_async_client arguments for ChatOpenAI and OpenAIEmbeddings.
+
+    With CASSETTE_MODE set requests go to the cassette first; those that
+    reach the network pass the process-wide rate limiter `limiter_name`
+    ("openai" for chat, "openai_embeddings"), so replayed responses never
+    wait for it. {} when neither is enabled."""
+    cassette = get_cassette()
+    limiter = get_rate_limiter(limiter_name)
+    if cassette is None and limiter is None:
+        return {}
+    # The OpenAI client's own httpx defaults (timeouts, connection limits), with these transports
+    from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+    from openai._constants import DEFAULT_CONNECTION_LIMITS
+    transport = httpx.HTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+    async_transport = httpx.AsyncHTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+    if limiter is not None:
+        transport = RateLimitedTransport(limiter, transport)
+        async_transport = AsyncRateLimitedTransport(limiter, async_transport)
+    if cassette is not None:
+        transport = CassetteTransport(cassette, transport)
+        async_transport = AsyncCassetteTransport(cassette, async_transport)
+    return {
+        "http_client": DefaultHttpxClient(transport=transport),
+        "http_async_client": DefaultAsyncHttpxClient(transport=async_transport)
+    }
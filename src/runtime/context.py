@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Which board member an LLM/tool call is being made for. Set by the worker
+# nodes so caches and metrics can attribute calls without threading the name
+# through LangChain. Context variables follow asyncio tasks and the
+# LangChain executor helpers, so this also works for the async graph.
+current_agent = ContextVar("current_agent", default="unknown")
+# Discussion phase ("initial", "discussion", "synthesis") of the agent's turn
+current_phase = ContextVar("current_phase", default=None)
+
+
+@contextmanager
+def agent_context(name, phase=None):
+    """Attribute everything inside the block to agent `name` (in discussion phase `phase`)"""
+    token = current_agent.set(name)
+    phase_token = current_phase.set(phase)
+    try:
+        yield
+    finally:
+        current_phase.reset(phase_token)
+        current_agent.reset(token)
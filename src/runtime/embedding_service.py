@@ -0,0 +1,101 @@
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from runtime.stats import percentile
+
+
+class EmbeddingService:
+    """Micro-batches encode requests from concurrent consultations.
+
+    Requests are queued and picked up by one dedicated worker thread, which
+    waits until max_batch_size texts are queued or the oldest one has waited
+    max_wait_seconds, then encodes them in a single model call. Callers get
+    a Future per text."""
+
+    def __init__(self, model, max_batch_size=32, max_wait_seconds=0.005, metrics_window=1000):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._batch_sizes = deque(maxlen=metrics_window)
+        self._latencies = deque(maxlen=metrics_window)
+        self._inference_times = deque(maxlen=metrics_window)
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """Queue one text, returns a Future resolving to its embedding"""
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text):
+        """Blocking encode of one text through the batcher"""
+        return self.submit(text).result()
+
+    async def aencode(self, text):
+        """Async encode - waits for the batch without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the batch is full or its deadline passes"""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [text for text, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                embeddings = self.model.encode(texts, batch_size=len(texts))
+            except Exception as e:
+                with self._lock:
+                    self._errors += len(batch)
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes.append(len(batch))
+                self._inference_times.append(finished - start)
+                self._latencies.extend(finished - enqueued for _, _, enqueued in batch)
+            for (_, future, _), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+    def stats(self):
+        """Request/batch counters plus latency and batch-size figures over the recent window"""
+        with self._lock:
+            stats = {
+                "requests": self._requests,
+                "batches": self._batches,
+                "errors": self._errors,
+                "queued": self._queue.qsize()
+            }
+            if self._batches:
+                stats.update({
+                    "avg_batch_size": sum(self._batch_sizes) / len(self._batch_sizes),
+                    "max_batch_size": max(self._batch_sizes),
+                    "p50_latency_ms": percentile(self._latencies, 50) * 1000,
+                    "p95_latency_ms": percentile(self._latencies, 95) * 1000,
+                    "avg_inference_ms": sum(self._inference_times) / len(self._inference_times) * 1000
+                })
+            return stats
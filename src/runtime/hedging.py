@@ -0,0 +1,310 @@
+import time
+import queue
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from typing import Any, Optional
+
+from pydantic import Field
+
+from conversation.context_window import count_prompt_tokens
+from runtime.context import current_agent, current_phase
+from runtime.llm_cache import CachedChatOpenAI
+from runtime.stats import percentile
+
+# Latencies kept per agent/phase for the running percentile
+LATENCY_SAMPLES = 200
+
+
+class HedgingPolicy:
+    """When to send a duplicate LLM request, and how often that paid off.
+
+    Latencies - time to the first chunk for streamed calls, to the whole
+    response otherwise - are kept per (agent, phase, kind). Once a key has
+    min_samples, a call still unanswered after the key's running percentile
+    gets one duplicate, unless hedges would exceed `budget` (a share of all
+    calls). A hedged call is recorded with the time it took the caller, so
+    the percentile follows the latency agents actually see."""
+
+    def __init__(self, percentile=90, min_samples=5, budget=0.1):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget = budget
+        self._latencies = {}
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0, "extra_prompt_tokens": 0}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Count a call; seconds to wait before hedging it, or None while the key has too few samples"""
+        with self._lock:
+            self._stats["calls"] += 1
+            samples = self._latencies.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            return percentile(samples, self.percentile)
+
+    def try_hedge(self, prompt_tokens):
+        """Reserve a hedge within the budget; its prompt is the extra spend"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+                self._stats["over_budget"] += 1
+                return False
+            self._stats["hedged"] += 1
+            self._stats["extra_prompt_tokens"] += prompt_tokens
+            return True
+
+    def observe(self, key, latency, hedge_won=False):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=LATENCY_SAMPLES)).append(latency)
+            self._stats["hedge_wins"] += hedge_won
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hedge_rate"] = stats["hedged"] / stats["calls"] if stats["calls"] else 0.0
+        stats["win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        return stats
+
+
+def _pump(produce, index, stop, events):
+    """Run one attempt in a thread, passing its items to the racing caller until it is told to stop"""
+    iterator = None
+    try:
+        iterator = produce()
+        for item in iterator:
+            if stop.is_set():
+                return
+            events.put((index, "item", item))
+        events.put((index, "end", None))
+    except Exception as e:
+        events.put((index, "error", e))
+    finally:
+        # Closing a losing stream closes its HTTP response
+        close = getattr(iterator, "close", None)
+        if close:
+            close()
+
+
+async def _apump(produce, index, events):
+    try:
+        async for item in produce():
+            events.put_nowait((index, "item", item))
+        events.put_nowait((index, "end", None))
+    except Exception as e:
+        events.put_nowait((index, "error", e))
+
+
+class _Race:
+    """Which attempt answered first, and the bookkeeping around it"""
+
+    def __init__(self, policy, key, delay, prompt_tokens):
+        self.policy = policy
+        self.key = key
+        self.delay = delay
+        self.prompt_tokens = prompt_tokens
+        self.start = time.perf_counter()
+        self.launched = 1
+        self.failed = 0
+        self.winner = None
+
+    def timeout(self):
+        """Seconds until the hedge is due, or None once it is sent or refused"""
+        if self.launched > 1 or self.delay is None:
+            return None
+        return max(0.0, self.delay - (time.perf_counter() - self.start))
+
+    def due(self):
+        """The hedge delay passed - may a duplicate be sent?"""
+        self.delay = None
+        if self.policy.try_hedge(self.prompt_tokens):
+            self.launched += 1
+            return True
+        return False
+
+    def settle(self, index, kind, payload):
+        """Feed the first event of an attempt; True once a winner is known"""
+        if kind == "error":
+            self.failed += 1
+            # A failing hedge falls back to the other attempt; hedging never turns into a retry
+            if self.failed == self.launched:
+                raise payload
+            return False
+        self.winner = index
+        self.policy.observe(self.key, time.perf_counter() - self.start, hedge_won=index > 0)
+        return True
+
+
+class HedgedChatOpenAI(CachedChatOpenAI):
+    """ChatOpenAI that races a duplicate request against slow agent calls.
+
+    Only calls made for a board member (runtime.context.current_agent) are
+    hedged. The first attempt to produce a chunk (or a response) wins and
+    the other one is cancelled; a sync request that has not answered yet
+    cannot be interrupted, so its response is discarded once it arrives.
+    Streaming callbacks only see the winning attempt. Cached responses are
+    served before any attempt is made."""
+
+    hedging: Optional[Any] = Field(default=None, exclude=True)
+
+    def _hedge_key(self, kind):
+        agent = current_agent.get()
+        if self.hedging is None or agent == "unknown":
+            return None
+        return (agent, current_phase.get(), kind)
+
+    def _race(self, race, produce):
+        events = queue.Queue()
+        stops = []
+
+        def launch(index):
+            stop = threading.Event()
+            stops.append(stop)
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(_pump, produce, index, stop, events), daemon=True).start()
+
+        launch(0)
+        try:
+            first = None
+            while first is None:
+                try:
+                    index, kind, payload = events.get(timeout=race.timeout())
+                except queue.Empty:
+                    if race.due():
+                        launch(1)
+                    continue
+                if race.settle(index, kind, payload):
+                    first = (kind, payload)
+            for index, stop in enumerate(stops):
+                if index != race.winner:
+                    stop.set()
+
+            kind, payload = first
+            while kind == "item":
+                yield payload
+                index, kind, payload = events.get()
+                while index != race.winner:
+                    index, kind, payload = events.get()
+            if kind == "error":
+                raise payload
+        finally:
+            for stop in stops:
+                stop.set()
+
+    async def _arace(self, race, produce):
+        events = asyncio.Queue()
+        tasks = [asyncio.create_task(_apump(produce, 0, events))]
+        try:
+            first = None
+            while first is None:
+                try:
+                    index, kind, payload = await asyncio.wait_for(events.get(), race.timeout())
+                except asyncio.TimeoutError:
+                    if race.due():
+                        tasks.append(asyncio.create_task(_apump(produce, 1, events)))
+                    continue
+                if race.settle(index, kind, payload):
+                    first = (kind, payload)
+            for index, task in enumerate(tasks):
+                if index != race.winner:
+                    task.cancel()
+
+            kind, payload = first
+            while kind == "item":
+                yield payload
+                index, kind, payload = await events.get()
+                while index != race.winner:
+                    index, kind, payload = await events.get()
+            if kind == "error":
+                raise payload
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._hedge_key("response")
+        upstream = super()._generate
+        if key is None:
+            return upstream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        delay = self.hedging.begin(key)
+        if delay is None:
+            start = time.perf_counter()
+            result = upstream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            self.hedging.observe(key, time.perf_counter() - start)
+            return result
+        race = _Race(self.hedging, key, delay, count_prompt_tokens(messages))
+        results = self._race(race, lambda: iter([upstream(messages, stop=stop, **kwargs)]))
+        try:
+            return next(results)
+        finally:
+            results.close()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._hedge_key("response")
+        upstream = super()._agenerate
+        if key is None:
+            return await upstream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        delay = self.hedging.begin(key)
+        if delay is None:
+            start = time.perf_counter()
+            result = await upstream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            self.hedging.observe(key, time.perf_counter() - start)
+            return result
+
+        async def produce():
+            yield await upstream(messages, stop=stop, **kwargs)
+
+        race = _Race(self.hedging, key, delay, count_prompt_tokens(messages))
+        results = self._arace(race, produce)
+        try:
+            return await results.__anext__()
+        finally:
+            await results.aclose()
+
+    def _stream_response(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._hedge_key("first_chunk")
+        upstream = super()._stream_response
+        if key is None:
+            yield from upstream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+        delay = self.hedging.begin(key)
+        if delay is None:
+            start = time.perf_counter()
+            for index, chunk in enumerate(upstream(messages, stop=stop, run_manager=run_manager, **kwargs)):
+                if not index:
+                    self.hedging.observe(key, time.perf_counter() - start)
+                yield chunk
+            return
+        # The attempts stream without callbacks; only the winner's tokens are reported
+        race = _Race(self.hedging, key, delay, count_prompt_tokens(messages))
+        for chunk in self._race(race, lambda: upstream(messages, stop=stop, **kwargs)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream_response(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._hedge_key("first_chunk")
+        upstream = super()._astream_response
+        if key is None:
+            async for chunk in upstream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+        delay = self.hedging.begin(key)
+        if delay is None:
+            start = time.perf_counter()
+            first = True
+            async for chunk in upstream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                if first:
+                    self.hedging.observe(key, time.perf_counter() - start)
+                    first = False
+                yield chunk
+            return
+        race = _Race(self.hedging, key, delay, count_prompt_tokens(messages))
+        results = self._arace(race, lambda: upstream(messages, stop=stop, **kwargs))
+        try:
+            async for chunk in results:
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        finally:
+            await results.aclose()
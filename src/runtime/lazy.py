@@ -0,0 +1,25 @@
+import functools
+import threading
+
+# One re-entrant lock for all components: factories call other getters
+_lock = threading.RLock()
+
+
+def lazy_component(factory):
+    """Create a component on first use and return the same instance afterwards.
+
+    Arguments are part of the cache key, so a factory taking a config
+    builds one instance per distinct config. Safe to call from several
+    threads - the factory runs only once per key."""
+    instances = {}
+
+    @functools.wraps(factory)
+    def get(*args):
+        if args not in instances:
+            with _lock:
+                if args not in instances:
+                    instances[args] = factory(*args)
+        return instances[args]
+
+    get.is_loaded = lambda *args: args in instances
+    return get
@@ -0,0 +1,267 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from langchain_core.caches import BaseCache
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_openai import ChatOpenAI
+
+from runtime.context import current_agent
+
+# Fields that change between otherwise identical requests (run ids, token
+# usage of earlier tool-call steps) and must not be part of the cache key
+VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+_bypass = ContextVar("llm_cache_bypass", default=False)
+# Set while BaseChatModel's own cache check (invoke/generate) runs, so a
+# streamed call made from it is not looked up a second time
+_checked = ContextVar("llm_cache_checked", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip the response cache (read and write) for calls inside the block"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _strip_volatile_fields(node):
+    if isinstance(node, dict):
+        return {
+            key: _strip_volatile_fields(value)
+            for key, value in node.items()
+            if key not in VOLATILE_MESSAGE_FIELDS
+        }
+    if isinstance(node, list):
+        return [_strip_volatile_fields(item) for item in node]
+    return node
+
+
+def canonical_cache_key(prompt, llm_string):
+    """Hash of the model/sampling params/bound tools (llm_string) and the rendered messages"""
+    try:
+        prompt = json.dumps(_strip_volatile_fields(json.loads(prompt)), sort_keys=True)
+    except (TypeError, ValueError):
+        pass
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteResponseCache(BaseCache):
+    """Disk-backed LLM response cache with size and age based eviction.
+
+    Plugs into any LangChain chat model through its `cache=` argument.
+    Entries older than max_age_seconds are treated as misses; once more
+    than max_entries are stored the least recently used ones are evicted.
+    Hit/miss counters are kept per agent (see runtime.context)."""
+
+    def __init__(self, database_path, max_entries=10000, max_age_seconds=7 * 24 * 3600, bypass=False):
+        self.database_path = Path(database_path)
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self._stats = {}
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.database_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)")
+        self._conn.commit()
+
+    def _is_bypassed(self):
+        return self.bypass or _bypass.get()
+
+    def _count(self, outcome):
+        agent = current_agent.get()
+        with self._lock:
+            agent_stats = self._stats.setdefault(agent, {"hits": 0, "misses": 0})
+            agent_stats[outcome] += 1
+
+    def lookup(self, prompt, llm_string):
+        if self._is_bypassed():
+            return None
+
+        key = canonical_cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row:
+                self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+
+        if not row:
+            self._count("misses")
+            return None
+
+        try:
+            generations = loads(row[0])
+        except Exception:
+            # Written by an incompatible LangChain version - treat as a miss
+            self._count("misses")
+            return None
+        self._count("hits")
+        return generations
+
+    def update(self, prompt, llm_string, return_val):
+        if self._is_bypassed():
+            return
+
+        key = canonical_cache_key(prompt, llm_string)
+        now = time.time()
+        value = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.max_age_seconds,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._stats = {}
+
+    def stats(self):
+        """Hit/miss counters per agent"""
+        with self._lock:
+            return {agent: dict(counts) for agent, counts in self._stats.items()}
+
+
+def _cached_chunk(generation):
+    """A cached generation as the single chunk of a stream"""
+    message = generation.message
+    tool_call_chunks = [
+        {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index, "type": "tool_call_chunk"}
+        for index, call in enumerate(getattr(message, "tool_calls", None) or [])
+    ]
+    usage = message.usage_metadata
+    if usage:
+        # Cache hits only carry the zeroed total_cost when no usage was stored
+        usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, **usage}
+    chunk = AIMessageChunk(
+        content=message.content,
+        additional_kwargs=message.additional_kwargs,
+        response_metadata=message.response_metadata,
+        usage_metadata=usage,
+        tool_call_chunks=tool_call_chunks
+    )
+    return ChatGenerationChunk(message=chunk, generation_info=generation.generation_info)
+
+
+class CachedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose streamed calls use the response cache as well.
+
+    BaseChatModel only consults `cache=` in invoke()/generate(); stream(),
+    which the agent executors use, goes straight to _stream. Here a cached
+    response is replayed as one chunk, and a stream that runs to its end
+    is stored (an aborted one is not). Subclasses change how a response is
+    produced by overriding _stream_response/_astream_response."""
+
+    def _stream_cache(self):
+        if _checked.get() or not isinstance(self.cache, BaseCache):
+            return None
+        return self.cache
+
+    def _generate_with_cache(self, *args, **kwargs):
+        token = _checked.set(True)
+        try:
+            return super()._generate_with_cache(*args, **kwargs)
+        finally:
+            _checked.reset(token)
+
+    async def _agenerate_with_cache(self, *args, **kwargs):
+        token = _checked.set(True)
+        try:
+            return await super()._agenerate_with_cache(*args, **kwargs)
+        finally:
+            _checked.reset(token)
+
+    def _stream_response(self, messages, stop=None, run_manager=None, **kwargs):
+        return super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _astream_response(self, messages, stop=None, run_manager=None, **kwargs):
+        return super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = self._stream_cache()
+        if cache is None:
+            yield from self._stream_response(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+        llm_string = self._get_llm_string(stop=stop, **kwargs)
+        prompt = dumps(messages)
+        cached = cache.lookup(prompt, llm_string)
+        if isinstance(cached, list):
+            for generation in self._convert_cached_generations(cached):
+                chunk = _cached_chunk(generation)
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            return
+        chunks = []
+        for chunk in self._stream_response(messages, stop=stop, run_manager=run_manager, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        cache.update(prompt, llm_string, generate_from_stream(iter(chunks)).generations)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = self._stream_cache()
+        if cache is None:
+            async for chunk in self._astream_response(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+        llm_string = self._get_llm_string(stop=stop, **kwargs)
+        prompt = dumps(messages)
+        cached = await cache.alookup(prompt, llm_string)
+        if isinstance(cached, list):
+            for generation in self._convert_cached_generations(cached):
+                chunk = _cached_chunk(generation)
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            return
+        chunks = []
+        async for chunk in self._astream_response(messages, stop=stop, run_manager=run_manager, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        await cache.aupdate(prompt, llm_string, generate_from_stream(iter(chunks)).generations)
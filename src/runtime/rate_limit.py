@@ -0,0 +1,385 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+
+import httpx
+
+from conversation.context_window import count_tokens
+from runtime.lazy import lazy_component
+from runtime.stats import percentile
+
+# A bucket holds this many seconds of its per-minute rate, so short bursts go out at once
+BURST_SECONDS = 10
+# Completion tokens counted against the TPM budget when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+# Queue waits kept for the percentiles
+WAIT_SAMPLES = 2000
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `per_minute`; reservations may overdraw it and wait"""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """Take `amount` and return the seconds to wait before it may be spent"""
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def pause(self, seconds):
+        """Nothing more is handed out for the next `seconds` (a 429 with Retry-After); the burst allowance refills from zero"""
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, -seconds * self.rate)
+
+
+class AdaptiveConcurrency:
+    """In-flight request limit adjusted by AIMD.
+
+    Every successful response adds 1/limit (about +1 per round trip), a 429
+    halves the limit and a response slower than `latency_tolerance` times
+    the usual one cuts it by a tenth; cancelled requests change nothing.
+    Only requests started after the last cut can cut it again, so one burst
+    of 429s halves it once. Sync callers
+    block on a condition, async callers on a future of their event loop."""
+
+    def __init__(self, maximum, latency_tolerance=3.0, minimum=1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self.epoch = 0
+        self.baseline = None
+        self._condition = threading.Condition()
+        self._async_waiters = []
+
+    def _free(self):
+        return self.in_flight < max(self.minimum, int(self.limit))
+
+    def acquire(self):
+        with self._condition:
+            while not self._free():
+                self._condition.wait()
+            self.in_flight += 1
+            return self.epoch
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._free():
+                    self.in_flight += 1
+                    return self.epoch
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, epoch, latency=None, throttled=False, failed=False):
+        with self._condition:
+            self.in_flight -= 1
+            slow = (
+                latency is not None and self.baseline is not None
+                and latency > self.latency_tolerance * self.baseline
+            )
+            if (throttled or failed or slow) and epoch == self.epoch:
+                self.limit = max(self.minimum, self.limit * (0.5 if throttled else 0.9))
+                self.epoch += 1
+            elif latency is not None and not (throttled or failed or slow):
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if latency is not None and not throttled:
+                self.baseline = latency if self.baseline is None else 0.95 * self.baseline + 0.05 * latency
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets plus adaptive concurrency for one upstream API.
+
+    acquire() waits for the buckets, then for a concurrency slot, and
+    returns a lease; release() reports how the request went. The time
+    spent waiting is the queue wait reported by stats()."""
+
+    def __init__(self, name, rpm, tpm=0, max_concurrency=32, latency_tolerance=3.0):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, latency_tolerance)
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._stats = {"requests": 0, "throttled": 0, "failed": 0, "queued": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        waits = [0.0]
+        if self.requests:
+            waits.append(self.requests.reserve(1))
+        if self.tokens and tokens:
+            waits.append(self.tokens.reserve(tokens))
+        return max(waits)
+
+    def _lease(self, start, epoch):
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["queued"] += wait > 0.001
+            self._stats["wait_s"] += wait
+            self._stats["max_wait_s"] = max(self._stats["max_wait_s"], wait)
+            self._waits.append(wait)
+        return {"epoch": epoch, "sent": time.perf_counter(), "released": False}
+
+    def acquire(self, tokens=0):
+        start = time.perf_counter()
+        time.sleep(self._reserve(tokens))
+        return self._lease(start, self.concurrency.acquire())
+
+    async def acquire_async(self, tokens=0):
+        start = time.perf_counter()
+        await asyncio.sleep(self._reserve(tokens))
+        return self._lease(start, await self.concurrency.acquire_async())
+
+    def observe(self, lease, throttled=False, retry_after=None, failed=False):
+        """Feed the response (headers) of a leased request into the AIMD control"""
+        lease["latency"] = time.perf_counter() - lease["sent"]
+        lease["throttled"] = throttled
+        lease["failed"] = failed
+        if throttled:
+            for bucket in (self.requests, self.tokens):
+                if bucket:
+                    bucket.pause(retry_after or 1.0)
+        with self._lock:
+            self._stats["throttled"] += throttled
+            self._stats["failed"] += failed
+
+    def release(self, lease):
+        """Free the concurrency slot (once the response has been read)"""
+        if lease["released"]:
+            return
+        lease["released"] = True
+        self.concurrency.release(
+            lease["epoch"], lease.get("latency"), lease.get("throttled", False), lease.get("failed", False)
+        )
+
+    def call(self, fetch, tokens=0):
+        """fetch() under the limiter; a Tavily "Error 429" result counts as throttled"""
+        lease = self.acquire(tokens)
+        try:
+            result = fetch()
+        except Exception:
+            self.observe(lease, failed=True)
+            raise
+        else:
+            self.observe(lease, throttled=is_throttled_result(result))
+            return result
+        finally:
+            self.release(lease)
+
+    async def acall(self, afetch, tokens=0):
+        """Async variant of call"""
+        lease = await self.acquire_async(tokens)
+        try:
+            result = await afetch()
+        except Exception:
+            self.observe(lease, failed=True)
+            raise
+        else:
+            self.observe(lease, throttled=is_throttled_result(result))
+            return result
+        finally:
+            self.release(lease)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            waits = list(self._waits)
+        stats["p50_wait_s"] = percentile(waits, 50) if waits else 0.0
+        stats["p95_wait_s"] = percentile(waits, 95) if waits else 0.0
+        stats["concurrency_limit"] = int(self.concurrency.limit)
+        return stats
+
+
+def is_throttled_result(result):
+    """TavilySearch returns request errors as {"error": ...}; 429s read "Error 429: ..." """
+    return isinstance(result, dict) and str(result.get("error", "")).startswith("Error 429")
+
+
+def retry_after_seconds(response):
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return float(response.headers[header]) / scale
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def estimate_request_tokens(request):
+    """Tokens an OpenAI request counts against the TPM limit: its input plus the completion it may produce"""
+    try:
+        body = json.loads(request.content)
+    except (TypeError, ValueError):
+        return 0
+    if not isinstance(body, dict):
+        return 0
+    if "messages" in body:
+        prompt = sum(count_tokens(json.dumps(message.get("content"), ensure_ascii=False)) for message in body["messages"])
+        if body.get("functions") or body.get("tools"):
+            prompt += count_tokens(json.dumps(body.get("functions") or body.get("tools")))
+        completion = body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+        return prompt + completion * body.get("n", 1)
+    inputs = body.get("input", [])
+    inputs = inputs if isinstance(inputs, list) and inputs and not isinstance(inputs[0], int) else [inputs]
+    # OpenAIEmbeddings sends pre-tokenized inputs (lists of token ids)
+    return sum(len(item) if isinstance(item, list) else count_tokens(str(item)) for item in inputs)
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Holds the concurrency slot until the (possibly streamed) response is read"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        # Also when the reader stops early: the slot must not wait for the response to be collected
+        try:
+            yield from self._stream
+        finally:
+            self._release()
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._release()
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport that sends every request through a RateLimiter.
+
+    The OpenAI client's own retries come back through here, so they queue
+    behind the limiter instead of hitting the API again right away."""
+
+    def __init__(self, limiter, transport=None):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        lease = self.limiter.acquire(estimate_request_tokens(request))
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            self.limiter.observe(lease, failed=True)
+            self.limiter.release(lease)
+            raise
+        self.limiter.observe(lease, throttled=response.status_code == 429, retry_after=retry_after_seconds(response))
+        return httpx.Response(
+            response.status_code, headers=response.headers,
+            stream=_ReleasingStream(response.stream, lambda: self.limiter.release(lease)),
+            extensions=response.extensions
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async variant of RateLimitedTransport"""
+
+    def __init__(self, limiter, transport=None):
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        lease = await self.limiter.acquire_async(estimate_request_tokens(request))
+        try:
+            response = await self.transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            # An abandoned request frees its slot without counting as congestion
+            self.limiter.release(lease)
+            raise
+        except Exception:
+            self.limiter.observe(lease, failed=True)
+            self.limiter.release(lease)
+            raise
+        self.limiter.observe(lease, throttled=response.status_code == 429, retry_after=retry_after_seconds(response))
+        return httpx.Response(
+            response.status_code, headers=response.headers,
+            stream=_AsyncReleasingStream(response.stream, lambda: self.limiter.release(lease)),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# --- Process-wide limiters, configured from the environment ---
+# One limiter per upstream API, shared by every client of the process: "openai" (chat,
+# OPENAI_RPM / OPENAI_TPM), "openai_embeddings" (OPENAI_EMBEDDING_RPM / OPENAI_EMBEDDING_TPM;
+# own budget, and its millisecond latencies would skew the chat baseline) and "tavily"
+# (TAVILY_RPM). RATE_LIMIT_MAX_CONCURRENCY caps the in-flight requests per API; responses
+# slower than RATE_LIMIT_LATENCY_TOLERANCE times the usual one lower it like 429s do.
+# RATE_LIMIT_ENABLED=false turns it all off
+@lazy_component
+def get_rate_limiters():
+    """{"openai": ..., "openai_embeddings": ..., "tavily": RateLimiter}, or {} when rate limiting is disabled"""
+    if os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "true":
+        return {}
+    max_concurrency = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "32"))
+    latency_tolerance = float(os.getenv("RATE_LIMIT_LATENCY_TOLERANCE", "3"))
+    return {
+        "openai": RateLimiter(
+            "openai", int(os.getenv("OPENAI_RPM", "3500")), int(os.getenv("OPENAI_TPM", "200000")),
+            max_concurrency, latency_tolerance
+        ),
+        "openai_embeddings": RateLimiter(
+            "openai_embeddings", int(os.getenv("OPENAI_EMBEDDING_RPM", "3000")),
+            int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000")), max_concurrency, latency_tolerance
+        ),
+        "tavily": RateLimiter(
+            "tavily", int(os.getenv("TAVILY_RPM", "100")), 0, max_concurrency, latency_tolerance
+        )
+    }
+
+
+def get_rate_limiter(name):
+    return get_rate_limiters().get(name)
@@ -0,0 +1,92 @@
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+
+
+class RepetitionDetected(Exception):
+    """Raised from the token stream once a partial response repeats an earlier one"""
+
+    def __init__(self, tokens):
+        super().__init__(f"partial response repeats an earlier one after {tokens} tokens")
+        self.tokens = tokens
+
+
+class RepetitionGuard(BaseCallbackHandler):
+    """Checks a streaming response every check_every tokens and aborts it when it repeats.
+
+    is_repetition(text) gets the partial text of the current LLM run. Raising
+    from the callback (raise_error) cancels the stream, so the tokens wasted
+    on a near-duplicate are bounded by the check interval. Only the first
+    max_tokens tokens are checked: the sentence embedding truncates its input
+    (256 word pieces for all-MiniLM-L6-v2), so later checks would embed a
+    longer text to the same vector. That bounds the work per response to
+    max_tokens / check_every encodes of at most max_tokens tokens."""
+
+    raise_error = True
+
+    def __init__(self, is_repetition, check_every=40, max_tokens=256):
+        self.is_repetition = is_repetition
+        self.check_every = check_every
+        self.max_tokens = max_tokens
+        self._runs = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._runs[run_id] = []
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._runs[run_id] = []
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        tokens = self._runs.setdefault(run_id, [])
+        if len(tokens) >= self.max_tokens:
+            return
+        tokens.append(token)
+        if len(tokens) % self.check_every == 0 and self.is_repetition("".join(tokens)):
+            raise RepetitionDetected(len(tokens))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+
+class AsyncRepetitionGuard(AsyncCallbackHandler):
+    """Async variant of RepetitionGuard - is_repetition is a coroutine function"""
+
+    raise_error = True
+
+    def __init__(self, is_repetition, check_every=40, max_tokens=256):
+        self.is_repetition = is_repetition
+        self.check_every = check_every
+        self.max_tokens = max_tokens
+        self._runs = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._runs[run_id] = []
+
+    async def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._runs[run_id] = []
+
+    async def on_llm_new_token(self, token, *, run_id, **kwargs):
+        tokens = self._runs.setdefault(run_id, [])
+        if len(tokens) >= self.max_tokens:
+            return
+        tokens.append(token)
+        if len(tokens) % self.check_every == 0 and await self.is_repetition("".join(tokens)):
+            raise RepetitionDetected(len(tokens))
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+
+def empty_repetition_stats():
+    """Per-consultation counters kept in AgentState["repetition_stats"]"""
+    return {
+        "regenerations": 0, "early_aborts": 0, "tokens_aborted": 0, "tokens_saved": 0,
+        "best_of_n_turns": 0, "repetitions_avoided": 0
+    }
+
+
+def merge_repetition_stats(stats, delta):
+    """Add a turn's repetition outcome to the consultation totals"""
+    merged = dict(empty_repetition_stats())
+    merged.update(stats or {})
+    for key, value in delta.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
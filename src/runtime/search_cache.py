@@ -0,0 +1,232 @@
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from langchain_tavily import TavilySearch
+from pydantic import Field
+
+# Tool settings that change what a search returns
+TOOL_CACHE_PARAMS = (
+    "include_domains", "exclude_domains", "search_depth", "max_results", "topic",
+    "time_range", "include_answer", "include_raw_content", "include_images", "country"
+)
+
+
+def normalize_query(query):
+    """Collapse case, whitespace and surrounding punctuation so near-identical queries share an entry"""
+    query = re.sub(r"\s+", " ", str(query).casefold()).strip()
+    return query.strip(" \"'`.,;:!?")
+
+
+def _canonical(value):
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_canonical(item) for item in value)
+    return value
+
+
+class SQLiteSearchStore:
+    """Search results on disk, so they outlive the process.
+
+    Restarted apps, resumed and forked consultations then reuse the searches
+    of the original run instead of repeating them."""
+
+    def __init__(self, database_path, ttl_seconds):
+        database_path = Path(database_path)
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(database_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results (key TEXT PRIMARY KEY, result TEXT, stored_at REAL)"
+            )
+            self._conn.execute("DELETE FROM search_results WHERE stored_at < ?", (time.time() - ttl_seconds,))
+
+    def get(self, key, max_age_seconds):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM search_results WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - max_age_seconds)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, result):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, result, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result, default=str), time.time())
+            )
+
+
+def search_key(query, params):
+    """Hash of the normalized query and every parameter that affects the results"""
+    payload = {
+        "query": normalize_query(query),
+        "params": {key: _canonical(value) for key, value in sorted(params.items()) if value is not None}
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """TTL cache for search results with singleflight de-duplication.
+
+    Concurrent identical queries (same normalized query and domain filters)
+    collapse into a single upstream request; callers that arrive while it
+    is in flight wait for its result. Errors are never cached. With a
+    store, entries are also written to disk and looked up there on a miss."""
+
+    def __init__(self, ttl_seconds=6 * 3600, max_entries=2000, store=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def make_key(self, query, params):
+        return search_key(query, params)
+
+    def _count(self, label, outcome):
+        tool_stats = self._stats.setdefault(label, {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0})
+        tool_stats[outcome] += 1
+
+    def _claim(self, label, key):
+        """Under the lock: return ("hit", result), ("wait", future) or ("lead", future)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(label, "hits")
+                return "hit", entry[1]
+            if entry:
+                del self._entries[key]
+
+            stored = self.store.get(key, self.ttl_seconds) if self.store else None
+            if stored is not None:
+                self._remember(key, stored)
+                self._count(label, "hits")
+                return "hit", stored
+
+            future = self._in_flight.get(key)
+            if future:
+                self._count(label, "coalesced")
+                return "wait", future
+
+            future = Future()
+            self._in_flight[key] = future
+            self._count(label, "misses")
+            return "lead", future
+
+    def _remember(self, key, result):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _settle(self, label, key, future, result=None, error=None):
+        cacheable = error is None and not (isinstance(result, dict) and "error" in result)
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if cacheable:
+                self._remember(key, result)
+            else:
+                self._count(label, "errors")
+        if cacheable and self.store:
+            self.store.put(key, result)
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def get_or_fetch(self, label, key, fetch):
+        """Return a cached result, wait for an identical in-flight request, or call fetch()"""
+        outcome, value = self._claim(label, key)
+        if outcome == "hit":
+            return value
+        if outcome == "wait":
+            return value.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            self._settle(label, key, value, error=e)
+            raise
+        self._settle(label, key, value, result=result)
+        return result
+
+    async def aget_or_fetch(self, label, key, afetch):
+        """Async variant of get_or_fetch - waiting callers do not block the event loop"""
+        outcome, value = self._claim(label, key)
+        if outcome == "hit":
+            return value
+        if outcome == "wait":
+            return await asyncio.wrap_future(value)
+
+        try:
+            result = await afetch()
+        except BaseException as e:
+            self._settle(label, key, value, error=e)
+            raise
+        self._settle(label, key, value, result=result)
+        return result
+
+    def stats(self):
+        """Hit/miss/coalesced/error counters per tool"""
+        with self._lock:
+            return {label: dict(counts) for label, counts in self._stats.items()}
+
+
+class CachedTavilySearch(TavilySearch):
+    """TavilySearch that goes through a shared SearchResultCache (and a rate limiter and cassette, when set)"""
+
+    cache_label: str = "tavily"
+    result_cache: Optional[Any] = Field(default=None, exclude=True)
+    cassette: Optional[Any] = Field(default=None, exclude=True)
+    rate_limiter: Optional[Any] = Field(default=None, exclude=True)
+
+    def _cache_key(self, query, kwargs):
+        params = {name: getattr(self, name, None) for name in TOOL_CACHE_PARAMS}
+        # Invocation-time arguments only apply where the tool has no fixed setting
+        for name, value in kwargs.items():
+            if name != "run_manager" and not params.get(name):
+                params[name] = value
+        return search_key(query, params)
+
+    def _run(self, query: str, run_manager=None, **kwargs):
+        upstream = super()._run
+        fetch = lambda: upstream(query, run_manager=run_manager, **kwargs)
+        key = self._cache_key(query, kwargs) if self.result_cache is not None or self.cassette is not None else None
+        if self.rate_limiter is not None:
+            # Only requests that reach Tavily wait for the limiter; cache hits and replays do not
+            limited = fetch
+            fetch = lambda: self.rate_limiter.call(limited)
+        if self.cassette is not None:
+            # Only requests that reach Tavily are recorded; cache hits stay cache hits on replay
+            recorded = fetch
+            fetch = lambda: self.cassette.search(key, recorded)
+        if self.result_cache is None:
+            return fetch()
+        return self.result_cache.get_or_fetch(self.cache_label, key, fetch)
+
+    async def _arun(self, query: str, run_manager=None, **kwargs):
+        upstream = super()._arun
+        afetch = lambda: upstream(query, run_manager=run_manager, **kwargs)
+        key = self._cache_key(query, kwargs) if self.result_cache is not None or self.cassette is not None else None
+        if self.rate_limiter is not None:
+            limited = afetch
+            afetch = lambda: self.rate_limiter.acall(limited)
+        if self.cassette is not None:
+            recorded = afetch
+            afetch = lambda: self.cassette.asearch(key, recorded)
+        if self.result_cache is None:
+            return await afetch()
+        return await self.result_cache.aget_or_fetch(self.cache_label, key, afetch)
@@ -0,0 +1,129 @@
+import tempfile
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+from conversation.message_log import MessageLog, append_messages
+from runtime.checkpoint import ThreadedSqliteSaver
+
+
+class State(TypedDict):
+    messages: Annotated[MessageLog, append_messages]
+    history: np.ndarray
+    turns: int
+
+
+class Interrupted(Exception):
+    pass
+
+
+def build_graph(saver, fail_at=None):
+    """CEO -> CFO -> CEO -> CFO ...; the node at turn fail_at raises once, like a crashed process"""
+    failures = {"left": 1 if fail_at is not None else 0}
+
+    def speak(name):
+        def node(state):
+            turn = state["turns"] + 1
+            if turn == fail_at and failures["left"]:
+                failures["left"] -= 1
+                raise Interrupted(f"{name} interrupted at turn {turn}")
+            message = AIMessage(content=f"{name} turn {turn} after {len(state['messages'])} messages", name=name)
+            return {"messages": [message], "history": np.append(state["history"], turn), "turns": turn}
+        return node
+
+    def route(state):
+        return END if state["turns"] >= 4 else ("CFO" if state["messages"][-1].name == "CEO" else "CEO")
+
+    graph = StateGraph(State)
+    graph.add_node("CEO", speak("CEO"))
+    graph.add_node("CFO", speak("CFO"))
+    graph.add_edge(START, "CEO")
+    graph.add_conditional_edges("CEO", route, ["CEO", "CFO", END])
+    graph.add_conditional_edges("CFO", route, ["CEO", "CFO", END])
+    return graph.compile(checkpointer=saver)
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def initial_state():
+    return {"messages": [HumanMessage(content="Analyze a dog walking app")], "history": np.zeros(0), "turns": 0}
+
+
+def test_interrupted_consultation_resumes_from_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = ThreadedSqliteSaver.open(Path(tmp) / "checkpoints.sqlite")
+        graph = build_graph(saver, fail_at=3)
+        with pytest.raises(Interrupted):
+            graph.invoke(initial_state(), config("c1"))
+        assert graph.get_state(config("c1")).next == ("CEO",)
+
+        # A new process: fresh saver on the same file, resumed with a None input
+        resumed = build_graph(ThreadedSqliteSaver.open(Path(tmp) / "checkpoints.sqlite"))
+        final = resumed.invoke(None, config("c1"))
+        assert [message.content for message in final["messages"][1:]] == [
+            "CEO turn 1 after 1 messages", "CFO turn 2 after 2 messages",
+            "CEO turn 3 after 3 messages", "CFO turn 4 after 4 messages"
+        ]
+        assert final["history"].tolist() == [1, 2, 3, 4]
+        assert isinstance(final["messages"], MessageLog)
+
+
+def test_fork_continues_from_an_earlier_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = build_graph(ThreadedSqliteSaver.open(Path(tmp) / "checkpoints.sqlite"))
+        source = graph.invoke(initial_state(), config("source"))
+
+        # Fork after the second agent message with a changed assumption
+        snapshot = next(
+            snapshot for snapshot in graph.get_state_history(config("source"))
+            if snapshot.values.get("turns") == 2 and snapshot.next
+        )
+        values = dict(snapshot.values)
+        values["messages"] = [*values["messages"], HumanMessage(content="Budget halved", name="client_assumption")]
+        graph.update_state(config("fork"), values, as_node=values["messages"][-2].name)
+        fork = graph.invoke(None, config("fork"))
+
+        assert fork["messages"][:3] == source["messages"][:3]
+        assert fork["messages"][3].content == "Budget halved"
+        assert [message.content for message in fork["messages"][4:]] == [
+            "CEO turn 3 after 4 messages", "CFO turn 4 after 5 messages"
+        ]
+        assert fork["history"].tolist() == [1, 2, 3, 4]
+        # The source consultation is untouched by the fork
+        assert graph.get_state(config("source")).values["messages"] == source["messages"]
+
+
+def test_only_the_most_recent_threads_are_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = ThreadedSqliteSaver.open(Path(tmp) / "checkpoints.sqlite", max_threads=2)
+        graph = build_graph(saver)
+        for thread_id in ("first", "second", "third"):
+            graph.invoke(initial_state(), config(thread_id))
+
+        assert not graph.get_state(config("first")).values
+        assert graph.get_state(config("second")).values["turns"] == 4
+        assert graph.get_state(config("third")).values["turns"] == 4
+
+
+def test_message_log_input_is_checkpointed():
+    # The input is stored in the __start__ channel before the reducer sees it
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = build_graph(ThreadedSqliteSaver.open(Path(tmp) / "checkpoints.sqlite"))
+        state = {**initial_state(), "messages": MessageLog(initial_state()["messages"])}
+        final = graph.invoke(state, config("log"))
+        assert graph.get_state(config("log")).values["messages"] == final["messages"]
+        assert len(final["messages"]) == 5
+
+
+if __name__ == "__main__":
+    test_interrupted_consultation_resumes_from_checkpoint()
+    test_fork_continues_from_an_earlier_checkpoint()
+    test_only_the_most_recent_threads_are_kept()
+    test_message_log_input_is_checkpointed()
+    print("✅ Consultations resume and fork from their checkpoints; old ones are pruned")
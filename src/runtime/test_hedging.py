@@ -0,0 +1,160 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from runtime.context import agent_context
+from runtime.hedging import HedgedChatOpenAI, HedgingPolicy, _Race
+from test_llm_cache import PROMPT, CountingEndpoint
+
+SLOW = CountingEndpoint(words=("slow", "answer"))
+FAST = CountingEndpoint(words=("fast", "answer"))
+
+
+def primed_policy(llm, latency=0.01):
+    """Enough fast samples that the next call is hedged after ~latency"""
+    with agent_context("CFO"):
+        key = llm._hedge_key("first_chunk")
+    for _ in range(llm.hedging.min_samples):
+        llm.hedging.observe(key, latency)
+
+
+def make_llm(handler, async_handler=None):
+    return HedgedChatOpenAI(
+        model="gpt-3.5-turbo",
+        api_key="test",
+        cache=False,
+        max_retries=0,
+        hedging=HedgingPolicy(budget=1.0),
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(async_handler or handler))
+    )
+
+
+def test_policy_waits_for_samples_and_respects_budget():
+    policy = HedgingPolicy(percentile=50, min_samples=3, budget=0.5)
+    assert policy.begin("key") is None
+    for latency in (0.3, 0.1, 0.2):
+        policy.observe("key", latency)
+    assert policy.begin("key") == 0.2
+    # Two calls so far: one hedge fits a 50% budget, a second does not
+    assert policy.try_hedge(100)
+    assert not policy.try_hedge(100)
+    assert policy.stats()["over_budget"] == 1
+    assert policy.stats()["extra_prompt_tokens"] == 100
+
+
+def test_race_prefers_the_first_answer_and_survives_one_failure():
+    policy = HedgingPolicy(budget=1.0)
+    policy.begin("key")
+    race = _Race(policy, "key", delay=0.0, prompt_tokens=10)
+    assert race.due()
+    assert not race.settle(0, "error", RuntimeError("connection reset"))
+    assert race.settle(1, "item", "chunk")
+    assert race.winner == 1
+    assert policy.stats()["hedge_wins"] == 1
+
+    # Without a hedge in flight the error is the caller's
+    race = _Race(policy, "key", delay=None, prompt_tokens=10)
+    with pytest.raises(RuntimeError):
+        race.settle(0, "error", RuntimeError("connection reset"))
+
+
+def test_slow_stream_is_hedged_and_the_hedge_wins():
+    release = threading.Event()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            release.wait(5)
+            return SLOW(request)
+        return FAST(request)
+
+    llm = make_llm(handler)
+    primed_policy(llm)
+    try:
+        with agent_context("CFO"):
+            text = "".join(chunk.content for chunk in llm.stream(PROMPT))
+    finally:
+        release.set()
+
+    assert text == "fast answer "
+    assert len(requests) == 2
+    stats = llm.hedging.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_losing_async_attempt_is_cancelled():
+    cancelled = []
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(request)
+                raise
+            return SLOW(request)
+        return FAST(request)
+
+    async def run(llm):
+        with agent_context("CFO"):
+            text = "".join([chunk.content async for chunk in llm.astream(PROMPT)])
+        await asyncio.sleep(0)
+        return text
+
+    llm = make_llm(lambda request: None, handler)
+    primed_policy(llm)
+    assert asyncio.run(run(llm)) == "fast answer "
+    assert cancelled == requests[:1]
+    assert llm.hedging.stats()["hedge_wins"] == 1
+
+
+def test_failed_hedge_falls_back_to_the_first_attempt():
+    release = threading.Event()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            release.wait(5)
+            return SLOW(request)
+        release.set()
+        return httpx.Response(400, json={"error": {"message": "bad request", "type": "invalid_request_error"}})
+
+    llm = make_llm(handler)
+    primed_policy(llm)
+    with agent_context("CFO"):
+        text = "".join(chunk.content for chunk in llm.stream(PROMPT))
+
+    assert text == "slow answer "
+    assert len(requests) == 2
+    assert llm.hedging.stats()["hedge_wins"] == 0
+
+
+def test_calls_outside_an_agent_are_not_hedged():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return FAST(request)
+
+    llm = make_llm(handler)
+    primed_policy(llm, latency=0.0)
+    assert "".join(chunk.content for chunk in llm.stream(PROMPT)) == "fast answer "
+    assert len(requests) == 1
+    assert llm.hedging.stats()["calls"] == 0
+
+
+if __name__ == "__main__":
+    test_policy_waits_for_samples_and_respects_budget()
+    test_race_prefers_the_first_answer_and_survives_one_failure()
+    test_slow_stream_is_hedged_and_the_hedge_wins()
+    test_losing_async_attempt_is_cancelled()
+    test_failed_hedge_falls_back_to_the_first_attempt()
+    test_calls_outside_an_agent_are_not_hedged()
+    print("✅ Slow agent calls are hedged; the first answer wins and the loser is cancelled")
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import httpx
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from runtime.context import agent_context
+from runtime.llm_cache import CachedChatOpenAI, SQLiteResponseCache, bypass_llm_cache
+
+
+# --- A chat completions endpoint that counts its requests ---
+class CountingEndpoint:
+    def __init__(self, words=("Mike,", "what", "does", "the", "MVP", "cost?")):
+        self.words = words
+        self.requests = 0
+
+    def _chunk(self, delta, finish_reason=None):
+        choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        return "data: " + json.dumps({
+            "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0,
+            "model": "gpt-3.5-turbo", "choices": [choice]
+        }) + "\n\n"
+
+    def __call__(self, request):
+        self.requests += 1
+        events = [self._chunk({"role": "assistant", "content": ""})]
+        events += [self._chunk({"content": word + " "}) for word in self.words]
+        events += [self._chunk({}, "stop"), "data: [DONE]\n\n"]
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content="".join(events).encode("utf-8"))
+
+
+def make_llm(endpoint, cache):
+    return CachedChatOpenAI(
+        model="gpt-3.5-turbo",
+        api_key="test",
+        cache=cache,
+        http_client=httpx.Client(transport=httpx.MockTransport(endpoint)),
+        http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(endpoint))
+    )
+
+
+PROMPT = [SystemMessage(content="You are the CEO."), HumanMessage(content="Should we build the MVP first?")]
+
+
+def streamed_text(llm):
+    return "".join(chunk.content for chunk in llm.stream(PROMPT))
+
+
+def test_second_identical_stream_hits_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoint = CountingEndpoint()
+        llm = make_llm(endpoint, SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        with agent_context("CEO"):
+            first = streamed_text(llm)
+            second = streamed_text(llm)
+        assert first == second == "Mike, what does the MVP cost? "
+        assert endpoint.requests == 1
+        assert llm.cache.stats() == {"CEO": {"hits": 1, "misses": 1}}
+
+
+def test_second_identical_astream_hits_cache():
+    async def run(llm):
+        texts = []
+        for _ in range(2):
+            texts.append("".join([chunk.content async for chunk in llm.astream(PROMPT)]))
+        return texts
+
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoint = CountingEndpoint()
+        llm = make_llm(endpoint, SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        first, second = asyncio.run(run(llm))
+        assert first == second
+        assert endpoint.requests == 1
+        assert llm.cache.stats() == {"unknown": {"hits": 1, "misses": 1}}
+
+
+def test_cache_hit_reports_zero_cost():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = make_llm(CountingEndpoint(), SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        streamed_text(llm)
+        chunks = list(llm.stream(PROMPT))
+        assert len(chunks) == 1
+        assert chunks[0].usage_metadata["total_cost"] == 0
+
+
+def test_invoke_and_stream_share_one_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoint = CountingEndpoint()
+        llm = make_llm(endpoint, SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        llm.streaming = True
+        # invoke() streams through _stream after its own cache check; the lookup must not be counted twice
+        assert llm.invoke(PROMPT).content == llm.invoke(PROMPT).content
+        assert endpoint.requests == 1
+        assert llm.cache.stats() == {"unknown": {"hits": 1, "misses": 1}}
+
+
+def test_aborted_stream_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoint = CountingEndpoint()
+        llm = make_llm(endpoint, SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        stream = llm.stream(PROMPT)
+        next(stream)
+        stream.close()
+        streamed_text(llm)
+        assert endpoint.requests == 2
+
+
+def test_bypassed_calls_skip_cache():
+    # Best-of-n: the first candidate may come from the cache, the extra ones must reach the model
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoint = CountingEndpoint()
+        llm = make_llm(endpoint, SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        streamed_text(llm)
+        with bypass_llm_cache():
+            streamed_text(llm)
+            streamed_text(llm)
+        streamed_text(llm)
+        assert endpoint.requests == 3
+        assert llm.cache.stats() == {"unknown": {"hits": 1, "misses": 1}}
+
+
+if __name__ == "__main__":
+    test_second_identical_stream_hits_cache()
+    test_second_identical_astream_hits_cache()
+    test_cache_hit_reports_zero_cost()
+    test_invoke_and_stream_share_one_lookup()
+    test_aborted_stream_is_not_cached()
+    test_bypassed_calls_skip_cache()
+    print("✅ Streamed LLM calls are served from the response cache")
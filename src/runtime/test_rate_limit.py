@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import contextmanager
+
+import httpx
+import pytest
+
+from runtime import rate_limit
+from runtime.rate_limit import (
+    AdaptiveConcurrency, AsyncRateLimitedTransport, RateLimitedTransport, RateLimiter, TokenBucket
+)
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping advances the clock instead of blocking"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@contextmanager
+def fake_clock():
+    real_time = rate_limit.time
+    rate_limit.time = FakeClock()
+    try:
+        yield rate_limit.time
+    finally:
+        rate_limit.time = real_time
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    with fake_clock() as clock:
+        bucket = TokenBucket(per_minute=60)  # 1/s, bursts of 10
+        assert [bucket.reserve(1) for _ in range(10)] == [0.0] * 10
+        assert bucket.reserve(1) == pytest.approx(1.0)
+        assert bucket.reserve(1) == pytest.approx(2.0)
+        clock.sleep(12)
+        assert bucket.reserve(1) == 0.0
+
+
+def test_paused_bucket_waits_for_retry_after():
+    with fake_clock():
+        bucket = TokenBucket(per_minute=600)
+        bucket.pause(5)
+        assert bucket.reserve(1) == pytest.approx(5.1)
+
+
+def test_limiter_sleeps_for_its_reservation():
+    with fake_clock() as clock:
+        limiter = RateLimiter("test", rpm=6)  # one request per 10s, bursts of 1
+        limiter.release(limiter.acquire())
+        limiter.release(limiter.acquire())
+        assert clock.now == pytest.approx(1010.0)
+        stats = limiter.stats()
+    assert stats["requests"] == 2 and stats["queued"] == 1
+    assert stats["max_wait_s"] == pytest.approx(10.0)
+
+
+def test_aimd_halves_once_per_burst_of_429s():
+    concurrency = AdaptiveConcurrency(maximum=8)
+    epochs = [concurrency.acquire() for _ in range(3)]
+    concurrency.release(epochs[0], latency=0.1, throttled=True)
+    concurrency.release(epochs[1], latency=0.1, throttled=True)
+    assert concurrency.limit == 4
+    # A request started after the cut may cut again
+    concurrency.release(concurrency.acquire(), latency=0.1, throttled=True)
+    assert concurrency.limit == 2
+    concurrency.release(epochs[2], latency=0.1)
+    assert concurrency.limit == 2.5
+    assert concurrency.in_flight == 0
+
+
+def test_aimd_backs_off_on_slow_responses():
+    concurrency = AdaptiveConcurrency(maximum=4, latency_tolerance=3.0)
+    concurrency.release(concurrency.acquire(), latency=1.0)
+    assert concurrency.limit == 4
+    concurrency.release(concurrency.acquire(), latency=5.0)
+    assert concurrency.limit == pytest.approx(3.6)
+
+
+EVENTS = [b"data: 1\n\n", b"data: 2\n\n", b"data: [DONE]\n\n"]
+
+
+def streaming_endpoint(request):
+    return httpx.Response(200, content=iter(EVENTS))
+
+
+def test_aborted_stream_releases_its_slot():
+    limiter = RateLimiter("test", rpm=0, max_concurrency=1)
+    client = httpx.Client(transport=RateLimitedTransport(limiter, httpx.MockTransport(streaming_endpoint)))
+
+    with client.stream("POST", "https://api.test/v1/chat/completions") as response:
+        chunks = response.iter_bytes()
+        next(chunks)
+        assert limiter.concurrency.in_flight == 1
+        # The reader gives up (e.g. a repetition abort) before closing the response
+        chunks.close()
+        assert limiter.concurrency.in_flight == 0
+    # Closing afterwards does not release it twice
+    assert limiter.concurrency.in_flight == 0
+
+    with client.stream("POST", "https://api.test/v1/chat/completions") as response:
+        assert b"".join(response.iter_bytes()).endswith(b"[DONE]\n\n")
+        assert limiter.concurrency.in_flight == 0
+
+
+def test_aborted_async_stream_releases_its_slot():
+    async def events():
+        for event in EVENTS:
+            yield event
+
+    async def endpoint(request):
+        return httpx.Response(200, content=events())
+
+    async def run(limiter):
+        transport = AsyncRateLimitedTransport(limiter, httpx.MockTransport(endpoint))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(RuntimeError):
+                async with client.stream("POST", "https://api.test/v1/chat/completions") as response:
+                    async for _ in response.aiter_bytes():
+                        raise RuntimeError("repetition")
+            assert limiter.concurrency.in_flight == 0
+
+            async with client.stream("POST", "https://api.test/v1/chat/completions") as response:
+                assert b"".join([chunk async for chunk in response.aiter_bytes()]).endswith(b"[DONE]\n\n")
+                assert limiter.concurrency.in_flight == 0
+
+    limiter = RateLimiter("test", rpm=0, max_concurrency=1)
+    asyncio.run(run(limiter))
+    assert limiter.concurrency.in_flight == 0
+
+
+if __name__ == "__main__":
+    test_token_bucket_allows_a_burst_then_paces()
+    test_paused_bucket_waits_for_retry_after()
+    test_limiter_sleeps_for_its_reservation()
+    test_aimd_halves_once_per_burst_of_429s()
+    test_aimd_backs_off_on_slow_responses()
+    test_aborted_stream_releases_its_slot()
+    test_aborted_async_stream_releases_its_slot()
+    print("✅ Buckets pace requests, AIMD backs off, and aborted streams free their slot")
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from runtime.repetition_guard import AsyncRepetitionGuard, RepetitionDetected, RepetitionGuard
+
+EARLIER = "We should launch the MVP in Berlin first and keep the burn rate low until revenue grows."
+REPEAT = " ".join([EARLIER] * 10)
+FRESH = " ".join(f"word{index}" for index in range(200))
+
+
+def words_overlap(text):
+    """Stand-in for the embedding similarity: most of the partial text is the earlier response"""
+    words = text.split()
+    return sum(word in EARLIER.split() for word in words) / len(words) > 0.9
+
+
+def fake_llm(content):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+
+
+def test_repeating_stream_is_aborted_early():
+    guard = RepetitionGuard(words_overlap, check_every=10)
+    with pytest.raises(RepetitionDetected) as aborted:
+        "".join(chunk.content for chunk in fake_llm(REPEAT).stream("go", config={"callbacks": [guard]}))
+    assert aborted.value.tokens == 10
+
+
+def test_fresh_stream_is_not_aborted():
+    guard = RepetitionGuard(words_overlap, check_every=10)
+    text = "".join(chunk.content for chunk in fake_llm(FRESH).stream("go", config={"callbacks": [guard]}))
+    assert text == FRESH
+
+
+def test_checks_stop_after_max_tokens():
+    checked = []
+
+    def is_repetition(text):
+        checked.append(text)
+        return False
+
+    guard = RepetitionGuard(is_repetition, check_every=10, max_tokens=50)
+    "".join(chunk.content for chunk in fake_llm(FRESH).stream("go", config={"callbacks": [guard]}))
+    # 400 streamed tokens (words and spaces), but only the first 50 are embedded
+    assert len(checked) == 5
+    assert max(len(text) for text in checked) < len(FRESH) // 4
+
+
+def test_async_guard_aborts_repetition():
+    async def is_repetition(text):
+        return words_overlap(text)
+
+    async def run(content):
+        guard = AsyncRepetitionGuard(is_repetition, check_every=10)
+        return "".join([chunk.content async for chunk in fake_llm(content).astream("go", config={"callbacks": [guard]})])
+
+    with pytest.raises(RepetitionDetected):
+        asyncio.run(run(REPEAT))
+    assert asyncio.run(run(FRESH)) == FRESH
+
+
+if __name__ == "__main__":
+    test_repeating_stream_is_aborted_early()
+    test_fresh_stream_is_not_aborted()
+    test_checks_stop_after_max_tokens()
+    test_async_guard_aborts_repetition()
+    print("✅ Repeating streams are aborted early, fresh ones run to the end")
@@ -0,0 +1,138 @@
+import asyncio
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from runtime import search_cache
+from runtime.search_cache import SearchResultCache, SQLiteSearchStore, search_key
+
+KEY = search_key("dog walking app market size", {"max_results": 5})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    time = monotonic
+
+
+@contextmanager
+def fake_clock():
+    real_time = search_cache.time
+    search_cache.time = FakeClock()
+    try:
+        yield search_cache.time
+    finally:
+        search_cache.time = real_time
+
+
+class CountingFetch:
+    def __init__(self, result=None):
+        self.result = result or {"results": [{"title": "Pet care market"}]}
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_near_identical_queries_share_a_key():
+    params = {"max_results": 5, "include_domains": ["b.com", "a.com"]}
+    assert search_key("Dog walking  app?", params) == search_key("dog walking app", {**params, "include_domains": ["a.com", "b.com"]})
+    assert search_key("dog walking app", params) != search_key("dog walking app", {**params, "max_results": 10})
+
+
+def test_entries_expire_after_ttl():
+    with fake_clock() as clock:
+        cache = SearchResultCache(ttl_seconds=60)
+        fetch = CountingFetch()
+        cache.get_or_fetch("tavily", KEY, fetch)
+        clock.now += 59
+        cache.get_or_fetch("tavily", KEY, fetch)
+        assert fetch.calls == 1
+        clock.now += 2
+        cache.get_or_fetch("tavily", KEY, fetch)
+        assert fetch.calls == 2
+    assert cache.stats() == {"tavily": {"hits": 1, "misses": 2, "coalesced": 0, "errors": 0}}
+
+
+def test_errors_are_not_cached():
+    cache = SearchResultCache()
+    failing = CountingFetch({"error": "Error 429: too many requests"})
+    cache.get_or_fetch("tavily", KEY, failing)
+    cache.get_or_fetch("tavily", KEY, failing)
+    assert failing.calls == 2
+    assert cache.stats()["tavily"]["errors"] == 2
+
+
+def test_concurrent_identical_queries_fetch_once():
+    cache = SearchResultCache()
+    release = threading.Event()
+    fetch = CountingFetch()
+
+    def slow_fetch():
+        release.wait()
+        return fetch()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("tavily", KEY, slow_fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Every caller has either started the fetch or is waiting for it
+    while sum(cache.stats().get("tavily", {}).get(outcome, 0) for outcome in ("misses", "coalesced")) < 5:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert cache.stats()["tavily"]["coalesced"] == 4
+
+
+def test_waiters_see_the_leaders_exception():
+    cache = SearchResultCache()
+
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def failing_fetch():
+            started.set()
+            await release.wait()
+            raise TimeoutError("Tavily timed out")
+
+        leader = asyncio.create_task(cache.aget_or_fetch("tavily", KEY, failing_fetch))
+        await started.wait()
+        waiter = asyncio.create_task(cache.aget_or_fetch("tavily", KEY, failing_fetch))
+        # Let the waiter find the in-flight request before the leader fails
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    assert [type(outcome) for outcome in asyncio.run(run())] == [TimeoutError, TimeoutError]
+    assert cache.stats()["tavily"] == {"hits": 0, "misses": 1, "coalesced": 1, "errors": 1}
+
+
+def test_store_survives_a_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "search.sqlite"
+        fetch = CountingFetch()
+        SearchResultCache(store=SQLiteSearchStore(path, ttl_seconds=60)).get_or_fetch("tavily", KEY, fetch)
+        restarted = SearchResultCache(store=SQLiteSearchStore(path, ttl_seconds=60))
+        assert restarted.get_or_fetch("tavily", KEY, fetch) == fetch.result
+        assert fetch.calls == 1
+
+
+if __name__ == "__main__":
+    test_near_identical_queries_share_a_key()
+    test_entries_expire_after_ttl()
+    test_errors_are_not_cached()
+    test_concurrent_identical_queries_fetch_once()
+    test_waiters_see_the_leaders_exception()
+    test_store_survives_a_restart()
+    print("✅ Searches are cached for their TTL and identical in-flight queries are fetched once")
@@ -0,0 +1,27 @@
+import tempfile
+from pathlib import Path
+
+from runtime.llm_cache import SQLiteResponseCache
+from runtime.usage import UsageCallbackHandler
+from test_llm_cache import PROMPT, CountingEndpoint, make_llm
+
+
+def test_cache_hits_count_as_cached_calls():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = make_llm(CountingEndpoint(), SQLiteResponseCache(Path(tmp) / "cache.sqlite"))
+        handler = UsageCallbackHandler()
+        config = {"callbacks": [handler], "metadata": {"purpose": "turn"}}
+        for _ in range(2):
+            list(llm.stream(PROMPT, config=config))
+
+        usage = handler.usage()["turn"]
+        assert usage["llm_calls"] == 2
+        assert usage["cached_calls"] == 1
+        # Only the call that reached the model is paid for
+        assert 0 < usage["completion_tokens"] <= 10
+        assert usage["cost_usd"] > 0
+
+
+if __name__ == "__main__":
+    test_cache_hits_count_as_cached_calls()
+    print("✅ Cached LLM calls are counted, and not paid for")
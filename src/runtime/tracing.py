@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from runtime.context import current_agent
+from runtime.stats import percentile
+
+# Innermost open span ({"trace_id", "span_id"}), so nested spans find their
+# parent across asyncio tasks and the LangChain executor helpers
+current_span = ContextVar("current_span", default=None)
+
+
+def trace_id_for(consultation_id):
+    """All spans of one consultation share a trace id derived from its thread id"""
+    if consultation_id:
+        return hashlib.md5(str(consultation_id).encode("utf-8")).hexdigest()
+    return os.urandom(16).hex()
+
+
+class Tracer:
+    """Appends finished spans to a JSON lines file.
+
+    Each line uses the OTLP span field names (traceId, spanId, parentSpanId,
+    startTimeUnixNano, endTimeUnixNano, attributes, status), so the file can
+    be converted for a tracing backend or summarized with summarize_spans()."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def new_span(self, parent=None, consultation_id=None):
+        """Ids for a span under parent (or a root span of the consultation's trace)"""
+        return {
+            "trace_id": parent["trace_id"] if parent else trace_id_for(consultation_id),
+            "span_id": os.urandom(8).hex()
+        }
+
+    def write(self, name, span, parent, start_ns, end_ns, attributes, error=None):
+        line = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "parentSpanId": parent["span_id"] if parent else "",
+            "name": name,
+            "startTimeUnixNano": start_ns,
+            "endTimeUnixNano": end_ns,
+            "attributes": attributes,
+            "status": {"code": "ERROR", "message": repr(error)} if error else {"code": "OK"}
+        }
+        payload = json.dumps(line, default=str)
+        with self._lock:
+            self._file.write(payload + "\n")
+            self._file.flush()
+
+    @contextmanager
+    def span(self, name, consultation_id=None, **attributes):
+        """Time the block as a child of the current span"""
+        parent = current_span.get()
+        span = self.new_span(parent, consultation_id)
+        attributes = {**agent_attribute(), **attributes}
+        token = current_span.set(span)
+        start_ns = time.time_ns()
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            current_span.reset(token)
+            self.write(name, span, parent, start_ns, time.time_ns(), attributes, error)
+
+
+def agent_attribute():
+    """The board member the current call is made for, as a span attribute"""
+    agent = current_agent.get()
+    return {} if agent == "unknown" else {"agent": agent}
+
+
+class SpanCallbackHandler(BaseCallbackHandler):
+    """Records LLM and tool calls made inside an agent run as child spans"""
+
+    run_inline = True
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, name, attributes):
+        parent = current_span.get()
+        with self._lock:
+            self._runs[run_id] = (name, time.time_ns(), parent, {**agent_attribute(), **attributes})
+
+    def _end(self, run_id, error=None):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run:
+            name, start_ns, parent, attributes = run
+            self.tracer.write(name, self.tracer.new_span(parent), parent, start_ns, time.time_ns(), attributes, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm.call", {"messages": sum(len(batch) for batch in messages)})
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "llm.call", {"prompts": len(prompts)})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        tool = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, f"tool.{tool}", {"tool": tool})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+def read_spans(path):
+    """Spans from a trace file, skipping partially written lines"""
+    spans = []
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def summarize_spans(spans):
+    """Count, p50, p95 and total duration (ms) per span name, slowest total first"""
+    durations = {}
+    for span in spans:
+        durations.setdefault(span["name"], []).append(
+            (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e6
+        )
+    rows = [
+        {
+            "name": name,
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "total_ms": sum(values)
+        }
+        for name, values in durations.items()
+    ]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def format_summary(rows):
+    """Plain-text table of summarize_spans() rows"""
+    width = max([len(row["name"]) for row in rows] + [len("span")])
+    lines = [f"{'span':<{width}}  {'count':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'total s':>8}"]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<{width}}  {row['count']:>6}  {row['p50_ms']:>9.1f}  "
+            f"{row['p95_ms']:>9.1f}  {row['total_ms'] / 1000:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m runtime.tracing [trace file] - summary over every run recorded in the file
+    import sys
+    trace_path = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parent.parent / ".cache" / "traces.jsonl"
+    print(format_summary(summarize_spans(read_spans(trace_path))))
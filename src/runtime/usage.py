@@ -0,0 +1,183 @@
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from conversation.context_window import count_prompt_tokens
+
+# USD per million (prompt, completion) tokens; the longest prefix of the model name wins
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00)
+}
+
+# Prompt tokens served from the provider's prefix cache are billed at this share of the prompt price
+CACHED_PROMPT_PRICE_FACTOR = 0.5
+
+# Calls are attributed to the purpose in their run metadata: "response", "candidate" (extra best-of-n candidates) or "regeneration"
+DEFAULT_PURPOSE = "response"
+
+
+def model_price(model_name):
+    """(prompt, completion) USD per million tokens, or None for an unknown model"""
+    matches = [prefix for prefix in MODEL_PRICES if (model_name or "").startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model_name, prompt_tokens, completion_tokens, cached_prompt_tokens=0):
+    price = model_price(model_name)
+    if price is None:
+        return 0.0
+    prompt_cost = (prompt_tokens - cached_prompt_tokens + cached_prompt_tokens * CACHED_PROMPT_PRICE_FACTOR) * price[0]
+    return (prompt_cost + completion_tokens * price[1]) / 1_000_000
+
+
+def empty_usage():
+    """Counters of one usage bucket (an agent, a phase, a purpose or the whole consultation)"""
+    return {
+        "llm_calls": 0, "cached_calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0,
+        "rag_context_tokens": 0, "tool_calls": 0, "cost_usd": 0.0
+    }
+
+
+def add_usage(bucket, delta):
+    merged = {**empty_usage(), **(bucket or {})}
+    for key, value in delta.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def empty_usage_stats():
+    """Per-consultation usage kept in AgentState["usage_stats"]"""
+    return {"total": empty_usage(), "by_agent": {}, "by_phase": {}, "by_purpose": {}}
+
+
+def merge_usage_stats(stats, turn_usage, agent, phase):
+    """Add a turn's usage ({purpose: bucket}) to the consultation totals by agent, phase and purpose"""
+    stats = stats or empty_usage_stats()
+    merged = {
+        "total": dict(stats["total"]),
+        "by_agent": dict(stats["by_agent"]),
+        "by_phase": dict(stats["by_phase"]),
+        "by_purpose": dict(stats["by_purpose"])
+    }
+    for purpose, delta in turn_usage.items():
+        merged["total"] = add_usage(merged["total"], delta)
+        merged["by_agent"][agent] = add_usage(merged["by_agent"].get(agent), delta)
+        merged["by_phase"][phase] = add_usage(merged["by_phase"].get(phase), delta)
+        merged["by_purpose"][purpose] = add_usage(merged["by_purpose"].get(purpose), delta)
+    return merged
+
+
+def _response_usage(response):
+    """{"prompt_tokens", "cached_prompt_tokens", "completion_tokens"}, model name and whether the
+    LangChain cache served it, for a finished LLM call"""
+    llm_output = response.llm_output or {}
+    model_name = llm_output.get("model_name")
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                model_name = model_name or message.response_metadata.get("model_name")
+                tokens = {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "cached_prompt_tokens": (usage.get("input_token_details") or {}).get("cache_read", 0),
+                    "completion_tokens": usage.get("output_tokens", 0)
+                }
+                # The LangChain cache zeroes total_cost on the responses it serves
+                return tokens, model_name, usage.get("total_cost") == 0
+    token_usage = llm_output.get("token_usage") or {}
+    tokens = {
+        "prompt_tokens": token_usage.get("prompt_tokens", 0),
+        "cached_prompt_tokens": (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+        "completion_tokens": token_usage.get("completion_tokens", 0)
+    }
+    return tokens, model_name, False
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Tokens, model calls, tool calls and estimated cost of one agent turn, by purpose.
+
+    Streamed responses only carry token usage when the model is created with
+    stream_usage=True. A stream cut off by the repetition guard is counted with
+    its estimated prompt and the tokens generated until the abort."""
+
+    run_inline = True
+
+    def __init__(self, rag_context_tokens=0):
+        self.rag_context_tokens = rag_context_tokens
+        self._usage = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _add(self, purpose, **delta):
+        with self._lock:
+            self._usage[purpose] = add_usage(self._usage.get(purpose), delta)
+
+    def usage(self):
+        """{purpose: usage bucket} for the calls seen so far"""
+        with self._lock:
+            return {purpose: dict(bucket) for purpose, bucket in self._usage.items()}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        purpose = metadata.get("purpose", DEFAULT_PURPOSE)
+        with self._lock:
+            self._runs[run_id] = {
+                "purpose": purpose,
+                "model_name": metadata.get("ls_model_name"),
+                "prompt_tokens": sum(count_prompt_tokens(batch) for batch in messages),
+                "streamed_tokens": 0
+            }
+        # Every call of the turn sends the RAG background research again
+        self._add(purpose, llm_calls=1, rag_context_tokens=self.rag_context_tokens)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            if run_id in self._runs:
+                self._runs[run_id]["streamed_tokens"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        tokens, model_name, cached = _response_usage(response)
+        if cached:
+            self._add(run["purpose"], cached_calls=1)
+            return
+        if not tokens["prompt_tokens"] and not tokens["completion_tokens"]:
+            # No usage reported (e.g. a stream without stream_usage) - estimate it
+            tokens = {"prompt_tokens": run["prompt_tokens"], "cached_prompt_tokens": 0, "completion_tokens": run["streamed_tokens"]}
+        model_name = model_name or run["model_name"]
+        self._add(run["purpose"], **tokens, cost_usd=estimate_cost(
+            model_name, tokens["prompt_tokens"], tokens["completion_tokens"], tokens["cached_prompt_tokens"]
+        ))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        self._add(
+            run["purpose"], prompt_tokens=run["prompt_tokens"], completion_tokens=run["streamed_tokens"],
+            cost_usd=estimate_cost(run["model_name"], run["prompt_tokens"], run["streamed_tokens"])
+        )
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        self._add((metadata or {}).get("purpose", DEFAULT_PURPOSE), tool_calls=1)
+
+
+def format_usage(bucket):
+    """One-line summary of a usage bucket"""
+    line = (f"{bucket['llm_calls']} LLM calls, {bucket['prompt_tokens']:,} prompt + "
+            f"{bucket['completion_tokens']:,} completion tokens, {bucket['tool_calls']} tool calls, "
+            f"~${bucket['cost_usd']:.4f}")
+    if bucket.get("cached_prompt_tokens") and bucket["prompt_tokens"]:
+        line += f", {bucket['cached_prompt_tokens'] / bucket['prompt_tokens']:.0%} of prompt tokens from the provider cache"
+    if bucket.get("cached_calls"):
+        line += f", {bucket['cached_calls']} cached"
+    return line
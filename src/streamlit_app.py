@@ -3,11 +3,16 @@ import base64
 import re
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
-from main_v6_demo import app, RAG_AVAILABLE
-from langchain_core.messages import HumanMessage
+from main_v6_demo import (
+    build_app, create_initial_state, get_llm_cache, get_search_cache, rag_available, agent_token,
+    consultation_config, get_consultation_snapshot, is_interrupted, new_consultation_id,
+    list_fork_points, fork_consultation, list_forks, latest_stats, ASYNC_EXECUTION, STREAM_MODES
+)
+from runtime.usage import format_usage
 from datetime import datetime
 from pathlib import Path
 import subprocess
+import asyncio
 import sys
 import os
 
@@ -22,6 +27,8 @@ AVATAR_ICONS = {
     "final_report": "📋"
 }
 
+AGENT_DISPLAY_NAMES = {"ceo": "Sarah (CEO)", "cto": "Mike (CTO)", "cfo": "Jennifer (CFO)", "coo": "Tom (COO)"}
+
 # DYNAMIC PATH RESOLUTION - WORKS ANYWHERE
 def get_project_paths():
     """Get project paths that work regardless of where Streamlit is run from"""
@@ -207,9 +214,148 @@ def run_script_safely(script_name, description):
         st.code(f"Paths used:\nScript: {PATHS['scripts'] / script_name}\nWorking dir: {PATHS['project_root']}")
         return False
 
+def render_token(chunk, metadata, live):
+    """Stream one token into its agent's chat bubble; a new LLM run of that agent resets the bubble"""
+    token = agent_token(chunk, metadata)
+    if token is None:
+        return
+    agent, run_id, text = token
+    agent_role = agent.lower()
+    display_name = AGENT_DISPLAY_NAMES[agent_role]
+    
+    bubble = live.get(agent_role)
+    if bubble is None:
+        with st.chat_message(display_name, avatar=AVATAR_ICONS[agent_role]):
+            bubble = live[agent_role] = {"placeholder": st.empty(), "run_id": run_id, "text": ""}
+    if bubble["run_id"] != run_id:
+        bubble["run_id"], bubble["text"] = run_id, ""
+    bubble["text"] += text
+    bubble["placeholder"].markdown(f"**{display_name}** ✍️\n\n{bubble['text']}▌")
+
+def render_consultation_output(output, live=None):
+    """Render one streamed graph update as chat messages, finalizing bubbles that were streamed"""
+    live = live if live is not None else {}
+    for key, value in output.items():
+        if key != "__end__" and "messages" in value and value["messages"]:
+            # Show quality indicator if available
+            quality = value.get('conversation_quality', 1.0)
+            quality_indicator = "🟢" if quality > 0.7 else "🟡" if quality > 0.4 else "🔴"
+            
+            # The parallel round returns all four opening messages at once
+            new_messages = value['messages'] if key == "parallel_round" else value['messages'][-1:]
+            for message in new_messages:
+                agent_role = (message.name or key).lower()
+                agent_message = message.content
+                
+                # Determine display info
+                display_name = AGENT_DISPLAY_NAMES.get(agent_role, key.upper())
+                avatar = AVATAR_ICONS.get(agent_role, "💬")
+                
+                # Display message, replacing the streamed draft if there was one
+                bubble = live.pop(agent_role, None)
+                if bubble:
+                    bubble["placeholder"].markdown(f"**{display_name}** {quality_indicator}\n\n{agent_message}")
+                else:
+                    with st.chat_message(f"{display_name} {quality_indicator}", avatar=avatar):
+                        st.markdown(f"**{display_name}** {quality_indicator}")
+                        st.markdown(agent_message)
+                
+                # Add to session state
+                st.session_state.messages.append({
+                    "role": agent_role,
+                    "content": agent_message
+                })
+
+def render_stream_event(mode, payload, live):
+    """Render one (mode, payload) event of a STREAM_MODES run"""
+    if mode == "messages":
+        render_token(*payload, live)
+    else:
+        render_consultation_output(payload, live)
+        remember_usage(payload)
+
+def remember_usage(output):
+    """Keep the consultation's latest token and cost counters for the sidebar"""
+    usage_stats = latest_stats(output, {}).get("usage_stats")
+    if usage_stats:
+        st.session_state.usage_stats = usage_stats
+
+def render_usage_sidebar(usage_stats):
+    """Tokens, calls and estimated cost of the consultation by agent, phase and purpose"""
+    total = usage_stats["total"]
+    with st.sidebar:
+        with st.expander("💰 Token Usage & Cost", expanded=True):
+            st.metric("Estimated cost", f"${total['cost_usd']:.4f}")
+            st.write(f"**Consultation:** {format_usage(total)}")
+            st.write(f"**RAG background research:** {total['rag_context_tokens']:,} prompt tokens")
+            for title, group in (("By agent", "by_agent"), ("By phase", "by_phase"), ("By purpose", "by_purpose")):
+                st.markdown(f"**{title}**")
+                for key, bucket in sorted(usage_stats[group].items()):
+                    st.write(f"- {key}: {format_usage(bucket)}")
+
+def render_cache_sidebar(llm_cache, search_cache):
+    """Hit/miss counters of the LLM and search caches, including the consultation that just ran"""
+    with st.sidebar:
+        if llm_cache:
+            with st.expander("💾 LLM Response Cache"):
+                cache_stats = llm_cache.stats()
+                if cache_stats:
+                    for agent, counts in sorted(cache_stats.items()):
+                        st.write(f"**{agent}:** {counts['hits']} hits / {counts['misses']} misses")
+                else:
+                    st.write("No LLM calls yet")
+        
+        if search_cache:
+            with st.expander("🔎 Search Cache"):
+                search_stats = search_cache.stats()
+                if search_stats:
+                    for tool, counts in sorted(search_stats.items()):
+                        st.write(f"**{tool}:** {counts['hits']} hits / {counts['misses']} misses / {counts['coalesced']} coalesced")
+                else:
+                    st.write("No searches yet")
+
+async def astream_consultation_to_chat(initial_state, config):
+    """Async driver: render tokens and updates from the async graph as they arrive"""
+    live = {}
+    async for mode, payload in build_app({"async_execution": True}).astream(
+        initial_state, config=config, stream_mode=STREAM_MODES
+    ):
+        render_stream_event(mode, payload, live)
+
+def run_consultation_to_chat(graph_input, consultation_id):
+    """Stream a consultation into the chat; a None input resumes it from its last checkpoint"""
+    spinner_text = "🤝 The RAG-enhanced AI board is in session..." if RAG_AVAILABLE else "🤝 The AI board is in session..."
+    with st.spinner(spinner_text):
+        try:
+            config = consultation_config(consultation_id, recursion_limit=30)
+            
+            if ASYNC_EXECUTION:
+                asyncio.run(astream_consultation_to_chat(graph_input, config))
+            else:
+                live = {}
+                for mode, payload in build_app().stream(graph_input, config=config, stream_mode=STREAM_MODES):
+                    render_stream_event(mode, payload, live)
+        
+        except Exception as e:
+            st.error(f"An error occurred during the consultation: {str(e)}")
+            st.info("Please try again or rephrase your business idea.")
+
+def transcript_from_state(state):
+    """Chat history entries for the messages of a checkpointed consultation"""
+    # A fork's changed assumption is shown as the client's message
+    return [
+        {"role": "user" if message.name in (None, "client_assumption") else message.name.lower(), "content": message.content}
+        for message in state.get("messages", [])
+    ]
+
 # Set page config
 st.set_page_config(page_title="RAG-Enhanced AI Startup Consultancy", layout="wide")
 
+# Loaded once per process; the agents and graph are only built for the first consultation
+RAG_AVAILABLE = rag_available()
+llm_cache = get_llm_cache()
+search_cache = get_search_cache()
+
 # Dynamic title based on RAG availability
 if RAG_AVAILABLE:
     st.title("🚀 RAG-Enhanced AI Startup Consultancy Firm")
@@ -412,6 +558,17 @@ Our team includes:
         "content": welcome_message
     })
 
+# The consultation id is kept in the URL, so after a dropped connection or a server
+# restart the new session picks up its transcript from the checkpoint (only the most
+# recent CHECKPOINT_MAX_CONSULTATIONS consultations are kept, see main_v6.py)
+consultation_snapshot = None
+if st.query_params.get("consultation"):
+    consultation_snapshot = get_consultation_snapshot(st.query_params["consultation"])
+    if consultation_snapshot and st.session_state.get("consultation_id") != st.query_params["consultation"]:
+        st.session_state.consultation_id = st.query_params["consultation"]
+        st.session_state.messages.extend(transcript_from_state(consultation_snapshot.values))
+        st.session_state.usage_stats = consultation_snapshot.values.get("usage_stats")
+
 # Display chat messages
 for message in st.session_state.messages:
     role = message["role"]
@@ -424,8 +581,7 @@ for message in st.session_state.messages:
         display_name = "Assistant"
         avatar = AVATAR_ICONS["assistant"]
     elif role in ["ceo", "cto", "cfo", "coo"]:
-        names = {"ceo": "Sarah (CEO)", "cto": "Mike (CTO)", "cfo": "Jennifer (CFO)", "coo": "Tom (COO)"}
-        display_name = names[role]
+        display_name = AGENT_DISPLAY_NAMES[role]
         avatar = AVATAR_ICONS[role]
     else:
         display_name = role.upper()
@@ -435,6 +591,40 @@ for message in st.session_state.messages:
         st.markdown(f"**{display_name}**")
         st.markdown(content)
 
+# A fork created on the previous run continues right away;
+# otherwise offer to continue a consultation that stopped before its final report
+if consultation_snapshot and st.session_state.pop("pending_fork", None) == st.session_state.consultation_id:
+    run_consultation_to_chat(None, st.session_state.consultation_id)
+elif is_interrupted(consultation_snapshot):
+    st.info(f"⏸️ This consultation was interrupted after {consultation_snapshot.values.get('message_count', 0)} agent messages.")
+    if st.button("▶️ Resume consultation"):
+        run_consultation_to_chat(None, st.session_state.consultation_id)
+
+# What-if: branch the stored consultation at an earlier turn with a changed assumption.
+# The fork reuses the stored messages and research and is kept next to the original
+if consultation_snapshot:
+    fork_points = dict(list_fork_points(st.session_state.consultation_id))
+    if fork_points:
+        with st.expander("🔀 Fork this consultation"):
+            fork_at = st.selectbox(
+                "Continue after",
+                list(fork_points),
+                index=len(fork_points) - 1,
+                format_func=lambda count: f"Message {count} ({fork_points[count]})"
+            )
+            assumption = st.text_input("Changed assumption", placeholder="e.g. The launch budget is cut in half")
+            if st.button("🔀 Fork and continue", disabled=not assumption.strip()):
+                fork_id = fork_consultation(st.session_state.consultation_id, fork_at, assumption.strip())
+                st.session_state.pending_fork = fork_id
+                st.session_state.messages = []
+                st.session_state.usage_stats = None
+                st.query_params["consultation"] = fork_id
+                st.rerun()
+            
+            forks = list_forks(st.session_state.consultation_id)
+            if forks:
+                st.markdown("Existing forks: " + ", ".join(f"[{fork_id}](?consultation={fork_id})" for fork_id in forks))
+
 # Handle user input
 if prompt := st.chat_input("Describe your business idea..."):
     if len(prompt.strip()) < 10:
@@ -447,59 +637,19 @@ if prompt := st.chat_input("Describe your business idea..."):
         st.markdown("**You**")
         st.markdown(prompt)
     
-    # Prepare initial message
-    initial_messages = [HumanMessage(content=f"Analyze this business idea and provide comprehensive consultation: {prompt}")]
-    
     # Prepare initial state for RAG-enhanced system
-    initial_state = {
-        "messages": initial_messages,
-        "discussion_phase": "initial",
-        "topics_discussed": [],
-        "pending_questions": [],
-        "message_count": 0,
-        "last_speaker": "",
-        "agent_participation": {"CEO": False, "CTO": False, "CFO": False, "COO": False},
-        "response_hashes": {},
-        "agent_call_counts": {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0},
-        "conversation_quality": 1.0,
-        "context_summary": ""
-    }
+    initial_state = create_initial_state(f"Analyze this business idea and provide comprehensive consultation: {prompt}")
     
-    # Process with spinner
-    spinner_text = "🤝 The RAG-enhanced AI board is in session..." if RAG_AVAILABLE else "🤝 The AI board is in session..."
-    with st.spinner(spinner_text):
-        try:
-            config = {"recursion_limit": 30}
-            
-            for output in app.stream(initial_state, config=config):
-                for key, value in output.items():
-                    if key != "__end__" and "messages" in value and value["messages"]:
-                        agent_role = key.lower()
-                        agent_message = value['messages'][-1].content
-                        
-                        # Determine display info
-                        names = {"ceo": "Sarah (CEO)", "cto": "Mike (CTO)", "cfo": "Jennifer (CFO)", "coo": "Tom (COO)"}
-                        display_name = names.get(agent_role, key.upper())
-                        avatar = AVATAR_ICONS.get(agent_role, "💬")
-                        
-                        # Show quality indicator if available
-                        quality = value.get('conversation_quality', 1.0)
-                        quality_indicator = "🟢" if quality > 0.7 else "🟡" if quality > 0.4 else "🔴"
-                        
-                        # Display message
-                        with st.chat_message(f"{display_name} {quality_indicator}", avatar=avatar):
-                            st.markdown(f"**{display_name}** {quality_indicator}")
-                            st.markdown(agent_message)
-                        
-                        # Add to session state
-                        st.session_state.messages.append({
-                            "role": agent_role,
-                            "content": agent_message
-                        })
-        
-        except Exception as e:
-            st.error(f"An error occurred during the consultation: {str(e)}")
-            st.info("Please try again or rephrase your business idea.")
+    # New checkpoint thread, remembered in the URL so the consultation survives a reconnect
+    st.session_state.consultation_id = new_consultation_id()
+    st.session_state.usage_stats = None
+    st.query_params["consultation"] = st.session_state.consultation_id
+    run_consultation_to_chat(initial_state, st.session_state.consultation_id)
+
+# Usage of the consultation on this page and cache counters, including any run that just finished above
+if st.session_state.get("usage_stats") and st.session_state.usage_stats["total"]["llm_calls"]:
+    render_usage_sidebar(st.session_state.usage_stats)
+render_cache_sidebar(llm_cache, search_cache)
 
 # Export functionality
 if len(st.session_state.messages) > 2:
@@ -541,6 +691,8 @@ if len(st.session_state.messages) > 2:
         with col3:
             if st.button("🔄 New Consultation", use_container_width=True):
                 st.session_state.messages = []
+                st.session_state.usage_stats = None
+                st.query_params.clear()
                 st.rerun()
     
     elif len(st.session_state.messages) > 15:
@@ -548,6 +700,8 @@ if len(st.session_state.messages) > 2:
         st.info("💡 The consultation is in progress. Export options will appear once the final report is ready.")
         if st.button("🔄 Start New Consultation"):
             st.session_state.messages = []
+            st.session_state.usage_stats = None
+            st.query_params.clear()
             st.rerun()
 
 # Footer
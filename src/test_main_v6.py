@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import contextmanager
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+import main_v6
+from main_v6 import arag_prefetch, rag_prefetch, regeneration_run_config
+from runtime.context import current_agent
+from runtime.repetition_guard import RepetitionGuard
+
+
+class State(TypedDict):
+    content: str
+
+
+def test_regenerated_response_is_streamed():
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="A fresh take on pricing")]))
+    configs = []
+
+    def regenerate(state):
+        config = regeneration_run_config("CFO", {})
+        configs.append(config)
+        return {"content": llm.invoke("go", config=config).content}
+
+    graph = StateGraph(State)
+    graph.add_node("CFO", regenerate)
+    graph.add_edge(START, "CFO")
+    graph.add_edge("CFO", END)
+
+    streamed = [
+        (chunk.content, metadata) for chunk, metadata in graph.compile().stream({"content": ""}, stream_mode="messages")
+    ]
+    assert "".join(content for content, _ in streamed) == "A fresh take on pricing"
+    # The graph's metadata and streaming handler are kept, the turn's metadata is added
+    assert all(metadata["purpose"] == "regeneration" and metadata["langgraph_node"] == "CFO" for _, metadata in streamed)
+    handlers = configs[0]["callbacks"].handlers
+    assert not any(isinstance(handler, RepetitionGuard) for handler in handlers)
+
+
+# First turn of a consultation where the CFO's research is already known (e.g. a fork)
+FIRST_TURN = {
+    "agent_call_counts": {"CEO": 0, "CTO": 0, "CFO": 0, "COO": 0},
+    "rag_results": {"CFO": {"agent": "CFO"}}
+}
+
+
+def lookup(state, name):
+    return {"agent": name, "context_agent": current_agent.get()}
+
+
+async def alookup(state, name):
+    return lookup(state, name)
+
+
+@contextmanager
+def fake_rag():
+    """RAG lookups that record which agent they were attributed to"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(main_v6, "rag_available", lambda: True)
+        patch.setattr(main_v6, "lookup_rag_result", lookup)
+        patch.setattr(main_v6, "alookup_rag_result", alookup)
+        yield
+
+
+def test_first_turn_prefetches_the_other_agents_rag():
+    turn = {}
+    with fake_rag(), rag_prefetch(FIRST_TURN, "CEO", turn):
+        pass
+    assert turn["prefetched_rag"] == {
+        agent: {"agent": agent, "context_agent": agent} for agent in ("CTO", "COO")
+    }
+
+    # Once everyone's research is in state there is nothing left to prefetch
+    turn = {}
+    state = {**FIRST_TURN, "rag_results": {agent: {"agent": agent} for agent in main_v6.members}}
+    with fake_rag(), rag_prefetch(state, "CTO", turn):
+        pass
+    assert "prefetched_rag" not in turn
+
+
+def test_first_turn_prefetches_the_other_agents_rag_async():
+    async def run():
+        turn = {}
+        async with arag_prefetch(FIRST_TURN, "CEO", turn):
+            await asyncio.sleep(0)
+        return turn
+
+    with fake_rag():
+        turn = asyncio.run(run())
+    assert turn["prefetched_rag"] == {
+        agent: {"agent": agent, "context_agent": agent} for agent in ("CTO", "COO")
+    }
+
+
+if __name__ == "__main__":
+    test_regenerated_response_is_streamed()
+    test_first_turn_prefetches_the_other_agents_rag()
+    test_first_turn_prefetches_the_other_agents_rag_async()
+    print("✅ Regenerated responses are streamed and the other agents' RAG research is prefetched")